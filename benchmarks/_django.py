@@ -0,0 +1,40 @@
+"""
+Bootstrap Django for the standalone benchmark scripts.
+
+Benchmarks default to a throwaway SQLite file so they can be executed on
+any checkout. Lock-contention benchmarks mean little on SQLite, which
+locks the whole database for every write; those accept ``--configured-db``
+to run against the database in settings (point it at a scratch schema).
+"""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def setup(db_path=None, configured=False):
+    if str(ROOT) not in sys.path:
+        sys.path.insert(0, str(ROOT))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'e_commerce.settings')
+
+    from django.conf import settings
+    if not configured:
+        db_path = db_path or os.path.join(tempfile.gettempdir(), 'emarket_bench.sqlite3')
+        settings.DATABASES['default'] = {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': db_path,
+            # IMMEDIATE takes the write lock up front, so concurrent writers
+            # queue on it instead of failing to upgrade a read lock.
+            'OPTIONS': {'timeout': 30, 'transaction_mode': 'IMMEDIATE'},
+        }
+    settings.EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+    settings.MEDIA_ROOT = os.path.join(tempfile.gettempdir(), 'emarket_bench_media')
+
+    import django
+    django.setup()
+
+    from django.core.management import call_command
+    call_command('migrate', verbosity=0)
+    return db_path
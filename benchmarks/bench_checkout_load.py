@@ -0,0 +1,211 @@
+"""
+Concurrent checkout load test: many buyers placing cart and direct orders
+through PlaceCartOrderView and DirectOrderView at once.
+
+Seeds --users buyers and --products products with --stock units each. One
+thread per buyer then places --orders orders through the test client, each
+of --lines random products; in cart mode the cart is filled through
+cart/batch/ first (not timed). Reports request latency percentiles,
+orders/sec, DB queries per order, and checks afterwards that no product
+sold more than it had and that every unit taken is accounted for by an
+order line.
+
+Orders enqueue invoice jobs; a worker thread drains them during the run.
+With --invoices stub the PDF and email are replaced by no-ops so only the
+queue itself is exercised; with --invoices real the PDF is rendered and
+mailed (to the in-memory email backend set up by _django).
+
+Usage:
+    python benchmarks/bench_checkout_load.py --users 16 --orders 20 --mode mixed
+    python benchmarks/bench_checkout_load.py --stock 50 --invoices real   # contended stock
+    python benchmarks/bench_checkout_load.py --configured-db             # e.g. MySQL
+
+SQLite takes one lock for every write, so latency there is mostly queueing;
+rejected orders are expected once stock runs out, errors are not.
+"""
+import argparse
+import random
+import statistics
+import threading
+import time
+from contextlib import ExitStack
+from unittest import mock
+
+from _django import setup
+
+BRAND = "LoadBench"
+EMAIL_DOMAIN = "loadbench.example.com"
+
+
+def seed(users, products, stock):
+    from shoppy import catalog, inventory
+    from shoppy.models import Product, User
+
+    User.objects.filter(email__endswith=f"@{EMAIL_DOMAIN}").delete()
+    Product.objects.filter(brand=BRAND).delete()
+    inventory.forget_sharded()
+    catalog.clear()
+    User.objects.bulk_create([
+        User(name=f"Buyer {i}", email=f"buyer{i}@{EMAIL_DOMAIN}", address=f"{i} Bench Street",
+             phone="9000000000", district="Bench", state="Bench", country="India", pincode="600001")
+        for i in range(users)
+    ])
+    Product.objects.bulk_create([
+        Product(name=f"Load Product {i}", brand=BRAND, description="Load test product", price=(i % 50) + 9.99,
+                quantity=stock)
+        for i in range(products)
+    ])
+    return (list(User.objects.filter(email__endswith=f"@{EMAIL_DOMAIN}").order_by('id').values_list('id', flat=True)),
+            list(Product.objects.filter(brand=BRAND).order_by('id').values_list('id', flat=True)))
+
+
+def stubbed_invoices():
+    """Patch the invoice jobs' PDF rendering and email sending with no-ops."""
+    stack = ExitStack()
+    stack.enter_context(mock.patch('shoppy.jobs.generate_invoice_pdf', return_value=b'%PDF-1.4 stub'))
+    stack.enter_context(mock.patch('shoppy.jobs.send_invoice_email'))
+    return stack
+
+
+def quiet_app_logs():
+    """Disable the app logger, which writes a line to stdout for every request, for the run."""
+    from shoppy.utils import get_logger
+
+    return mock.patch.object(get_logger(), 'disabled', True)
+
+
+def drain_jobs(stop):
+    from django.db import OperationalError, connection
+    from shoppy import jobs
+
+    try:
+        while True:
+            try:
+                ran = jobs.run_pending(limit=20)
+            except OperationalError:
+                ran = 0
+            if not ran:
+                if stop.is_set():
+                    return
+                time.sleep(0.05)
+    finally:
+        connection.close()
+
+
+def buyer(user_id, product_ids, args, results):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    from django.urls import reverse
+    from rest_framework.test import APIClient
+
+    client = APIClient(raise_request_exception=False, SERVER_NAME='localhost')
+    rng = random.Random(user_id)
+    try:
+        for _ in range(args.orders):
+            mode = args.mode if args.mode != 'mixed' else rng.choice(('cart', 'direct'))
+            lines = [{"product_id": product_id, "quantity": rng.randint(1, args.max_quantity)}
+                     for product_id in rng.sample(product_ids, args.lines)]
+            payload = {"user_id": user_id, "confirm_dispatch": "yes", "payment_mode": rng.choice(("cod", "online")),
+                       "distance": rng.randint(1, 30)}
+            if mode == 'cart':
+                response = client.post(reverse('cart-batch'), {"user_id": user_id, "items": lines}, format='json')
+                if response.status_code != 200:
+                    results['rejected'].append(mode)
+                    continue
+                url, payload["products"] = reverse('place-cart-order'), []
+            else:
+                url, payload["products"] = reverse('direct-order'), lines
+
+            with CaptureQueriesContext(connection) as queries:
+                start = time.perf_counter()
+                response = client.post(url, payload, format='json')
+                elapsed = time.perf_counter() - start
+            if response.status_code in (200, 201):
+                results['latencies'].append(elapsed)
+                results['queries'].append(len(queries))
+            elif response.status_code == 400:
+                results['rejected'].append(mode)
+            else:
+                results['errors'].append(response.json().get("errorDetails") or response.status_code)
+    finally:
+        connection.close()
+
+
+def check(product_ids, stock):
+    """Return ``(oversold products, products whose stock and order lines disagree, empty orders)``."""
+    from django.db.models import Count, Sum
+    from shoppy import inventory
+    from shoppy.models import Order, OrderItem, Product
+
+    quantities = dict(Product.objects.filter(id__in=product_ids).values_list('id', 'quantity'))
+    quantities.update({product_id: total for product_id, (total, _) in inventory.totals(product_ids).items()})
+    sold = dict(OrderItem.objects.filter(product_id__in=product_ids).values('product_id')
+                .annotate(total=Sum('quantity')).values_list('product_id', 'total'))
+    oversold = sum(1 for product_id in product_ids if quantities[product_id] < 0 or sold.get(product_id, 0) > stock)
+    mismatched = sum(1 for product_id in product_ids if stock - quantities[product_id] != sold.get(product_id, 0))
+    empty = (Order.objects.filter(user__email__endswith=f"@{EMAIL_DOMAIN}")
+             .annotate(lines=Count('items')).filter(lines=0).count())
+    return oversold, mismatched, empty
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=16, help="Concurrent buyers, one thread each")
+    parser.add_argument('--orders', type=int, default=20, help="Orders per buyer")
+    parser.add_argument('--products', type=int, default=50)
+    parser.add_argument('--stock', type=int, default=1000, help="Units of each product")
+    parser.add_argument('--lines', type=int, default=3, help="Products per order")
+    parser.add_argument('--max-quantity', type=int, default=2)
+    parser.add_argument('--mode', choices=('cart', 'direct', 'mixed'), default='mixed')
+    parser.add_argument('--invoices', choices=('stub', 'real'), default='stub')
+    parser.add_argument('--db', default=None)
+    parser.add_argument('--configured-db', action='store_true')
+    args = parser.parse_args()
+
+    setup(args.db, configured=args.configured_db)
+    from django.core import mail
+    from shoppy.models import Invoice, Job, Order
+
+    user_ids, product_ids = seed(args.users, args.products, args.stock)
+    results = {'latencies': [], 'queries': [], 'rejected': [], 'errors': []}
+    mail.outbox = []
+
+    with quiet_app_logs(), stubbed_invoices() if args.invoices == 'stub' else ExitStack():
+        stop = threading.Event()
+        worker = threading.Thread(target=drain_jobs, args=(stop,))
+        worker.start()
+        buyers = [threading.Thread(target=buyer, args=(user_id, product_ids, args, results)) for user_id in user_ids]
+        start = time.perf_counter()
+        for thread in buyers:
+            thread.start()
+        for thread in buyers:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        stop.set()
+        worker.join()
+
+    latencies = sorted(results['latencies'])
+    placed = len(latencies)
+    print(f"{args.users} buyers x {args.orders} {args.mode} orders of {args.lines} lines, "
+          f"{args.products} products x {args.stock} units, invoices {args.invoices}")
+    print(f"  placed {placed}, rejected {len(results['rejected'])}, errors {len(results['errors'])} "
+          f"in {elapsed:.2f}s -> {placed / elapsed:.1f} orders/s")
+    if placed >= 2:
+        cuts = statistics.quantiles(latencies, n=100, method='inclusive')
+        print(f"  latency ms: p50 {cuts[49] * 1000:.1f}  p95 {cuts[94] * 1000:.1f}  p99 {cuts[98] * 1000:.1f}  "
+              f"max {latencies[-1] * 1000:.1f}")
+        print(f"  queries per order: mean {statistics.mean(results['queries']):.1f}  max {max(results['queries'])}")
+    for error in sorted(set(map(str, results['errors'])))[:5]:
+        print(f"  error: {error}")
+
+    orders = Order.objects.filter(user_id__in=user_ids)
+    oversold, mismatched, empty = check(product_ids, args.stock)
+    print(f"  orders in db {orders.count()} (placed {placed}), oversold products {oversold}, "
+          f"stock/order mismatches {mismatched}, orders without lines {empty}")
+    jobs = Job.objects.filter(payload__order_id__in=list(orders.values_list('id', flat=True)))
+    print(f"  invoice jobs {jobs.filter(status=Job.STATUS_SUCCEEDED).count()}/{jobs.count()} done, "
+          f"invoices {Invoice.objects.filter(order__in=orders).count()}, emails {len(mail.outbox)}")
+
+
+if __name__ == '__main__':
+    main()
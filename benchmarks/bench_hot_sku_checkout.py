@@ -0,0 +1,97 @@
+"""
+Checkout throughput on a single hot product, with its stock in the Product
+row versus split across N StockShard rows.
+
+Each worker thread runs checkouts of one unit in their own transaction
+(take_stock, then --hold-ms of simulated order writes while the row locks
+are held) until it has placed --orders orders.
+
+Usage:
+    python benchmarks/bench_hot_sku_checkout.py --threads 16 --orders 50 --shards 8
+    python benchmarks/bench_hot_sku_checkout.py --configured-db   # e.g. MySQL
+
+SQLite serializes all writers on one database lock, so sharding cannot help
+there; run with --configured-db against MySQL/InnoDB to see row-lock effects.
+"""
+import argparse
+import threading
+import time
+
+from _django import setup
+
+
+def run(product_id, threads, orders, hold_ms):
+    from django.db import OperationalError, connection, transaction
+    from shoppy.checkout import take_stock
+
+    barrier = threading.Barrier(threads + 1)
+    retries = []
+
+    def worker():
+        retried = 0
+        barrier.wait()
+        try:
+            placed = 0
+            while placed < orders:
+                try:
+                    with transaction.atomic():
+                        take_stock([(product_id, 1)])
+                        time.sleep(hold_ms / 1000)
+                    placed += 1
+                except OperationalError:
+                    # Lock wait timeout / deadlock: the transaction rolled back, try again.
+                    retried += 1
+        finally:
+            retries.append(retried)
+            connection.close()
+
+    pool = [threading.Thread(target=worker) for _ in range(threads)]
+    for thread in pool:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in pool:
+        thread.join()
+    return time.perf_counter() - start, sum(retries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--orders', type=int, default=50, help="Orders per thread")
+    parser.add_argument('--shards', type=int, default=8)
+    parser.add_argument('--hold-ms', type=float, default=2.0, help="Time each checkout holds its locks")
+    parser.add_argument('--db', default=None)
+    parser.add_argument('--configured-db', action='store_true')
+    args = parser.parse_args()
+
+    setup(args.db, configured=args.configured_db)
+    from django.db.models import Sum
+    from shoppy import catalog
+    from shoppy.inventory import shard_product
+    from shoppy.models import Product, StockShard
+
+    total = args.threads * args.orders
+    print(f"{args.threads} threads x {args.orders} orders of one SKU, {args.hold_ms}ms held per checkout")
+    for shards in (1, args.shards):
+        catalog.clear()
+        product = Product.objects.create(name="Hot SKU", brand="Bench", description="Promotion", price=99,
+                                         quantity=total * 2)
+        shard_product(product.id, shards)
+        catalog.clear()
+
+        elapsed, retries = run(product.id, args.threads, args.orders, args.hold_ms)
+
+        product.refresh_from_db()
+        if shards > 1:
+            stock = StockShard.objects.filter(product=product).aggregate(total=Sum('quantity'))['total']
+        else:
+            stock = product.quantity
+        assert stock == total, f"expected {total} units left, found {stock}"
+        label = "unsharded" if shards == 1 else f"{shards} shards"
+        print(f"  {label:>10}: {total / elapsed:8.1f} checkouts/s  ({elapsed:.2f}s, {retries} retries)")
+        product.delete()
+
+
+if __name__ == '__main__':
+    main()
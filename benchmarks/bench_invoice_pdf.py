@@ -0,0 +1,129 @@
+"""
+Invoices/sec of generate_invoice_pdf against the renderer it replaced, which
+drew every string (the static header included) with its own drawString call.
+
+Orders are built in memory, so no database work is timed. Peak memory is
+measured with tracemalloc over one render, feeding the items as an iterator
+the way the invoice job does.
+
+Usage:
+    python benchmarks/bench_invoice_pdf.py --lines 3 20 2000 --seconds 2
+"""
+import argparse
+import time
+import tracemalloc
+from decimal import Decimal
+from io import BytesIO
+from types import SimpleNamespace
+
+from _django import setup
+
+
+def drawstring_invoice_pdf(order, order_items, total_amount, shipping_fee, payment_mode, gst_amount=None,
+                           cod_surcharge=None):
+    """The per-string renderer generate_invoice_pdf used before the cached header."""
+    from django.utils import timezone
+    from reportlab.lib.pagesizes import A4
+    from reportlab.pdfgen import canvas
+
+    buffer = BytesIO()
+    p = canvas.Canvas(buffer, pagesize=A4)
+    width, height = A4
+    y = height - 50
+    p.setFont("Helvetica-Bold", 16)
+    p.drawString(200, y, "E-Market Invoice")
+    y -= 30
+    p.setFont("Helvetica", 10)
+    p.drawString(50, y, "E-Market, Dummy Address, Trichy")
+    y -= 15
+    p.drawString(50, y, "Contact: 9876543210")
+    y -= 30
+    p.drawString(50, y, f"Invoice Date: {timezone.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    y -= 15
+    p.drawString(50, y, f"Order ID: {order.id}")
+    p.drawString(300, y, f"User: {order.user.email}")
+    y -= 30
+    p.setFont("Helvetica-Bold", 12)
+    p.drawString(50, y, "Items")
+    y -= 20
+    p.setFont("Helvetica", 10)
+    for item in order_items:
+        p.drawString(60, y, f"{item.product.name} - ₹{item.price} x {item.quantity} = ₹{item.price * item.quantity}")
+        y -= 15
+        if y < 100:
+            p.showPage()
+            y = height - 50
+    y -= 20
+    p.drawString(50, y, f"Subtotal: ₹{total_amount}")
+    y -= 15
+    p.drawString(50, y, f"Shipping Fee: ₹{shipping_fee}")
+    if payment_mode.lower() == "cod" and cod_surcharge:
+        y -= 15
+        p.drawString(50, y, f"COD Surcharge: ₹{cod_surcharge}")
+    if payment_mode.lower() == "online" and gst_amount:
+        y -= 15
+        p.drawString(50, y, f"GST (8%): ₹{gst_amount}")
+    y -= 15
+    p.setFont("Helvetica-Bold", 12)
+    p.drawString(50, y, f"Total: ₹{order.total}")
+    y -= 30
+    p.setFont("Helvetica", 10)
+    p.drawString(50, y, f"Shipping Address: {order.dispatch_address}")
+    y -= 15
+    p.drawString(50, y, f"Phone: {order.dispatch_phone}")
+    y -= 30
+    p.drawString(50, y, "Thank you for shopping with E-Market!")
+    p.showPage()
+    p.save()
+    return buffer.getvalue()
+
+
+def make_order(lines):
+    order = SimpleNamespace(id=1, user=SimpleNamespace(email="bench@example.com"), total=Decimal('1049.00'),
+                            dispatch_address="1 Bench Street, Trichy", dispatch_phone="9876543210")
+    items = [SimpleNamespace(product=SimpleNamespace(name=f"Product {i}"), price=Decimal('9.99'), quantity=2)
+             for i in range(lines)]
+    return order, items
+
+
+def render(fn, order, items):
+    return fn(order, iter(items), Decimal('999.00'), Decimal('50.00'), 'online', Decimal('79.92'), Decimal('0'))
+
+
+def rate(fn, order, items, seconds):
+    render(fn, order, items)
+    count, start = 0, time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        render(fn, order, items)
+        count += 1
+    return count / (time.perf_counter() - start)
+
+
+def peak_kib(fn, order, items):
+    tracemalloc.start()
+    render(fn, order, items)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--lines', type=int, nargs='+', default=[3, 20, 2000], help="Order sizes to render")
+    parser.add_argument('--seconds', type=float, default=2.0, help="Time spent per renderer and size")
+    args = parser.parse_args()
+
+    setup()
+    from shoppy.utils import generate_invoice_pdf
+
+    for lines in args.lines:
+        order, items = make_order(lines)
+        before = rate(drawstring_invoice_pdf, order, items, args.seconds)
+        after = rate(generate_invoice_pdf, order, items, args.seconds)
+        print(f"{lines:>6} lines: drawString {before:8.1f}/s  current {after:8.1f}/s  ({after / before:.2f}x)  "
+              f"peak {peak_kib(drawstring_invoice_pdf, order, items):,.0f} -> "
+              f"{peak_kib(generate_invoice_pdf, order, items):,.0f} KiB")
+
+
+if __name__ == '__main__':
+    main()
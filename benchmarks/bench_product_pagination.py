@@ -0,0 +1,71 @@
+"""
+Compare OFFSET paging with keyset (cursor) paging on a large Product table.
+
+Usage:
+    python benchmarks/bench_product_pagination.py --rows 1000000
+
+The table is seeded once and reused on later runs against the same --db file.
+"""
+import argparse
+import time
+
+from _django import setup
+
+PAGE_SIZE = 25
+DEPTHS = (0.0, 0.1, 0.5, 0.9, 0.99)
+
+
+def seed(rows, batch_size=20000):
+    from shoppy.models import Product
+
+    existing = Product.objects.count()
+    if existing >= rows:
+        return existing
+    for start in range(existing, rows, batch_size):
+        Product.objects.bulk_create([
+            Product(
+                name=f"Product {i}",
+                brand=f"Brand {i % 500}",
+                description="Benchmark product",
+                price=(i % 10000) + 1,
+                quantity=100,
+                sold_count=i % 997,
+            )
+            for i in range(start, min(start + batch_size, rows))
+        ])
+    return rows
+
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--db', default=None)
+    args = parser.parse_args()
+
+    setup(args.db)
+    from shoppy.models import Product
+
+    rows = seed(args.rows)
+    ids = Product.objects.order_by('id').values_list('id', flat=True)
+    print(f"rows={rows} page_size={PAGE_SIZE} repeat={args.repeat}")
+    print(f"{'depth':>8} {'offset ms':>12} {'keyset ms':>12}")
+
+    for depth in DEPTHS:
+        offset = int((rows - PAGE_SIZE) * depth)
+        cursor_id = ids[offset - 1] if offset else 0
+
+        offset_ms = timed(lambda: list(Product.objects.order_by('id')[offset:offset + PAGE_SIZE]), args.repeat)
+        keyset_ms = timed(lambda: list(Product.objects.filter(id__gt=cursor_id).order_by('id')[:PAGE_SIZE]), args.repeat)
+        print(f"{depth:>8.0%} {offset_ms:>12.3f} {keyset_ms:>12.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""
+Rows/sec of the ModelSerializer read path versus the `.values()` fast path
+used by ProductListView and CartView.get.
+
+Usage:
+    python benchmarks/bench_read_paths.py --rows 5000
+"""
+import argparse
+import time
+
+from _django import setup
+
+
+def seed(rows):
+    from shoppy.models import Cart, Product, User
+
+    Cart.objects.all().delete()
+    Product.objects.all().delete()
+    user, _ = User.objects.get_or_create(email="bench@example.com", defaults={"name": "Bench"})
+    Product.objects.bulk_create([
+        Product(name=f"Product {i}", brand=f"Brand {i % 50}", description="Benchmark product",
+                price=(i % 1000) + 0.99, quantity=100, sold_count=i % 97)
+        for i in range(rows)
+    ], batch_size=5000)
+    Cart.objects.bulk_create([
+        Cart(user=user, product_id=product_id, quantity=1)
+        for product_id in Product.objects.values_list('id', flat=True)
+    ], batch_size=5000)
+
+
+def rate(fn, rows, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return rows / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--db', default=None)
+    args = parser.parse_args()
+
+    setup(args.db)
+    from shoppy.models import Cart, Product
+    from shoppy.serializer import (
+        ProductSerializer, CartSerializer, PRODUCT_FIELDS, CART_FIELDS,
+        serialize_product_rows, serialize_cart_rows
+    )
+
+    seed(args.rows)
+    cases = [
+        ("product", lambda: ProductSerializer(Product.objects.all(), many=True).data,
+         lambda: serialize_product_rows(Product.objects.values(*PRODUCT_FIELDS))),
+        ("cart", lambda: CartSerializer(Cart.objects.all(), many=True).data,
+         lambda: serialize_cart_rows(Cart.objects.values(*CART_FIELDS))),
+    ]
+
+    print(f"rows={args.rows} repeat={args.repeat} (best run)")
+    print(f"{'path':>8} {'serializer rows/s':>18} {'values rows/s':>15} {'speedup':>8}")
+    for name, before, after in cases:
+        assert [dict(item) for item in before()] == after(), f"{name} output differs"
+        slow = rate(before, args.rows, args.repeat)
+        fast = rate(after, args.rows, args.repeat)
+        print(f"{name:>8} {slow:>18,.0f} {fast:>15,.0f} {fast / slow:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
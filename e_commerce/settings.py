@@ -70,6 +70,35 @@ DATABASES = {
 }
 
 
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # Product catalog cache (shoppy.catalog). Invalidation must reach every
+    # worker process, so production needs a shared backend (Redis, Memcached,
+    # or 'django.core.cache.backends.filebased.FileBasedCache' with a
+    # directory LOCATION); `manage.py check --deploy` warns about LocMem.
+    'catalog': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'shoppy-catalog',
+        'TIMEOUT': 300,
+    },
+    # Read copies of carts for shoppy.cart_store.CachedCartStore.
+    'carts': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'shoppy-carts',
+        'TIMEOUT': 60,
+    },
+}
+
+# Cart storage backend. 'shoppy.cart_store.CachedCartStore' writes carts to the
+# Cart table and serves reads from copies in the 'carts' cache.
+CART_STORE = 'shoppy.cart_store.DatabaseCartStore'
+
+# How long adding a product to a cart holds its stock for that user.
+STOCK_HOLD_SECONDS = 15 * 60
+
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
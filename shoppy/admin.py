@@ -1,13 +1,37 @@
 from django.contrib import admin
-<<<<<<< HEAD
-from .models import User, Product, Cart, Order, OrderItem, Invoice, OTP
-=======
+from .facets import facet_values
 from .models import (
     User, Product, Cart, Order, OrderItem, Invoice, OTP, ShipmentTracking
 )
+from . import catalog, inventory, leaderboard
+
+# ------------------ Product Admin ------------------
+
+# Edits made here keep facets, the catalog cache and the leaderboards in
+# step the way the product views do.
+
+class ProductAdmin(admin.ModelAdmin):
+    def save_model(self, request, obj, form, change):
+        old = Product.objects.filter(id=obj.id).first() if change else None
+        super().save_model(request, obj, form, change)
+        catalog.record_product_change(obj.id, facet_values(old), facet_values(obj))
+        if old:
+            leaderboard.record_brand_change(obj, old.brand)
+        if 'quantity' in form.changed_data:
+            inventory.redistribute([obj.id])
+
+    def delete_model(self, request, obj):
+        product_id, before = obj.id, facet_values(obj)
+        super().delete_model(request, obj)
+        catalog.record_product_change(product_id, before, None)
+
+    def delete_queryset(self, request, queryset):
+        changes = [(product.id, facet_values(product), None) for product in queryset]
+        super().delete_queryset(request, queryset)
+        catalog.record_product_changes(changes)
+
 
 # ------------------ Order Admin ------------------
->>>>>>> 987dbcd (Initial project setup with working Django e-commerce backend)
 
 class OrderAdmin(admin.ModelAdmin):
     list_display = ['id', 'user', 'invoice_id', 'payment_status', 'shipment_status', 'created_at']
@@ -15,17 +39,6 @@ class OrderAdmin(admin.ModelAdmin):
     search_fields = ['user__email', 'invoice_id']
     list_editable = ['shipment_status']
 
-<<<<<<< HEAD
-admin.site.register(Order, OrderAdmin)
-
-# Register other models
-admin.site.register(User)
-admin.site.register(Product)
-admin.site.register(Cart)
-admin.site.register(OrderItem)
-admin.site.register(Invoice)
-admin.site.register(OTP)
-=======
 
 # ------------------ Shipment Tracking Admin ------------------
 
@@ -39,11 +52,10 @@ class ShipmentTrackingAdmin(admin.ModelAdmin):
 # ------------------ Register All Models ------------------
 
 admin.site.register(User)
-admin.site.register(Product)
+admin.site.register(Product, ProductAdmin)
 admin.site.register(Cart)
 admin.site.register(Order, OrderAdmin)
 admin.site.register(OrderItem)
 admin.site.register(Invoice)
 admin.site.register(OTP)
 admin.site.register(ShipmentTracking, ShipmentTrackingAdmin)
->>>>>>> 987dbcd (Initial project setup with working Django e-commerce backend)
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class ShoppyConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'shoppy'
+
+    def ready(self):
+        # Registers the system checks.
+        from . import checks
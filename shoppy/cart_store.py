@@ -0,0 +1,150 @@
+import threading
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection, transaction
+from django.db.models import DecimalField, F, Sum
+from django.test.signals import setting_changed
+from django.utils.module_loading import import_string
+
+from .models import Cart
+from .serializer import CART_FIELDS
+from . import catalog
+
+
+# ----------------------- Cart Storage -----------------------
+#
+# Cart reads and writes go through a cart store chosen by the CART_STORE
+# setting. All stores hand out rows shaped like Cart.values(*CART_FIELDS).
+#
+# DatabaseCartStore reads and writes the Cart table directly.
+#
+# CachedCartStore serves reads from a copy of each user's cart in the
+# "carts" cache alias. Every write goes to Cart first and the copy is
+# dropped once the write commits, so the cache never holds the only copy of
+# anything and an evicted or lost entry just costs one reload. Copies are
+# only ever add()ed by readers and expire after the alias' TIMEOUT, which
+# bounds how long a reload that raced a write can serve the old cart.
+
+
+class DatabaseCartStore:
+    def get_lines(self, user_id):
+        return list(Cart.objects.filter(user_id=user_id).values(*CART_FIELDS))
+
+    def add_line(self, user_id, product_id, quantity):
+        """Insert a line and return it, or return None if the product is already in the cart."""
+        if Cart.objects.filter(user_id=user_id, product_id=product_id).exists():
+            return None
+        line = Cart.objects.create(user_id=user_id, product_id=product_id, quantity=quantity)
+        return {'id': line.id, 'quantity': line.quantity, 'user_id': user_id, 'product_id': product_id}
+
+    def set_quantities(self, user_id, quantities):
+        """Upsert ``{product_id: quantity}`` into the cart in one statement."""
+        upsert = {'update_conflicts': True, 'update_fields': ['quantity']}
+        if connection.features.supports_update_conflicts_with_target:
+            upsert['unique_fields'] = ['user', 'product']
+        Cart.objects.bulk_create([
+            Cart(user_id=user_id, product_id=product_id, quantity=quantity)
+            for product_id, quantity in quantities.items()
+        ], **upsert)
+
+    def remove_line(self, line_id):
+        """Delete a line and return it as ``{"user_id", "product_id"}``, or None if there was none."""
+        line = Cart.objects.filter(id=line_id).values('user_id', 'product_id').first()
+        if line and Cart.objects.filter(id=line_id).delete()[0]:
+            return line
+        return None
+
+    def clear(self, user_id):
+        Cart.objects.filter(user_id=user_id).delete()
+
+    def total(self, user_id):
+        total = Cart.objects.filter(user_id=user_id).aggregate(
+            total=Sum(F('quantity') * F('product__price'), output_field=DecimalField(max_digits=12, decimal_places=2))
+        )['total']
+        return total if total is not None else 0
+
+
+class CachedCartStore(DatabaseCartStore):
+    CACHE_ALIAS = 'carts'
+
+    def _cache(self):
+        return caches[self.CACHE_ALIAS]
+
+    def _key(self, user_id):
+        return f"cart:{user_id}"
+
+    def _load(self, user_id):
+        """Return ``{product_id: (line_id, quantity)}`` for a user."""
+        lines = self._cache().get(self._key(user_id))
+        if lines is None:
+            rows = Cart.objects.filter(user_id=user_id).values_list('product_id', 'id', 'quantity')
+            lines = {product_id: (line_id, quantity) for product_id, line_id, quantity in rows}
+            self._cache().add(self._key(user_id), lines)
+        return lines
+
+    def _invalidate(self, user_id):
+        # Dropped again after commit, in case a reader re-added the pre-commit rows meanwhile.
+        self._cache().delete(self._key(user_id))
+        transaction.on_commit(lambda: self._cache().delete(self._key(user_id)))
+
+    def get_lines(self, user_id):
+        return sorted(
+            ({'id': line_id, 'quantity': quantity, 'user_id': user_id, 'product_id': product_id}
+             for product_id, (line_id, quantity) in self._load(user_id).items()),
+            key=lambda line: line['id']
+        )
+
+    def add_line(self, user_id, product_id, quantity):
+        line = super().add_line(user_id, product_id, quantity)
+        if line is not None:
+            self._invalidate(user_id)
+        return line
+
+    def set_quantities(self, user_id, quantities):
+        super().set_quantities(user_id, quantities)
+        self._invalidate(user_id)
+
+    def remove_line(self, line_id):
+        line = super().remove_line(line_id)
+        if line:
+            self._invalidate(line['user_id'])
+        return line
+
+    def clear(self, user_id):
+        super().clear(user_id)
+        self._invalidate(user_id)
+
+    def total(self, user_id):
+        lines = self._load(user_id)
+        if not lines:
+            return 0
+        # Prices come from the catalog cache, so a warm cart total needs no query.
+        prices = {product['id']: Decimal(product['price']) for product in catalog.get_products(list(lines))}
+        return sum(
+            (prices[product_id] * quantity for product_id, (_, quantity) in lines.items() if product_id in prices),
+            Decimal('0')
+        )
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_cart_store():
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = import_string(getattr(settings, 'CART_STORE', 'shoppy.cart_store.DatabaseCartStore'))()
+    return _store
+
+
+def _reset_cart_store(setting, **kwargs):
+    global _store
+    if setting == 'CART_STORE':
+        _store = None
+
+
+setting_changed.connect(_reset_cart_store)
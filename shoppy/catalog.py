@@ -0,0 +1,204 @@
+import hashlib
+import threading
+import uuid
+from collections import Counter
+
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .facets import update_facets_many
+from .models import Product, CatalogVersion
+from .serializer import PRODUCT_FIELDS, serialize_product_rows
+
+
+# ----------------------- Catalog Cache -----------------------
+#
+# Read-through cache for the product catalog, stored in the "catalog" cache
+# alias (see CACHES in settings).
+#
+#   catalog:product:<id>         serialized product, or MISSING for unknown IDs
+#   catalog:list:<gen>:<digest>  product IDs and links of one list page
+#
+# List pages only hold product IDs, so a change that leaves a product's list
+# membership alone (description, stock within in-stock, ...) only drops that
+# product's entry. Creates, deletes and changes to a filterable attribute
+# rotate the list generation, which orphans every cached page at once.
+#
+# Invalidation deletes entries in the configured cache, so every worker
+# process has to share it; the checks in shoppy.checks flag a per-process
+# backend on `manage.py check --deploy`.
+
+CACHE_ALIAS = 'catalog'
+GENERATION_KEY = 'catalog:list:generation'
+
+# Negative entries keep lookups of unknown/deleted IDs off the database. They
+# share the product key, so creating a product with that ID drops them too.
+MISSING = '__missing__'
+MISSING_TIMEOUT = 60
+
+_stats = Counter()
+_stats_lock = threading.Lock()
+
+
+def _cache():
+    return caches[CACHE_ALIAS]
+
+
+def _record(name, amount=1):
+    with _stats_lock:
+        _stats[name] += amount
+
+
+def _product_key(product_id):
+    return f"catalog:product:{product_id}"
+
+
+def _generation():
+    cache = _cache()
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        cache.add(GENERATION_KEY, uuid.uuid4().hex, None)
+        generation = cache.get(GENERATION_KEY)
+    return generation
+
+
+# ----------------------- Products -----------------------
+
+def cache_products(rows):
+    """Serialize ``PRODUCT_FIELDS`` rows and store one entry per product; return the data."""
+    data = serialize_product_rows(rows)
+    _cache().set_many({_product_key(item["id"]): item for item in data})
+    return data
+
+
+def get_products(product_ids):
+    """
+    Return serialized products for ``product_ids`` in order, loading misses in
+    one query. IDs that do not exist are skipped and negatively cached.
+    """
+    cache = _cache()
+    keys = {product_id: _product_key(product_id) for product_id in product_ids}
+    cached = cache.get_many(keys.values())
+    missing = [product_id for product_id, key in keys.items() if key not in cached]
+
+    _record("product_hits", len(keys) - len(missing))
+    if missing:
+        _record("product_misses", len(missing))
+        for item in cache_products(Product.objects.filter(id__in=missing).values(*PRODUCT_FIELDS)):
+            cached[_product_key(item["id"])] = item
+        unknown = {keys[product_id]: MISSING for product_id in missing if keys[product_id] not in cached}
+        if unknown:
+            cache.set_many(unknown, MISSING_TIMEOUT)
+    return [
+        cached[keys[product_id]] for product_id in product_ids
+        if cached.get(keys[product_id], MISSING) != MISSING
+    ]
+
+
+def get_product(product_id):
+    products = get_products([product_id])
+    return products[0] if products else None
+
+
+# ----------------------- List Pages -----------------------
+
+def list_page_key(url):
+    digest = hashlib.md5(url.encode()).hexdigest()
+    return f"catalog:list:{_generation()}:{digest}"
+
+
+def get_list_page(key):
+    page = _cache().get(key)
+    _record("page_hits" if page is not None else "page_misses")
+    return page
+
+
+def set_list_page(key, page):
+    _cache().set(key, page)
+
+
+# ----------------------- Version -----------------------
+#
+# CatalogVersion is the durable, monotonically increasing source of truth and
+# is read from its row on every call (one primary-key lookup). A cached copy
+# would be per process with a local cache backend, and other workers would
+# keep answering 304 for a catalog that has changed.
+#
+# The bump runs after the writing transaction commits, in its own
+# single-statement transaction. Bumping inside it would hold the one
+# CatalogVersion row lock across the rest of the write, and every checkout
+# would queue on it. A reader between the commit and the bump can still be
+# answered 304 once; the next request sees the new version. A bump that
+# fails is logged and left to the next write.
+
+def catalog_version():
+    """Return the current ``(version, updated_at)`` of the catalog."""
+    row, _ = CatalogVersion.objects.get_or_create(pk=1)
+    return row.version, row.updated_at
+
+
+def bump_version():
+    updated = CatalogVersion.objects.filter(pk=1).update(version=F('version') + 1, updated_at=timezone.now())
+    if not updated:
+        CatalogVersion.objects.get_or_create(pk=1, defaults={'version': 1})
+    return CatalogVersion.objects.values_list('version', flat=True).get(pk=1)
+
+
+# ----------------------- Invalidation -----------------------
+
+def invalidate_listing():
+    _cache().set(GENERATION_KEY, uuid.uuid4().hex, None)
+
+
+def invalidate_product(product_id, listing=False):
+    """Drop one product's entry, and every list page too when ``listing`` is set."""
+    _cache().delete(_product_key(product_id))
+    if listing:
+        invalidate_listing()
+
+
+def record_product_change(product_id, before, after):
+    """
+    Propagate a product write to the facet counts, the catalog cache and the
+    catalog version.
+    ``before``/``after`` are the product's facet values (None when the product
+    did not exist / no longer exists); list pages are only dropped when they
+    differ, since those are exactly the attributes pages are filtered on.
+    """
+    record_product_changes([(product_id, before, after)])
+
+
+def record_product_changes(changes):
+    """
+    Batch form of record_product_change for ``(product_id, before, after)``
+    triples. Facet counts are written in the caller's transaction; the
+    version is bumped and cache entries are dropped once it commits, so a
+    concurrent reader cannot re-cache the pre-commit rows.
+    """
+    changes = list(changes)
+    if not changes:
+        return
+    update_facets_many((before, after) for _, before, after in changes)
+
+    product_keys = [_product_key(product_id) for product_id, _, _ in changes if product_id is not None]
+    listing = any(before != after for _, before, after in changes)
+
+    def invalidate():
+        _cache().delete_many(product_keys)
+        if listing:
+            invalidate_listing()
+
+    transaction.on_commit(invalidate)
+    # The write has committed by now; a failed bump must not turn it into an error.
+    transaction.on_commit(bump_version, robust=True)
+
+
+def clear():
+    _cache().clear()
+
+
+def cache_stats():
+    with _stats_lock:
+        return {name: _stats[name] for name in ("product_hits", "product_misses", "page_hits", "page_misses")}
@@ -0,0 +1,115 @@
+import copy
+
+from django.db.models import Exists, F, OuterRef
+from django.utils import timezone
+
+from .facets import facet_values
+from .leaderboard import record_sale
+from .models import Product, StockShard
+from .reservations import held_by_others, held_by_others_total
+from . import catalog, inventory
+
+
+# ----------------------- Checkout Stock -----------------------
+#
+# Stock is taken with one conditional UPDATE per product:
+#
+#   UPDATE product SET quantity = quantity - n, sold_count = sold_count + n
+#    WHERE id = ? AND quantity >= n + <active holds of other users>
+#      AND NOT EXISTS (<shards of the product>)
+#
+# The database checks and decrements in one statement, so two checkouts can
+# never both see the last unit. A sharded product is taken from its shards
+# instead (see inventory); the NOT EXISTS keeps a product that was sharded
+# by another process after we looked from being sold off its mirror. The caller runs take_stock() inside
+# transaction.atomic() together with the order rows it writes; when a line
+# cannot be filled InsufficientStock is raised and the whole order rolls back.
+
+
+class InsufficientStock(Exception):
+    def __init__(self, product_id):
+        super().__init__(f"Insufficient stock for product ID {product_id}")
+        self.product_id = product_id
+
+
+def take_stock(lines, user_id=None):
+    """
+    Decrement stock and bump sold_count for ``(product_id, quantity)`` lines.
+    Returns the updated products as ``{id: Product}`` and the sorted IDs of
+    those this checkout sold out. Repeated product IDs are combined. Stock
+    held for other users is not taken; ``user_id``'s own holds are. Must be
+    called inside ``transaction.atomic()``.
+    """
+    now = timezone.now()
+    quantities = {}
+    for product_id, quantity in lines:
+        quantities[product_id] = quantities.get(product_id, 0) + quantity
+
+    # A fixed lock order keeps two multi-line checkouts from deadlocking:
+    # sharded products first, then the rest, each by ID, as reserve() and
+    # inventory.sync() lock them.
+    sharded = inventory.sharded(quantities)
+    from_shards, sold_out = set(), set()
+    for product_id in sorted(quantities, key=lambda product_id: (product_id not in sharded, product_id)):
+        quantity = quantities[product_id]
+        use_shards = product_id in sharded
+        for _ in range(2):
+            if use_shards:
+                updated = _take_sharded(product_id, quantity, user_id, now, sold_out)
+            else:
+                updated = _take_row(product_id, quantity, user_id, now)
+            if updated is not None:
+                break
+            # shard_stock (un)sharded the product since we looked.
+            use_shards = not use_shards
+        if not updated:
+            raise InsufficientStock(product_id)
+        if use_shards:
+            from_shards.add(product_id)
+
+    # The rows are locked by our UPDATEs, so the values read here are exactly
+    # the ones we wrote and "before" is "after" plus what we took. A sharded
+    # product's Product row is only a mirror, so its facets stay put, but its
+    # live stock changed: the version and its cache entry still have to move.
+    products = Product.objects.in_bulk(list(quantities))
+    changes = []
+    for product_id, product in products.items():
+        if product_id in from_shards:
+            changes.append((product_id, facet_values(product), facet_values(product)))
+            continue
+        before = copy.copy(product)
+        before.quantity += quantities[product_id]
+        changes.append((product_id, facet_values(before), facet_values(product)))
+        record_sale(product)
+        if not product.quantity:
+            sold_out.add(product_id)
+    catalog.record_product_changes(changes)
+    return products, sorted(sold_out)
+
+
+def _take_row(product_id, quantity, user_id, now):
+    """Take from the Product row; None means the product has shards, which hold its stock instead."""
+    updated = Product.objects.filter(
+        ~Exists(StockShard.objects.filter(product=OuterRef('pk'))),
+        id=product_id, quantity__gte=held_by_others(user_id, now) + quantity
+    ).update(
+        quantity=F('quantity') - quantity,
+        sold_count=F('sold_count') + quantity
+    )
+    if not updated and inventory.sharded([product_id]):
+        return None
+    return updated
+
+
+def _take_sharded(product_id, quantity, user_id, now, sold_out):
+    """Take from a sharded product's shards; None means it has none (any more) and the Product row applies."""
+    # Holds are checked against the shard total without a lock, so under a
+    # race they can be overrun by a few units; the shards themselves never
+    # go below zero.
+    live = inventory.totals([product_id])
+    if product_id not in live:
+        return None
+    stock, _ = live[product_id]
+    if stock - held_by_others_total(product_id, user_id, now) < quantity:
+        return False
+    return inventory.take(product_id, quantity, sold_out)
@@ -0,0 +1,28 @@
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+from .cart_store import CachedCartStore
+from .catalog import CACHE_ALIAS
+
+
+# Backends that keep a separate copy in every process. The catalog and cart
+# caches are invalidated by deleting entries, which only reaches the other
+# worker processes when they all share one cache.
+PER_PROCESS_BACKENDS = {'django.core.cache.backends.locmem.LocMemCache'}
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_caches(app_configs, **kwargs):
+    aliases = [CACHE_ALIAS]
+    if getattr(settings, 'CART_STORE', '') == 'shoppy.cart_store.CachedCartStore':
+        aliases.append(CachedCartStore.CACHE_ALIAS)
+    return [
+        Warning(
+            f"The '{alias}' cache uses a per-process backend, so invalidations made by one worker are not seen "
+            f"by the others.",
+            hint="Use a cache shared by all worker processes (e.g. Redis, Memcached or FileBasedCache).",
+            id='shoppy.W001',
+        )
+        for alias in aliases
+        if settings.CACHES.get(alias, {}).get('BACKEND') in PER_PROCESS_BACKENDS
+    ]
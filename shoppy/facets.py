@@ -0,0 +1,120 @@
+from collections import Counter
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Case, F, Value, When
+
+from .models import ProductFacet
+
+
+# ----------------------- Facet Definitions -----------------------
+#
+# Facet counts live in the ProductFacet table and are adjusted by the views
+# that write products (create/update/delete/restock and order placement) and
+# by the product admin, so reading the facet summary never needs a GROUP BY
+# over shoppy_product.
+
+BRAND = 'brand'
+PRICE_BAND = 'price_band'
+IN_STOCK = 'in_stock'
+
+# (label, lower bound inclusive, upper bound exclusive)
+PRICE_BANDS = [
+    ('0-500', Decimal('0'), Decimal('500')),
+    ('500-1000', Decimal('500'), Decimal('1000')),
+    ('1000-5000', Decimal('1000'), Decimal('5000')),
+    ('5000-10000', Decimal('5000'), Decimal('10000')),
+    ('10000-50000', Decimal('10000'), Decimal('50000')),
+    ('50000+', Decimal('50000'), None),
+]
+
+
+def price_band(price):
+    price = Decimal(price)
+    for label, low, high in PRICE_BANDS:
+        if price >= low and (high is None or price < high):
+            return label
+    return PRICE_BANDS[0][0]
+
+
+def facet_values(product):
+    """Facet values a product currently contributes to, or None for no product."""
+    if product is None:
+        return None
+    return {
+        BRAND: product.brand,
+        PRICE_BAND: price_band(product.price),
+        IN_STOCK: 'yes' if product.quantity > 0 else 'no',
+    }
+
+
+# ----------------------- Incremental Maintenance -----------------------
+
+def _adjust(facet, value, delta):
+    if delta < 0:
+        # Counts are unsigned; a drift below zero clamps to 0 instead of failing the write.
+        count = Case(When(count__gte=-delta, then=F('count') + delta), default=Value(0))
+    else:
+        count = F('count') + delta
+    updated = ProductFacet.objects.filter(facet=facet, value=value).update(count=count)
+    if updated or delta < 0:
+        return
+    try:
+        with transaction.atomic():
+            ProductFacet.objects.create(facet=facet, value=value, count=delta)
+    except IntegrityError:
+        # Another request created the row first; fall back to the increment.
+        ProductFacet.objects.filter(facet=facet, value=value).update(count=F('count') + delta)
+
+
+def update_facets_many(changes):
+    """
+    Move products' contributions from their ``before`` facet values to the
+    ``after`` ones, with one UPDATE per touched facet value. Use None as
+    ``before`` for a new product and as ``after`` for a deleted one.
+    """
+    deltas = Counter()
+    for before, after in changes:
+        for facet, value in (before or {}).items():
+            deltas[(facet, value)] -= 1
+        for facet, value in (after or {}).items():
+            deltas[(facet, value)] += 1
+    for (facet, value), delta in deltas.items():
+        if delta:
+            _adjust(facet, value, delta)
+
+
+# ----------------------- Reading -----------------------
+
+def get_facet_summary():
+    summary = {BRAND: {}, PRICE_BAND: {}, IN_STOCK: {}}
+    for facet, value, count in ProductFacet.objects.filter(count__gt=0).values_list('facet', 'value', 'count'):
+        summary.setdefault(facet, {})[value] = count
+    return summary
+
+
+def filter_products(products, params):
+    """Apply the ``brand``, ``price_band`` and ``in_stock`` query filters."""
+    brand = params.get(BRAND)
+    if brand:
+        products = products.filter(brand=brand)
+
+    band = params.get(PRICE_BAND)
+    if band:
+        bounds = {label: (low, high) for label, low, high in PRICE_BANDS}
+        if band not in bounds:
+            raise ValueError(f"Unknown price band '{band}'")
+        low, high = bounds[band]
+        products = products.filter(price__gte=low)
+        if high is not None:
+            products = products.filter(price__lt=high)
+
+    in_stock = params.get(IN_STOCK)
+    if in_stock:
+        if in_stock.lower() in ('yes', 'true', '1'):
+            products = products.filter(quantity__gt=0)
+        elif in_stock.lower() in ('no', 'false', '0'):
+            products = products.filter(quantity=0)
+        else:
+            raise ValueError(f"Invalid in_stock value '{in_stock}'")
+    return products
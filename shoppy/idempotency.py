@@ -0,0 +1,146 @@
+import functools
+import hashlib
+import json
+import time
+import uuid
+from datetime import timedelta
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from drf_yasg import openapi
+from rest_framework.response import Response
+
+from .models import IdempotencyKey
+from .utils import build_response, get_logger
+
+_logger = get_logger()
+
+
+# ----------------------- Idempotent Requests -----------------------
+#
+# A client may send an ``Idempotency-Key`` header with a POST. Keys belong to
+# the caller (the authenticated user, else the ``user_id`` in the body), so
+# one user's key never replays another user's response. The first request
+# with a key stores an IdempotencyKey row before it runs and the response
+# once it finishes; a repeat of the key within TTL gets that stored response
+# back without running the view again. A repeat that arrives while the first
+# request is still running polls the row until the response is there (or
+# WAIT_TIMEOUT passes, which answers 409).
+#
+# The running request holds the row on a LEASE. If its worker dies, the
+# lease runs out and the next repeat takes the row over and runs the view
+# itself; the first request, should it still finish, no longer owns the row
+# and leaves it alone.
+#
+# 5xx responses and exceptions (including BaseExceptions such as a worker
+# being interrupted) are not stored: the row is dropped so the client's
+# retry runs the request for real. Reusing a key with a different body is
+# rejected with 422. `manage.py purge_idempotency_keys` deletes expired rows.
+
+HEADER = 'Idempotency-Key'
+MAX_KEY_LENGTH = 255
+TTL = timedelta(hours=24)
+WAIT_TIMEOUT = 30
+LEASE = timedelta(seconds=60)
+POLL_INTERVAL = 0.1
+
+header_parameter = openapi.Parameter(
+    HEADER, openapi.IN_HEADER, type=openapi.TYPE_STRING, required=False,
+    description="Repeat requests with the same key return the first response instead of running again"
+)
+
+
+def _fingerprint(data):
+    return hashlib.sha256(json.dumps(data, sort_keys=True, cls=DjangoJSONEncoder).encode()).hexdigest()
+
+
+def _owner(request):
+    if request.user and request.user.is_authenticated:
+        return f"user:{request.user.pk}"
+    user_id = request.data.get("user_id") if hasattr(request.data, "get") else None
+    return f"user:{user_id}" if user_id not in (None, "") else ""
+
+
+def _claim(scope, owner, key, fingerprint, now):
+    """
+    Return ``(row, None)`` for a live row held by another request, or
+    ``(None, lease)`` once this request holds the key, having created the row
+    or taken over one whose lease ran out.
+    """
+    keys = IdempotencyKey.objects.filter(scope=scope, owner=owner, key=key)
+    lease = uuid.uuid4().hex
+    while True:
+        record = keys.filter(expires_at__gt=now).first()
+        if record:
+            if (record.response_code is None and record.fingerprint == fingerprint
+                    and (record.lease_expires_at is None or record.lease_expires_at <= now)
+                    and keys.filter(id=record.id, lease=record.lease, response_code__isnull=True)
+                    .update(lease=lease, lease_expires_at=now + LEASE)):
+                _logger.warning(f"Taking over {scope} {HEADER} {key} from an expired lease")
+                return None, lease
+            return record, None
+        keys.filter(expires_at__lte=now).delete()
+        try:
+            with transaction.atomic():
+                IdempotencyKey.objects.create(scope=scope, owner=owner, key=key, fingerprint=fingerprint,
+                                              lease=lease, lease_expires_at=now + LEASE, expires_at=now + TTL)
+            return None, lease
+        except IntegrityError:
+            # Another request with this key got in first; read its row.
+            continue
+
+
+def _replay(record):
+    response = Response(record.response_body, status=record.response_code)
+    response['Idempotent-Replayed'] = 'true'
+    return response
+
+
+def idempotent(scope):
+    """Make a view method honour the Idempotency-Key header within ``scope``."""
+    def decorator(view_method):
+        @functools.wraps(view_method)
+        def wrapper(self, request, *args, **kwargs):
+            key = request.headers.get(HEADER)
+            if not key:
+                return view_method(self, request, *args, **kwargs)
+            if len(key) > MAX_KEY_LENGTH:
+                return Response(build_response(
+                    400, "Failed", f"{HEADER} must be at most {MAX_KEY_LENGTH} characters", statusFlag=False
+                ), status=400)
+
+            owner = _owner(request)
+            fingerprint = _fingerprint(request.data)
+            deadline = time.monotonic() + WAIT_TIMEOUT
+            while True:
+                record, lease = _claim(scope, owner, key, fingerprint, timezone.now())
+                if record is None:
+                    break
+                if record.fingerprint != fingerprint:
+                    return Response(build_response(
+                        422, "Failed", f"{HEADER} was already used with a different request", statusFlag=False
+                    ), status=422)
+                if record.response_code is not None:
+                    _logger.info(f"Replaying {scope} response for {HEADER} {key}")
+                    return _replay(record)
+                if time.monotonic() >= deadline:
+                    return Response(build_response(
+                        409, "Failed", f"A request with this {HEADER} is still in progress", statusFlag=False
+                    ), status=409)
+                time.sleep(POLL_INTERVAL)
+
+            # Only touched while this request still holds the lease.
+            stored = IdempotencyKey.objects.filter(scope=scope, owner=owner, key=key, lease=lease)
+            response = None
+            try:
+                response = view_method(self, request, *args, **kwargs)
+            finally:
+                if response is None or response.status_code >= 500:
+                    stored.delete()
+                else:
+                    stored.update(response_code=response.status_code, response_body=response.data,
+                                  lease_expires_at=None)
+            return response
+        return wrapper
+    return decorator
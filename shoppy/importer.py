@@ -0,0 +1,114 @@
+import csv
+import io
+import json
+import time
+from itertools import islice
+
+from django.db import connection, transaction
+from rest_framework import serializers
+
+from .facets import facet_values
+from .models import Product
+from . import catalog, inventory
+
+
+# ----------------------- Bulk Product Import -----------------------
+#
+# Rows are streamed from CSV or JSONL input, validated and upserted one batch
+# at a time, so memory use depends on the batch size rather than the input
+# size. A row carrying an ``id`` updates that product (or creates it with that
+# id); a row without one creates a new product. ``sold_count`` is only taken
+# on insert, so re-importing a feed never resets sales counters.
+
+UPDATE_FIELDS = ['name', 'brand', 'description', 'price', 'quantity']
+MAX_REPORTED_ERRORS = 100
+
+
+class ProductImportSerializer(serializers.ModelSerializer):
+    id = serializers.IntegerField(required=False, min_value=1)
+
+    class Meta:
+        model = Product
+        fields = ['id', 'name', 'brand', 'description', 'price', 'quantity', 'sold_count']
+
+
+def read_rows(stream, fmt):
+    """Yield ``(line_number, row)`` pairs from a text stream of CSV or JSONL."""
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, {key: value for key, value in row.items() if value not in (None, '')}
+    elif fmt == 'jsonl':
+        for line_number, line in enumerate(stream, start=1):
+            if line.strip():
+                try:
+                    yield line_number, json.loads(line)
+                except ValueError as e:
+                    yield line_number, e
+    else:
+        raise ValueError(f"Unsupported import format '{fmt}'")
+
+
+def _upsert(products):
+    kwargs = {'update_conflicts': True, 'update_fields': UPDATE_FIELDS}
+    if connection.features.supports_update_conflicts_with_target:
+        kwargs['unique_fields'] = ['id']
+    # A feed may repeat an id within one batch; the last occurrence wins.
+    keyed = {product.id: product for product in products if product.id}
+    products = [product for product in products if not product.id] + list(keyed.values())
+    ids = list(keyed)
+    with transaction.atomic():
+        before = {
+            row['id']: facet_values(Product(**row))
+            for row in Product.objects.filter(id__in=ids).values('id', 'brand', 'price', 'quantity')
+        }
+        Product.objects.bulk_create(products, **kwargs)
+        catalog.record_product_changes(
+            (product.id, before.get(product.id), facet_values(product)) for product in products
+        )
+        inventory.redistribute(ids)
+
+
+def import_products(stream, fmt, batch_size=1000):
+    """
+    Import products from ``stream`` and return a summary with the number of
+    rows processed, upserted and rejected, throughput, and details for up to
+    MAX_REPORTED_ERRORS rejected rows.
+    """
+    started = time.perf_counter()
+    rows = read_rows(stream, fmt)
+    summary = {'processed': 0, 'upserted': 0, 'rejected': 0, 'errors': []}
+
+    while True:
+        chunk = list(islice(rows, batch_size))
+        if not chunk:
+            break
+
+        valid = []
+        for line_number, row in chunk:
+            if isinstance(row, Exception):
+                errors = {'non_field_errors': [str(row)]}
+            else:
+                serializer = ProductImportSerializer(data=row)
+                errors = None if serializer.is_valid() else serializer.errors
+            if errors:
+                summary['rejected'] += 1
+                if len(summary['errors']) < MAX_REPORTED_ERRORS:
+                    summary['errors'].append({'line': line_number, 'errors': errors})
+                continue
+            valid.append(Product(**serializer.validated_data))
+
+        if valid:
+            _upsert(valid)
+        summary['processed'] += len(chunk)
+        summary['upserted'] += len(valid)
+
+    elapsed = time.perf_counter() - started
+    summary['seconds'] = round(elapsed, 3)
+    summary['rows_per_second'] = round(summary['processed'] / elapsed, 1) if elapsed else 0.0
+    return summary
+
+
+def open_text(binary_file, encoding='utf-8'):
+    """Wrap an uploaded (binary) file so it can be streamed line by line."""
+    return io.TextIOWrapper(binary_file, encoding=encoding, newline='')
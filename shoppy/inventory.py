@@ -0,0 +1,202 @@
+import random
+
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import F, Sum
+
+from .facets import facet_values
+from .leaderboard import record_sale
+from .models import Product, StockShard
+from . import catalog
+
+
+# ----------------------- Sharded Inventory -----------------------
+#
+# A hot product can have its stock split across N StockShard rows
+# (`manage.py shard_stock <id> --shards N`). Checkout then decrements a
+# random shard that still has stock instead of the single Product row, so
+# concurrent checkouts of that product mostly lock different rows.
+#
+# While a product is sharded its shards are the source of truth:
+#
+#   stock      = sum(shard.quantity)
+#   sold_count = Product.sold_count + sum(shard.sold_count)
+#
+# Product.quantity / sold_count are a mirror that sync() refreshes. That
+# happens when a product sells out (so the in-stock facet flips at once)
+# and whenever `manage.py shard_stock --sync` runs; everything that filters
+# on Product.quantity (facets, search, the catalog cache) sees the mirror,
+# while the listing, detail and dashboard read the shard sums.
+#
+# Writes that set a sharded product's quantity outright (update, bulk
+# update, import, restock) go to Product first and are then spread back
+# over the shards by redistribute().
+#
+# `shard_stock` runs in its own process, so whether a product is sharded is
+# read from StockShard by everything that moves stock (checkout, holds,
+# sync, redistribute). sharded_ids() is a per-process hint with a short
+# timeout and only decides which products the listing and dashboard
+# overlay.
+
+SHARDED_KEY = 'inventory:sharded'
+SHARDED_TIMEOUT = 30
+MAX_PASSES = 3
+
+
+def _cache():
+    return caches[catalog.CACHE_ALIAS]
+
+
+def sharded_ids():
+    """Return the IDs of sharded products, cached briefly; for display reads only."""
+    ids = _cache().get(SHARDED_KEY)
+    if ids is None:
+        ids = frozenset(StockShard.objects.values_list('product_id', flat=True).distinct())
+        _cache().add(SHARDED_KEY, ids, SHARDED_TIMEOUT)
+    return ids
+
+
+def sharded(product_ids):
+    """Return the IDs in ``product_ids`` that have shards, read from the database."""
+    return set(StockShard.objects.filter(product_id__in=product_ids).values_list('product_id', flat=True).distinct())
+
+
+def forget_sharded():
+    transaction.on_commit(lambda: _cache().delete(SHARDED_KEY))
+
+
+def lock_for_holds(product_ids):
+    """
+    Lock the first shard of each sharded product in ``product_ids`` and
+    return their IDs. Holds on a sharded product are serialized on that row
+    instead of its Product row, which stays free for the rest of the sale.
+    """
+    return set(StockShard.objects.select_for_update().filter(product_id__in=product_ids, index=0)
+               .order_by('product_id').values_list('product_id', flat=True))
+
+
+def _split(total, shards):
+    base, extra = divmod(total, shards)
+    return [base + (1 if index < extra else 0) for index in range(shards)]
+
+
+def totals(product_ids):
+    """Return ``{product_id: (stock, unsynced sold)}`` for the sharded products in ``product_ids``."""
+    ids = list(product_ids)
+    if not ids:
+        return {}
+    rows = (StockShard.objects.filter(product_id__in=ids).values('product_id')
+            .annotate(stock=Sum('quantity'), sold=Sum('sold_count')).values_list('product_id', 'stock', 'sold'))
+    return {product_id: (stock, sold) for product_id, stock, sold in rows}
+
+
+def overlay(products):
+    """Return serialized ``products`` with sharded ones carrying their live stock and sold_count."""
+    ids = sharded_ids()
+    live = totals([product["id"] for product in products if product["id"] in ids])
+    if not live:
+        return products
+    return [
+        dict(product, quantity=live[product["id"]][0], sold_count=product["sold_count"] + live[product["id"]][1])
+        if product["id"] in live else product
+        for product in products
+    ]
+
+
+def take(product_id, quantity, sold_out=None):
+    """
+    Take ``quantity`` units of a sharded product from random shards, falling
+    back to the others (and spanning several when one does not hold enough).
+    Returns False, having taken nothing that outlives the caller's
+    transaction, when the shards cannot cover it. The product is added to
+    ``sold_out`` when this take is the one that sold it out.
+    """
+    remaining = quantity
+    for _ in range(MAX_PASSES):
+        shards = list(StockShard.objects.filter(product_id=product_id, quantity__gt=0).values_list('id', 'quantity'))
+        if sum(stock for _, stock in shards) < remaining:
+            return False
+        random.shuffle(shards)
+        for shard_id, stock in shards:
+            amount = min(remaining, stock)
+            if StockShard.objects.filter(id=shard_id, quantity__gte=amount).update(
+                    quantity=F('quantity') - amount, sold_count=F('sold_count') + amount):
+                remaining -= amount
+                if not remaining:
+                    break
+        if not remaining:
+            break
+    else:
+        return False
+
+    if not StockShard.objects.filter(product_id=product_id, quantity__gt=0).exists():
+        _sync([product_id], sold_out=sold_out)
+    return True
+
+
+def _sync(product_ids, redistribute=False, sold_out=None):
+    """
+    Fold shard counts into Product for ``product_ids``. With ``redistribute``
+    the Product quantity wins instead and is spread back over the shards.
+    Products whose mirror this sync takes to 0 are added to ``sold_out``.
+    """
+    with transaction.atomic():
+        shards = list(StockShard.objects.select_for_update().filter(product_id__in=product_ids)
+                      .order_by('product_id', 'index'))
+        if not shards:
+            return []
+        by_product = {}
+        for shard in shards:
+            by_product.setdefault(shard.product_id, []).append(shard)
+        products = Product.objects.select_for_update().in_bulk(list(by_product))
+
+        changes = []
+        for product_id, product_shards in by_product.items():
+            product = products[product_id]
+            before = facet_values(product)
+            sold = sum(shard.sold_count for shard in product_shards)
+            product.sold_count += sold
+            if redistribute:
+                for shard, stock in zip(product_shards, _split(product.quantity, len(product_shards))):
+                    shard.quantity = stock
+            else:
+                mirrored = product.quantity
+                product.quantity = sum(shard.quantity for shard in product_shards)
+                if sold_out is not None and mirrored > 0 and not product.quantity:
+                    sold_out.add(product_id)
+            for shard in product_shards:
+                shard.sold_count = 0
+            changes.append((product_id, before, facet_values(product)))
+            if sold:
+                record_sale(product)
+
+        Product.objects.bulk_update(products.values(), ['quantity', 'sold_count'])
+        StockShard.objects.bulk_update(shards, ['quantity', 'sold_count'])
+        catalog.record_product_changes(changes)
+    return list(products.values())
+
+
+def sync(product_ids=None):
+    """Refresh the Product mirror of sharded products (all of them by default); return them."""
+    if product_ids is None:
+        product_ids = StockShard.objects.values_list('product_id', flat=True).distinct()
+    return _sync(list(product_ids))
+
+
+def redistribute(product_ids):
+    """Spread the just-written Product.quantity of any sharded ``product_ids`` over their shards."""
+    _sync(list(product_ids), redistribute=True)
+
+
+def shard_product(product_id, shards):
+    """Split a product's stock over ``shards`` counter rows; ``shards <= 1`` folds it back into Product."""
+    with transaction.atomic():
+        _sync([product_id])
+        StockShard.objects.filter(product_id=product_id).delete()
+        if shards > 1:
+            quantity = Product.objects.select_for_update().values_list('quantity', flat=True).get(id=product_id)
+            StockShard.objects.bulk_create([
+                StockShard(product_id=product_id, index=index, quantity=stock)
+                for index, stock in enumerate(_split(quantity, shards))
+            ])
+        forget_sharded()
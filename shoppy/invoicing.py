@@ -0,0 +1,181 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from types import SimpleNamespace
+
+import django
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.db.models import Prefetch
+
+from .models import Invoice, Order, OrderItem
+from .pricing import quote_cart
+from .utils import generate_invoice_pdf
+
+
+# ----------------------- Bulk Invoice Regeneration -----------------------
+#
+# regenerate() re-renders the invoices of many orders (see `manage.py
+# regenerate_invoices`). Orders are read in keyset chunks by ascending ID
+# with their items and products prefetched, and every chunk is turned into
+# plain snapshots that a process pool renders, since PDF layout is CPU bound
+# and needs no database. The parent then writes the chunk's files and
+# creates or updates its Invoice rows in bulk, in one transaction, and
+# reports the last order ID done so an interrupted run can resume after it.
+#
+# Amounts are recomputed by the pricing engine from the order's own lines,
+# so the PDF shows the same breakdown checkout would produce today. Orders
+# only store their total, so an order whose stored total differs from that
+# breakdown is skipped rather than printed with lines that do not add up;
+# `--reprice` stores the recomputed total and renders those too.
+#
+# New files are written under fresh names and the files they replace are
+# only deleted once the chunk's rows have committed, so a failed chunk
+# leaves every Invoice pointing at a file that still exists.
+
+
+def invoice_orders(since=None, until=None, user_id=None, min_id=None, max_id=None):
+    """Orders matching the given filters; dates bound ``created_at`` and both ID bounds are inclusive."""
+    orders = Order.objects.all()
+    if since is not None:
+        orders = orders.filter(created_at__gte=since)
+    if until is not None:
+        orders = orders.filter(created_at__lt=until)
+    if user_id is not None:
+        orders = orders.filter(user_id=user_id)
+    if min_id is not None:
+        orders = orders.filter(id__gte=min_id)
+    if max_id is not None:
+        orders = orders.filter(id__lte=max_id)
+    return orders
+
+
+def _chunks(orders, chunk_size, after_id):
+    items = Prefetch('items', queryset=OrderItem.objects.select_related('product').order_by('id'))
+    while True:
+        chunk = list(orders.filter(id__gt=after_id).select_related('user').prefetch_related(items)
+                     .order_by('id')[:chunk_size])
+        if not chunk:
+            return
+        yield chunk
+        after_id = chunk[-1].id
+
+
+def _snapshot(order, reprice):
+    """Everything rendering ``order`` needs, as picklable plain objects."""
+    items = [
+        SimpleNamespace(product=SimpleNamespace(name=item.product.name), price=item.price, quantity=item.quantity)
+        for item in order.items.all()
+    ]
+    quote = quote_cart([(item.product_id, item.quantity) for item in order.items.all()], order.payment_mode,
+                       order.distance, prices={item.product_id: item.price for item in order.items.all()})
+    total = quote['total'] if reprice else order.total
+    return SimpleNamespace(
+        id=order.id, user=SimpleNamespace(email=order.user.email), total=total,
+        dispatch_address=order.dispatch_address, dispatch_phone=order.dispatch_phone, items=items,
+        payment_mode=order.payment_mode, quote=quote
+    )
+
+
+def render(snapshot):
+    quote = snapshot.quote
+    return snapshot.id, generate_invoice_pdf(
+        snapshot, snapshot.items, quote['subtotal'], quote['shipping_fee'], snapshot.payment_mode,
+        quote['gst_amount'], quote['cod_surcharge']
+    )
+
+
+def _delete_files(storage, names):
+    for name in names:
+        if storage.exists(name):
+            storage.delete(name)
+
+
+def _save(orders, pdfs, reprice):
+    """Write the chunk's PDFs and create or update its Invoice rows."""
+    field = Invoice._meta.get_field('pdf_file')
+    storage = field.storage
+    existing = {}
+    for invoice in Invoice.objects.filter(order__in=orders).order_by('id'):
+        existing.setdefault(invoice.order_id, invoice)
+
+    created, updated, written, replaced = [], [], [], []
+    try:
+        for order in orders:
+            filename = f"invoice_{order.id}.pdf"
+            # The storage picks a free name, so the current file is never overwritten.
+            saved = storage.save(field.generate_filename(None, filename), ContentFile(pdfs[order.id]))
+            written.append(saved)
+            invoice = existing.get(order.id)
+            if invoice:
+                if invoice.pdf_file.name:
+                    replaced.append(invoice.pdf_file.name)
+                invoice.pdf_file.name, invoice.total = saved, order.total
+                updated.append(invoice)
+            else:
+                created.append(Invoice(order=order, user=order.user, invoice_id=filename, total=order.total,
+                                       pdf_file=saved))
+
+        with transaction.atomic():
+            if reprice:
+                Order.objects.bulk_update(orders, ['total'])
+            Invoice.objects.bulk_create(created)
+            Invoice.objects.bulk_update(updated, ['pdf_file', 'total'])
+            transaction.on_commit(lambda: _delete_files(storage, replaced))
+    except BaseException:
+        _delete_files(storage, written)
+        raise
+    return len(created), len(updated)
+
+
+def regenerate(orders, chunk_size=200, workers=None, after_id=0, reprice=False, on_chunk=None):
+    """
+    Re-render the invoices of ``orders`` with an ID above ``after_id``, in
+    ``chunk_size`` chunks on ``workers`` processes (0 renders in this
+    process). With ``reprice`` the orders' totals are also set to the
+    recomputed quote; without it, orders whose stored total differs from the
+    quote are skipped. ``on_chunk(last_order_id, summary)`` runs after every
+    chunk is saved. Returns a summary of orders rendered, invoices created
+    and updated, orders skipped, and throughput.
+    """
+    started = time.perf_counter()
+    summary = {'orders': 0, 'created': 0, 'updated': 0, 'skipped': 0}
+    workers = os.cpu_count() if workers is None else workers
+    pool = None
+    if workers:
+        # Spawned rather than forked, so workers never inherit the parent's
+        # database connections; they only render and need no database.
+        pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                                   initializer=django.setup)
+    try:
+        for chunk in _chunks(orders, chunk_size, after_id):
+            last_id = chunk[-1].id
+            snapshots = [_snapshot(order, reprice) for order in chunk]
+            if not reprice:
+                kept = [(order, snapshot) for order, snapshot in zip(chunk, snapshots)
+                        if snapshot.quote['total'] == order.total]
+                summary['skipped'] += len(chunk) - len(kept)
+                chunk, snapshots = [order for order, _ in kept], [snapshot for _, snapshot in kept]
+            if pool:
+                rendered = pool.map(render, snapshots, chunksize=max(1, len(snapshots) // (workers * 4)))
+            else:
+                rendered = map(render, snapshots)
+            pdfs = dict(rendered)
+            if reprice:
+                for order, snapshot in zip(chunk, snapshots):
+                    order.total = snapshot.total
+            created, updated = _save(chunk, pdfs, reprice) if chunk else (0, 0)
+            summary['orders'] += len(chunk)
+            summary['created'] += created
+            summary['updated'] += updated
+            if on_chunk:
+                on_chunk(last_id, summary)
+    finally:
+        if pool:
+            pool.shutdown(cancel_futures=True)
+
+    elapsed = time.perf_counter() - started
+    summary['seconds'] = round(elapsed, 3)
+    summary['orders_per_second'] = round(summary['orders'] / elapsed, 1) if elapsed else 0.0
+    return summary
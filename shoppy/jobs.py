@@ -0,0 +1,146 @@
+import traceback
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Invoice, Job, Order
+from .utils import generate_invoice_pdf, save_invoice_pdf_to_model, send_invoice_email, get_logger
+
+_logger = get_logger()
+
+
+# ----------------------- Job Queue -----------------------
+#
+# Slow side effects of a request (rendering and emailing invoices) are stored
+# as Job rows and run by `manage.py run_workers`. A job is enqueued in the
+# same transaction as the rows it refers to, so workers only see it once that
+# transaction commits, and it is never lost if the request dies after commit.
+#
+# Workers claim a job with a conditional UPDATE on its status, so any number
+# of worker threads or processes can poll the same table. A job that raises
+# is retried after BACKOFF_BASE * 2 ** (attempts - 1) seconds (capped at
+# BACKOFF_MAX) until it has been tried max_attempts times, then marked failed.
+# A job left running by a dead worker is claimed again after LOCK_TIMEOUT.
+# A handler that raises JobNotReady is waiting on another job, not failing:
+# it is tried again after BACKOFF_BASE seconds and the attempt is not counted.
+
+RENDER_INVOICE = 'render_invoice'
+EMAIL_INVOICE = 'email_invoice'
+
+BACKOFF_BASE = 5
+BACKOFF_MAX = 600
+LOCK_TIMEOUT = timedelta(minutes=10)
+
+HANDLERS = {}
+
+
+class JobNotReady(Exception):
+    """Raised by a handler whose input is not there yet; the job is retried."""
+
+
+def handler(kind):
+    def register(func):
+        HANDLERS[kind] = func
+        return func
+    return register
+
+
+def enqueue(kind, max_attempts=5, **payload):
+    if kind not in HANDLERS:
+        raise ValueError(f"Unknown job kind '{kind}'")
+    return Job.objects.create(kind=kind, payload=payload, max_attempts=max_attempts)
+
+
+def backoff(attempts):
+    return timedelta(seconds=min(BACKOFF_BASE * 2 ** (attempts - 1), BACKOFF_MAX))
+
+
+def claim(limit=10):
+    """Mark up to ``limit`` due jobs as running and return them."""
+    now = timezone.now()
+    due = Q(status=Job.STATUS_PENDING, run_after__lte=now) | Q(
+        status=Job.STATUS_RUNNING, locked_at__lt=now - LOCK_TIMEOUT
+    )
+    claimed = []
+    for job_id, status, locked_at in (
+            Job.objects.filter(due).order_by('run_after', 'id').values_list('id', 'status', 'locked_at')[:limit]):
+        # Only the worker whose UPDATE still sees the row as we read it gets it.
+        if Job.objects.filter(id=job_id, status=status, locked_at=locked_at).update(
+                status=Job.STATUS_RUNNING, locked_at=now, attempts=F('attempts') + 1):
+            claimed.append(job_id)
+    return list(Job.objects.filter(id__in=claimed).order_by('run_after', 'id'))
+
+
+def run_job(job):
+    """Run one claimed job and record its outcome."""
+    try:
+        HANDLERS[job.kind](**job.payload)
+    except JobNotReady as e:
+        job.attempts -= 1
+        job.status = Job.STATUS_PENDING
+        job.run_after = timezone.now() + timedelta(seconds=BACKOFF_BASE)
+        job.last_error = str(e)
+        _logger.info("Job %s not ready, retrying: %s", job.id, str(e))
+    except Exception as e:
+        job.last_error = traceback.format_exc()
+        if job.attempts >= job.max_attempts:
+            job.status = Job.STATUS_FAILED
+            job.finished_at = timezone.now()
+            _logger.error("Job %s failed after %s attempts: %s", job.id, job.attempts, str(e))
+        else:
+            job.status = Job.STATUS_PENDING
+            job.run_after = timezone.now() + backoff(job.attempts)
+            _logger.warning("Job %s attempt %s failed, retrying: %s", job.id, job.attempts, str(e))
+    else:
+        job.status = Job.STATUS_SUCCEEDED
+        job.finished_at = timezone.now()
+        job.last_error = ''
+    job.locked_at = None
+    job.save(update_fields=['status', 'attempts', 'run_after', 'locked_at', 'last_error', 'finished_at'])
+    return job
+
+
+def run_pending(limit=10):
+    """Claim and run up to ``limit`` due jobs; return how many ran."""
+    jobs = claim(limit)
+    for job in jobs:
+        run_job(job)
+    return len(jobs)
+
+
+# ----------------------- Invoice Jobs -----------------------
+
+def enqueue_invoice(order, quote, payment_mode):
+    """Queue rendering and emailing of ``order``'s invoice (priced by ``quote``); return ``{kind: job_id}``."""
+    render = enqueue(
+        RENDER_INVOICE, order_id=order.id, total_amount=str(quote['subtotal']),
+        shipping_fee=str(quote['shipping_fee']), payment_mode=payment_mode, gst_amount=str(quote['gst_amount']),
+        cod_surcharge=str(quote['cod_surcharge'])
+    )
+    email = enqueue(EMAIL_INVOICE, order_id=order.id)
+    return {RENDER_INVOICE: render.id, EMAIL_INVOICE: email.id}
+
+
+@handler(RENDER_INVOICE)
+def render_invoice(order_id, total_amount, shipping_fee, payment_mode, gst_amount, cod_surcharge):
+    if Invoice.objects.filter(order_id=order_id).exists():
+        return
+    order = Order.objects.select_related('user').get(id=order_id)
+    pdf = generate_invoice_pdf(
+        order, order.items.select_related('product').iterator(chunk_size=500), Decimal(total_amount),
+        Decimal(shipping_fee), payment_mode, Decimal(gst_amount), Decimal(cod_surcharge)
+    )
+    save_invoice_pdf_to_model(order, pdf)
+
+
+@handler(EMAIL_INVOICE)
+def email_invoice(order_id):
+    invoice = Invoice.objects.select_related('user').filter(order_id=order_id).first()
+    if not invoice:
+        if Job.objects.filter(kind=RENDER_INVOICE, payload__order_id=order_id, status=Job.STATUS_FAILED).exists():
+            raise RuntimeError(f"Invoice for order {order_id} failed to render")
+        raise JobNotReady(f"Invoice for order {order_id} is not rendered yet")
+    with invoice.pdf_file.open('rb') as pdf:
+        send_invoice_email(invoice.user.email, pdf.read(), order_id)
@@ -0,0 +1,93 @@
+from django.db import IntegrityError, transaction
+
+from .models import BestSeller, Product
+
+
+# ----------------------- Best Sellers -----------------------
+#
+# BestSeller keeps at most TOP_K rows per scope (the whole catalog, and each
+# brand). The order views feed every sale into it as they bump sold_count,
+# so reading the leaderboard only ever touches those few rows.
+#
+# Rows leave the table when their product is deleted; product updates move
+# a product between brand leaderboards with record_brand_change(). Imports
+# do not, so `manage.py rebuild_best_sellers` refills the table from Product
+# after those.
+
+TOP_K = 100
+ALL = ''
+
+
+def _record(scope, product):
+    if BestSeller.objects.filter(scope=scope, product=product).update(sold_count=product.sold_count):
+        return
+
+    ranked = BestSeller.objects.filter(scope=scope)
+    if ranked.count() >= TOP_K:
+        lowest = ranked.order_by('sold_count', '-id').first()
+        if product.sold_count <= lowest.sold_count:
+            return
+        lowest.delete()
+    try:
+        with transaction.atomic():
+            BestSeller.objects.create(scope=scope, product=product, sold_count=product.sold_count)
+    except IntegrityError:
+        # A concurrent order inserted this product first.
+        BestSeller.objects.filter(scope=scope, product=product).update(sold_count=product.sold_count)
+
+
+def record_sale(product):
+    """Reflect ``product``'s new sold_count in the global and brand leaderboards."""
+    if product.sold_count <= 0:
+        return
+    _record(ALL, product)
+    _record(product.brand, product)
+
+
+def _ranked(brand=None):
+    products = Product.objects.filter(sold_count__gt=0)
+    if brand is not None:
+        products = products.filter(brand=brand)
+    return products.order_by('-sold_count', 'id').values_list('id', 'sold_count')[:TOP_K]
+
+
+def record_brand_change(product, old_brand):
+    """Move ``product`` from ``old_brand``'s leaderboard to the one of its current brand."""
+    if old_brand == product.brand:
+        return
+    if BestSeller.objects.filter(scope=old_brand, product=product).delete()[0]:
+        # The product held one of old_brand's TOP_K places; refill it from Product.
+        BestSeller.objects.filter(scope=old_brand).delete()
+        BestSeller.objects.bulk_create([
+            BestSeller(scope=old_brand, product_id=product_id, sold_count=sold_count)
+            for product_id, sold_count in _ranked(old_brand)
+        ])
+    if product.sold_count > 0:
+        _record(product.brand, product)
+
+
+def top_sellers(brand=None, limit=10):
+    """Return ``(product_id, sold_count)`` pairs, best first."""
+    limit = min(limit, TOP_K)
+    return list(
+        BestSeller.objects.filter(scope=brand or ALL)
+        .order_by('-sold_count', 'product_id')
+        .values_list('product_id', 'sold_count')[:limit]
+    )
+
+
+def rebuild_best_sellers():
+    """Recompute every leaderboard from Product.sold_count."""
+    rows = [
+        BestSeller(scope=ALL, product_id=product_id, sold_count=sold_count) for product_id, sold_count in _ranked()
+    ]
+    brands = Product.objects.filter(sold_count__gt=0).values_list('brand', flat=True).distinct()
+    for brand in brands.iterator():
+        rows.extend(
+            BestSeller(scope=brand, product_id=product_id, sold_count=sold_count)
+            for product_id, sold_count in _ranked(brand)
+        )
+    with transaction.atomic():
+        BestSeller.objects.all().delete()
+        BestSeller.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
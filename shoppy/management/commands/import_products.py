@@ -0,0 +1,37 @@
+import json
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from shoppy.importer import import_products
+
+
+class Command(BaseCommand):
+    help = "Stream products from a CSV or JSONL file and upsert them in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="CSV or JSONL file to import")
+        parser.add_argument('--format', choices=['csv', 'jsonl'], help="Defaults to the file extension")
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--encoding', default='utf-8')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or os.path.splitext(path)[1].lstrip('.').lower()
+        if fmt not in ('csv', 'jsonl'):
+            raise CommandError("Cannot infer the format from the file name; pass --format csv|jsonl")
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size must be at least 1")
+
+        with open(path, encoding=options['encoding'], newline='') as stream:
+            summary = import_products(stream, fmt, batch_size=options['batch_size'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Processed {summary['processed']} rows in {summary['seconds']}s "
+            f"({summary['rows_per_second']} rows/s): "
+            f"{summary['upserted']} upserted, {summary['rejected']} rejected"
+        ))
+        for error in summary['errors']:
+            self.stdout.write(f"  line {error['line']}: {json.dumps(error['errors'])}")
+        if summary['rejected'] > len(summary['errors']):
+            self.stdout.write(f"  ... {summary['rejected'] - len(summary['errors'])} more rejected rows not shown")
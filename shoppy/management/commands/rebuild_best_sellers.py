@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from shoppy.leaderboard import rebuild_best_sellers
+
+
+class Command(BaseCommand):
+    help = "Recompute the best-seller leaderboards from Product.sold_count."
+
+    def handle(self, *args, **options):
+        count = rebuild_best_sellers()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt best sellers: {count} ranked rows"))
@@ -0,0 +1,83 @@
+import json
+import os
+from datetime import datetime, time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from shoppy.invoicing import invoice_orders, regenerate
+
+
+def _date(value):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise CommandError(f"Invalid date '{value}', expected YYYY-MM-DD")
+
+
+def _start_of(day):
+    return timezone.make_aware(datetime.combine(day, time.min)) if day else None
+
+
+class Command(BaseCommand):
+    help = "Re-render the PDF invoices of historical orders in parallel, optionally resuming an earlier run."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since', type=_date, help="Orders placed on or after this date (YYYY-MM-DD)")
+        parser.add_argument('--until', type=_date, help="Orders placed before this date (YYYY-MM-DD)")
+        parser.add_argument('--user', type=int, dest='user_id', help="Only this user's orders")
+        parser.add_argument('--min-id', type=int, help="Lowest order ID, inclusive")
+        parser.add_argument('--max-id', type=int, help="Highest order ID, inclusive")
+        parser.add_argument('--chunk-size', type=int, default=200, help="Orders fetched, rendered and saved together")
+        parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                            help="Rendering processes; 0 renders in this process")
+        parser.add_argument('--reprice', action='store_true',
+                            help="Also store the recomputed total on each order")
+        parser.add_argument('--checkpoint',
+                            help="JSON file recording progress; an interrupted run with the same options "
+                                 "resumes after the last saved chunk, and the file is removed once done")
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1 or options['workers'] < 0:
+            raise CommandError("--chunk-size must be at least 1 and --workers at least 0")
+        filters = {key: options[key] for key in ('since', 'until', 'user_id', 'min_id', 'max_id')}
+        orders = invoice_orders(**dict(filters, since=_start_of(filters['since']), until=_start_of(filters['until'])))
+        # Dates are kept as strings so the checkpoint can be compared with a later run's options.
+        filters.update({key: filters[key].isoformat() for key in ('since', 'until') if filters[key]})
+        filters['reprice'] = options['reprice']
+
+        checkpoint = options['checkpoint']
+        after_id = 0
+        if checkpoint and os.path.exists(checkpoint):
+            with open(checkpoint) as stream:
+                state = json.load(stream)
+            if state['filters'] != filters:
+                raise CommandError(f"{checkpoint} was written by a run with other options; delete it to start over")
+            after_id = state['last_order_id']
+            self.stdout.write(f"Resuming after order {after_id}")
+
+        def on_chunk(last_order_id, summary):
+            if checkpoint:
+                with open(f"{checkpoint}.tmp", 'w') as stream:
+                    json.dump({'filters': filters, 'last_order_id': last_order_id}, stream)
+                os.replace(f"{checkpoint}.tmp", checkpoint)
+            self.stdout.write(f"  {summary['orders']} orders done, through order {last_order_id}")
+
+        try:
+            summary = regenerate(orders, chunk_size=options['chunk_size'], workers=options['workers'],
+                                 after_id=after_id, reprice=options['reprice'], on_chunk=on_chunk)
+        except KeyboardInterrupt:
+            raise CommandError("Interrupted; rerun with the same options and --checkpoint to resume"
+                               if checkpoint else "Interrupted")
+        if checkpoint and os.path.exists(checkpoint):
+            os.remove(checkpoint)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Regenerated {summary['orders']} invoices in {summary['seconds']}s "
+            f"({summary['orders_per_second']} orders/s): {summary['created']} created, {summary['updated']} updated"
+        ))
+        if summary['skipped']:
+            self.stdout.write(self.style.WARNING(
+                f"Skipped {summary['skipped']} orders whose stored total differs from the recomputed one; "
+                f"rerun with --reprice to store the recomputed totals"
+            ))
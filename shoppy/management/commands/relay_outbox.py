@@ -0,0 +1,37 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from shoppy import outbox
+
+
+class Command(BaseCommand):
+    help = "Deliver outbox events (order and shipment notifications) to their subscribers."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100, help="Events claimed per batch")
+        parser.add_argument('--poll-interval', type=float, default=1.0, help="Seconds to sleep when idle")
+        parser.add_argument('--once', action='store_true', help="Exit once no event is due")
+        parser.add_argument('--purge-days', type=int, default=7,
+                            help="Delete events published more than this many days ago when idle; 0 keeps them")
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size must be at least 1")
+        relayed = purged = 0
+        try:
+            while True:
+                count = outbox.relay(options['batch_size'])
+                relayed += count
+                if count:
+                    continue
+                if options['purge_days']:
+                    purged += outbox.purge(timezone.now() - timedelta(days=options['purge_days']))
+                if options['once']:
+                    break
+                time.sleep(options['poll_interval'])
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(self.style.SUCCESS(f"Relayed {relayed} events, purged {purged}"))
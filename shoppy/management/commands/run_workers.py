@@ -0,0 +1,55 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from shoppy.jobs import run_pending
+
+
+class Command(BaseCommand):
+    help = "Run background jobs (invoice rendering and email) from the job table."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4, help="Worker threads; 1 runs in this thread")
+        parser.add_argument('--batch-size', type=int, default=10, help="Jobs claimed per poll")
+        parser.add_argument('--poll-interval', type=float, default=1.0, help="Seconds to sleep when idle")
+        parser.add_argument('--once', action='store_true', help="Exit once no job is due")
+
+    def handle(self, *args, **options):
+        if options['workers'] < 1 or options['batch_size'] < 1:
+            raise CommandError("--workers and --batch-size must be at least 1")
+        stop = threading.Event()
+        counts = []
+
+        def work():
+            ran = 0
+            try:
+                while not stop.is_set():
+                    count = run_pending(options['batch_size'])
+                    ran += count
+                    if not count:
+                        if options['once']:
+                            break
+                        stop.wait(options['poll_interval'])
+            finally:
+                counts.append(ran)
+                if threading.current_thread() is not threading.main_thread():
+                    connection.close()
+
+        if options['workers'] == 1:
+            try:
+                work()
+            except KeyboardInterrupt:
+                pass
+        else:
+            with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+                futures = [pool.submit(work) for _ in range(options['workers'])]
+                try:
+                    for future in futures:
+                        future.result()
+                except KeyboardInterrupt:
+                    # Let every worker finish its current batch, then exit.
+                    stop.set()
+
+        self.stdout.write(self.style.SUCCESS(f"Ran {sum(counts)} jobs"))
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from shoppy.inventory import shard_product, sync
+from shoppy.models import Product
+
+
+class Command(BaseCommand):
+    help = "Split hot products' stock across counter rows, or refresh the Product mirror of sharded products."
+
+    def add_arguments(self, parser):
+        parser.add_argument('product_ids', nargs='*', type=int)
+        parser.add_argument('--shards', type=int, help="Number of shards; 1 turns sharding off")
+        parser.add_argument('--sync', action='store_true',
+                            help="Fold shard counts into Product for every sharded product (run periodically)")
+
+    def handle(self, *args, **options):
+        if options['sync']:
+            products = sync()
+            self.stdout.write(self.style.SUCCESS(f"Synced {len(products)} sharded products"))
+            return
+
+        if not options['product_ids'] or not options['shards'] or options['shards'] < 1:
+            raise CommandError("Pass product IDs and --shards N (N >= 1), or --sync")
+        missing = set(options['product_ids']) - set(
+            Product.objects.filter(id__in=options['product_ids']).values_list('id', flat=True)
+        )
+        if missing:
+            raise CommandError(f"Unknown product IDs: {sorted(missing)}")
+
+        for product_id in options['product_ids']:
+            shard_product(product_id, options['shards'])
+        state = f"split into {options['shards']} shards" if options['shards'] > 1 else "unsharded"
+        self.stdout.write(self.style.SUCCESS(f"{len(options['product_ids'])} products {state}"))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from shoppy.reservations import sweep
+
+
+class Command(BaseCommand):
+    help = "Delete expired stock holds in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size must be at least 1")
+        deleted = sweep(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Swept {deleted} expired stock holds"))
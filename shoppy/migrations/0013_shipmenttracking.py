@@ -0,0 +1,28 @@
+# Generated by Django 5.2.5 on 2026-10-18 17:11
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shoppy', '0012_alter_order_invoice_id'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ShipmentTracking',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tracking_number', models.CharField(max_length=100, unique=True)),
+                ('carrier', models.CharField(max_length=100)),
+                ('estimated_delivery', models.DateField(blank=True, null=True)),
+                ('last_updated', models.DateTimeField(auto_now=True)),
+                ('status', models.CharField(choices=[('Label Created', 'Label Created'), ('Shipped', 'Shipped'), ('In Transit', 'In Transit'), ('Out for Delivery', 'Out for Delivery'), ('Delivered', 'Delivered'), ('Exception', 'Exception')], default='Label Created', max_length=50)),
+                ('current_location', models.CharField(blank=True, max_length=255, null=True)),
+                ('remarks', models.TextField(blank=True, null=True)),
+                ('order', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='tracking', to='shoppy.order')),
+            ],
+        ),
+    ]
@@ -0,0 +1,68 @@
+from django.db import migrations
+
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE shoppy_product_fts USING fts5(
+        name, brand, description,
+        content='shoppy_product', content_rowid='id'
+    )
+    """,
+    """
+    CREATE TRIGGER shoppy_product_fts_ai AFTER INSERT ON shoppy_product BEGIN
+        INSERT INTO shoppy_product_fts(rowid, name, brand, description)
+        VALUES (new.id, new.name, new.brand, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER shoppy_product_fts_ad AFTER DELETE ON shoppy_product BEGIN
+        INSERT INTO shoppy_product_fts(shoppy_product_fts, rowid, name, brand, description)
+        VALUES ('delete', old.id, old.name, old.brand, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER shoppy_product_fts_au AFTER UPDATE OF name, brand, description ON shoppy_product BEGIN
+        INSERT INTO shoppy_product_fts(shoppy_product_fts, rowid, name, brand, description)
+        VALUES ('delete', old.id, old.name, old.brand, old.description);
+        INSERT INTO shoppy_product_fts(rowid, name, brand, description)
+        VALUES (new.id, new.name, new.brand, new.description);
+    END
+    """,
+    "INSERT INTO shoppy_product_fts(shoppy_product_fts) VALUES ('rebuild')",
+]
+
+SQLITE_REVERSE = [
+    "DROP TRIGGER IF EXISTS shoppy_product_fts_au",
+    "DROP TRIGGER IF EXISTS shoppy_product_fts_ad",
+    "DROP TRIGGER IF EXISTS shoppy_product_fts_ai",
+    "DROP TABLE IF EXISTS shoppy_product_fts",
+]
+
+MYSQL_FORWARD = [
+    "ALTER TABLE shoppy_product ADD FULLTEXT INDEX shoppy_product_fulltext (name, brand, description)",
+]
+
+MYSQL_REVERSE = [
+    "ALTER TABLE shoppy_product DROP INDEX shoppy_product_fulltext",
+]
+
+
+def _run(statements_by_vendor):
+    def run(apps, schema_editor):
+        for sql in statements_by_vendor.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(sql)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shoppy', '0013_shipmenttracking'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            _run({'sqlite': SQLITE_FORWARD, 'mysql': MYSQL_FORWARD}),
+            _run({'sqlite': SQLITE_REVERSE, 'mysql': MYSQL_REVERSE}),
+        ),
+    ]
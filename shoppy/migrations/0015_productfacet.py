@@ -0,0 +1,63 @@
+# Generated by Django 5.2.5 on 2026-10-18 17:13
+
+from collections import Counter
+from decimal import Decimal
+
+from django.db import migrations, models
+
+
+# A copy of shoppy.facets as of this migration, so later changes to the app
+# code cannot change what this migration writes.
+PRICE_BANDS = [
+    ('0-500', Decimal('0'), Decimal('500')),
+    ('500-1000', Decimal('500'), Decimal('1000')),
+    ('1000-5000', Decimal('1000'), Decimal('5000')),
+    ('5000-10000', Decimal('5000'), Decimal('10000')),
+    ('10000-50000', Decimal('10000'), Decimal('50000')),
+    ('50000+', Decimal('50000'), None),
+]
+
+
+def price_band(price):
+    price = Decimal(price)
+    for label, low, high in PRICE_BANDS:
+        if price >= low and (high is None or price < high):
+            return label
+    return PRICE_BANDS[0][0]
+
+
+def populate_facets(apps, schema_editor):
+    Product = apps.get_model('shoppy', 'Product')
+    ProductFacet = apps.get_model('shoppy', 'ProductFacet')
+    counts = Counter()
+    for brand, price, quantity in Product.objects.values_list('brand', 'price', 'quantity').iterator():
+        counts[('brand', brand)] += 1
+        counts[('price_band', price_band(price))] += 1
+        counts[('in_stock', 'yes' if quantity > 0 else 'no')] += 1
+    ProductFacet.objects.bulk_create([
+        ProductFacet(facet=facet, value=value, count=count)
+        for (facet, value), count in counts.items()
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shoppy', '0014_product_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductFacet',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('facet', models.CharField(max_length=30)),
+                ('value', models.CharField(max_length=100)),
+                ('count', models.PositiveBigIntegerField(default=0)),
+            ],
+            options={
+                'unique_together': {('facet', 'value')},
+            },
+        ),
+        migrations.RunPython(populate_facets, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.5 on 2026-10-18 17:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+TOP_K = 100
+
+
+def populate_best_sellers(apps, schema_editor):
+    Product = apps.get_model('shoppy', 'Product')
+    BestSeller = apps.get_model('shoppy', 'BestSeller')
+    sold = Product.objects.filter(sold_count__gt=0).order_by('-sold_count', 'id')
+    rows = [
+        BestSeller(scope='', product_id=product_id, sold_count=sold_count)
+        for product_id, sold_count in sold.values_list('id', 'sold_count')[:TOP_K]
+    ]
+    for brand in sold.order_by().values_list('brand', flat=True).distinct():
+        rows.extend(
+            BestSeller(scope=brand, product_id=product_id, sold_count=sold_count)
+            for product_id, sold_count in sold.filter(brand=brand).values_list('id', 'sold_count')[:TOP_K]
+        )
+    BestSeller.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shoppy', '0016_catalogversion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BestSeller',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(blank=True, max_length=100)),
+                ('sold_count', models.PositiveBigIntegerField(default=0)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='shoppy.product')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['scope', '-sold_count'], name='shoppy_bestseller_rank_idx')],
+                'unique_together': {('scope', 'product')},
+            },
+        ),
+        migrations.RunPython(populate_best_sellers, migrations.RunPython.noop),
+    ]
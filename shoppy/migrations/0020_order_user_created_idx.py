@@ -0,0 +1,17 @@
+# Generated by Django 5.2.5 on 2026-10-18 17:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shoppy', '0019_idempotencykey'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['user', 'created_at'], name='shoppy_order_user_created_idx'),
+        ),
+    ]
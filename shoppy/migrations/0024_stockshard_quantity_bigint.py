@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-18 17:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shoppy', '0023_outboxevent'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='stockshard',
+            name='quantity',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+    ]
@@ -1,4 +1,6 @@
 from django.db import models
+from django.utils import timezone
+from django.core.serializers.json import DjangoJSONEncoder
 import uuid
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin
 
@@ -118,6 +120,9 @@ class Order(models.Model):
     distance = models.PositiveIntegerField(default=0)
     is_direct = models.BooleanField(default=False)
 
+    class Meta:
+        indexes = [models.Index(fields=['user', 'created_at'], name='shoppy_order_user_created_idx')]
+
     def save(self, *args, **kwargs):
         if not self.invoice_id:
             self.invoice_id = f"INV-{uuid.uuid4().hex[:10].upper()}"
@@ -157,8 +162,6 @@ class UserSession(models.Model):
 
     def __str__(self):
         return f"{self.user.email} - {self.ip_address}"
-<<<<<<< HEAD
-=======
 
 # -------------------- Shipment Tracking --------------------
 
@@ -186,4 +189,164 @@ class ShipmentTracking(models.Model):
     def __str__(self):
         return f"{self.order.invoice_id} - {self.tracking_number}"
 
->>>>>>> 987dbcd (Initial project setup with working Django e-commerce backend)
+# -------------------- Product Facets --------------------
+
+class ProductFacet(models.Model):
+    facet = models.CharField(max_length=30)
+    value = models.CharField(max_length=100)
+    count = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('facet', 'value')
+
+    def __str__(self):
+        return f"{self.facet}={self.value} ({self.count})"
+
+# -------------------- Catalog Version --------------------
+
+class CatalogVersion(models.Model):
+    version = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Catalog v{self.version}"
+
+# -------------------- Best Sellers --------------------
+
+class BestSeller(models.Model):
+    # '' ranks the whole catalog, any other value ranks one brand.
+    scope = models.CharField(max_length=100, blank=True)
+    product = models.ForeignKey(Product, on_delete=models.CASCADE)
+    sold_count = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('scope', 'product')
+        indexes = [models.Index(fields=['scope', '-sold_count'], name='shoppy_bestseller_rank_idx')]
+
+    def __str__(self):
+        return f"{self.scope or 'all'}: {self.product_id} ({self.sold_count})"
+
+# -------------------- Background Jobs --------------------
+
+class Job(models.Model):
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_SUCCEEDED = 'succeeded'
+    STATUS_FAILED = 'failed'
+
+    kind = models.CharField(max_length=50)
+    payload = models.JSONField(default=dict)
+    status = models.CharField(
+        max_length=20,
+        choices=[
+            (STATUS_PENDING, 'Pending'),
+            (STATUS_RUNNING, 'Running'),
+            (STATUS_SUCCEEDED, 'Succeeded'),
+            (STATUS_FAILED, 'Failed'),
+        ],
+        default=STATUS_PENDING
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['status', 'run_after'], name='shoppy_job_due_idx')]
+
+    def __str__(self):
+        return f"{self.kind} #{self.id} ({self.status})"
+
+# -------------------- Idempotency Keys --------------------
+
+class IdempotencyKey(models.Model):
+    scope = models.CharField(max_length=50)
+    # The caller the key belongs to, so two users can never share a key.
+    owner = models.CharField(max_length=64, default='')
+    key = models.CharField(max_length=255)
+    fingerprint = models.CharField(max_length=64)
+    # Both stay null while the first request with this key is in flight.
+    response_code = models.PositiveSmallIntegerField(null=True, blank=True)
+    response_body = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    # The in-flight request holding the key; once lease_expires_at passes, a retry may take it over.
+    lease = models.CharField(max_length=32, blank=True)
+    lease_expires_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        unique_together = ('scope', 'owner', 'key')
+
+    def __str__(self):
+        return f"{self.scope}:{self.owner}:{self.key}"
+
+# -------------------- Stock Holds --------------------
+
+class StockHold(models.Model):
+    product = models.ForeignKey(Product, on_delete=models.CASCADE)
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    quantity = models.PositiveIntegerField()
+    expires_at = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ('user', 'product')
+        indexes = [
+            # Active holds of a product are one range scan: expired rows sort before it.
+            models.Index(fields=['product', 'expires_at'], name='shoppy_hold_active_idx'),
+            models.Index(fields=['expires_at'], name='shoppy_hold_expiry_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} holds {self.quantity} x {self.product_id}"
+
+# -------------------- Stock Shards --------------------
+
+class StockShard(models.Model):
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='stock_shards')
+    index = models.PositiveSmallIntegerField()
+    quantity = models.PositiveBigIntegerField(default=0)
+    # Units sold from this shard that are not yet folded into Product.sold_count.
+    sold_count = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('product', 'index')
+
+    def __str__(self):
+        return f"{self.product_id}#{self.index}: {self.quantity}"
+
+# -------------------- Outbox Events --------------------
+
+class OutboxEvent(models.Model):
+    STATUS_PENDING = 'pending'
+    STATUS_PUBLISHED = 'published'
+    STATUS_FAILED = 'failed'
+
+    topic = models.CharField(max_length=50)
+    payload = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    status = models.CharField(
+        max_length=20,
+        choices=[
+            (STATUS_PENDING, 'Pending'),
+            (STATUS_PUBLISHED, 'Published'),
+            (STATUS_FAILED, 'Failed'),
+        ],
+        default=STATUS_PENDING
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    available_at = models.DateTimeField(default=timezone.now)
+    # Set with a relay's lease token while that relay is delivering the event.
+    lease = models.CharField(max_length=32, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    published_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['status', 'available_at'], name='shoppy_outbox_due_idx')]
+
+    def __str__(self):
+        return f"{self.topic} #{self.id} ({self.status})"
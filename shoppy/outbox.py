@@ -0,0 +1,121 @@
+import traceback
+import uuid
+
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .jobs import LOCK_TIMEOUT, backoff
+from .models import OutboxEvent, Order, Product
+from .utils import notify_admin_out_of_stock, send_shipment_status_email, get_logger
+
+_logger = get_logger()
+
+
+# ----------------------- Outbox -----------------------
+#
+# Views record what happened (an order was placed, a shipment moved) as
+# OutboxEvent rows written in the same transaction as the change itself, so
+# an event exists exactly when its change committed. `manage.py relay_outbox`
+# drains the table in batches and hands each event to the subscribers of its
+# topic; requests never wait on email or any other downstream I/O.
+#
+# Delivery is at least once: an event is marked published only after all of
+# its subscribers returned, and a relay that dies mid-batch leaves its lease
+# to expire after LOCK_TIMEOUT, when the events are delivered again. A batch
+# is delivered in event order. Subscribers must therefore tolerate repeats.
+# An event whose subscribers raise is retried with the job queue's backoff
+# until MAX_ATTEMPTS, then marked failed.
+
+ORDER_PLACED = 'order.placed'
+SHIPMENT_STATUS_CHANGED = 'shipment.status_changed'
+
+MAX_ATTEMPTS = 8
+
+SUBSCRIBERS = {}
+
+
+def subscriber(topic):
+    def register(func):
+        SUBSCRIBERS.setdefault(topic, []).append(func)
+        return func
+    return register
+
+
+def publish(topic, **payload):
+    """Record an event; call inside the transaction that makes the change it describes."""
+    return OutboxEvent.objects.create(topic=topic, payload=payload)
+
+
+def claim(limit=100):
+    """Lease up to ``limit`` due events to this relay with one UPDATE and return them in order."""
+    now = timezone.now()
+    due = Q(status=OutboxEvent.STATUS_PENDING) & (
+        Q(locked_at__isnull=True, available_at__lte=now) | Q(locked_at__lt=now - LOCK_TIMEOUT)
+    )
+    ids = list(OutboxEvent.objects.filter(due).order_by('id').values_list('id', flat=True)[:limit])
+    if not ids:
+        return []
+    lease = uuid.uuid4().hex
+    # Rows another relay leased in the meantime no longer match ``due``.
+    OutboxEvent.objects.filter(due, id__in=ids).update(lease=lease, locked_at=now, attempts=F('attempts') + 1)
+    return list(OutboxEvent.objects.filter(lease=lease).order_by('id'))
+
+
+def deliver(event):
+    for func in SUBSCRIBERS.get(event.topic, []):
+        func(**event.payload)
+
+
+def relay(limit=100):
+    """Claim and deliver one batch of events; return how many were claimed."""
+    events = claim(limit)
+    published = []
+    for event in events:
+        try:
+            deliver(event)
+        except Exception as e:
+            if event.attempts >= MAX_ATTEMPTS:
+                status, available_at = OutboxEvent.STATUS_FAILED, event.available_at
+                _logger.error("Outbox event %s failed after %s attempts: %s", event.id, event.attempts, str(e))
+            else:
+                status, available_at = OutboxEvent.STATUS_PENDING, timezone.now() + backoff(event.attempts)
+                _logger.warning("Outbox event %s attempt %s failed, retrying: %s", event.id, event.attempts, str(e))
+            OutboxEvent.objects.filter(id=event.id, lease=event.lease).update(
+                status=status, available_at=available_at, lease='', locked_at=None, last_error=traceback.format_exc()
+            )
+        else:
+            published.append(event.id)
+    if published:
+        OutboxEvent.objects.filter(id__in=published, lease=events[0].lease).update(
+            status=OutboxEvent.STATUS_PUBLISHED, published_at=timezone.now(), lease='', locked_at=None, last_error=''
+        )
+    return len(events)
+
+
+def purge(before, batch_size=1000):
+    """Delete events published before ``before``, ``batch_size`` rows at a time; return how many went."""
+    deleted = 0
+    while True:
+        ids = list(OutboxEvent.objects.filter(status=OutboxEvent.STATUS_PUBLISHED, published_at__lt=before)
+                   .values_list('id', flat=True)[:batch_size])
+        if not ids:
+            return deleted
+        deleted += OutboxEvent.objects.filter(id__in=ids).delete()[0]
+
+
+# ----------------------- Subscribers -----------------------
+
+@subscriber(ORDER_PLACED)
+def alert_sold_out(order_id, user_id, product_ids, sold_out=()):
+    # ``sold_out`` is what this order itself took to 0, worked out under the
+    # checkout's locks: orders relayed after a sell-out, and stock read at
+    # relay time, would alert the same product again.
+    for product in Product.objects.filter(id__in=sold_out).order_by('id'):
+        notify_admin_out_of_stock(product, fail_silently=False)
+
+
+@subscriber(SHIPMENT_STATUS_CHANGED)
+def email_shipment_status(order_id, user_id, shipment_status, previous_status):
+    email = Order.objects.filter(id=order_id).values_list('user__email', flat=True).first()
+    if email:
+        send_shipment_status_email(email, order_id, shipment_status)
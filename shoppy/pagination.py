@@ -0,0 +1,37 @@
+from rest_framework.pagination import CursorPagination
+
+
+# ----------------------- Product Pagination -----------------------
+
+class ProductCursorPagination(CursorPagination):
+    """
+    Keyset pagination over the product catalog.
+
+    The cursor token encodes the last seen ``id`` so each page is fetched with
+    ``WHERE id > <cursor> ORDER BY id LIMIT n`` and costs the same regardless
+    of how deep the client has scrolled.
+    """
+    page_size = 25
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = 'id'
+
+    def get_paginated_data(self, data):
+        return {
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        }
+
+
+# ----------------------- Order Pagination -----------------------
+
+class OrderCursorPagination(ProductCursorPagination):
+    """
+    Keyset pagination over a user's orders, newest first, served by the
+    ``(user, created_at)`` index on Order. ``id`` breaks ties between orders
+    placed in the same instant.
+    """
+    page_size = 20
+    max_page_size = 50
+    ordering = ('-created_at', '-id')
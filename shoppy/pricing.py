@@ -0,0 +1,79 @@
+from decimal import Decimal, ROUND_HALF_UP
+
+from . import catalog
+
+
+# ----------------------- Pricing -----------------------
+#
+# One place that turns cart lines into money. quote_carts() prices any
+# number of carts in a single pass: every line of every cart is flattened
+# into parallel columns (cart index, price, quantity), line amounts are
+# computed column-wise, and the subtotals are folded back per cart. All
+# arithmetic is Decimal; GST is the only derived amount that needs rounding
+# and is rounded half-up to the paisa.
+
+SHIPPING_FEE = Decimal('50.00')
+COD_SURCHARGE_PER_KM = Decimal('10.00')
+GST_RATE = Decimal('0.08')
+CENT = Decimal('0.01')
+
+
+def _money(amount):
+    return amount.quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def load_prices(product_ids):
+    """Return ``{product_id: Decimal price}`` for the products in the catalog cache."""
+    return {product['id']: Decimal(product['price']) for product in catalog.get_products(list(set(product_ids)))}
+
+
+def quote_carts(carts, prices=None):
+    """
+    Price ``carts``, each a dict with ``lines`` (``(product_id, quantity)``
+    pairs), ``payment_mode`` and ``distance``. ``prices`` maps product IDs to
+    Decimal prices and is loaded from the catalog when not given. Returns one
+    quote per cart, in order; products without a price are listed under
+    ``missing`` and left out of the subtotal.
+    """
+    cart_index, product_ids, quantities = [], [], []
+    for index, cart in enumerate(carts):
+        for product_id, quantity in cart['lines']:
+            cart_index.append(index)
+            product_ids.append(product_id)
+            quantities.append(quantity)
+
+    if prices is None:
+        prices = load_prices(product_ids)
+    unit_prices = [prices.get(product_id) for product_id in product_ids]
+    amounts = [
+        price * quantity if price is not None else None
+        for price, quantity in zip(unit_prices, quantities)
+    ]
+
+    subtotals = [Decimal('0')] * len(carts)
+    missing = [[] for _ in carts]
+    for index, product_id, amount in zip(cart_index, product_ids, amounts):
+        if amount is None:
+            missing[index].append(product_id)
+        else:
+            subtotals[index] += amount
+
+    quotes = []
+    for cart, subtotal, unknown in zip(carts, subtotals, missing):
+        payment_mode = cart['payment_mode'].lower()
+        cod_surcharge = COD_SURCHARGE_PER_KM * cart['distance'] if payment_mode == 'cod' else Decimal('0')
+        gst_amount = subtotal * GST_RATE if payment_mode == 'online' else Decimal('0')
+        quote = {
+            'subtotal': _money(subtotal),
+            'shipping_fee': SHIPPING_FEE,
+            'cod_surcharge': _money(cod_surcharge),
+            'gst_amount': _money(gst_amount),
+        }
+        quote['total'] = sum(quote.values(), Decimal('0'))
+        quote['missing'] = unknown
+        quotes.append(quote)
+    return quotes
+
+
+def quote_cart(lines, payment_mode, distance, prices=None):
+    return quote_carts([{'lines': lines, 'payment_mode': payment_mode, 'distance': distance}], prices)[0]
@@ -0,0 +1,136 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Case, F, OuterRef, Q, Subquery, Sum, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Product, StockHold
+from . import inventory
+
+
+# ----------------------- Stock Holds -----------------------
+#
+# Adding a product to a cart holds that quantity for the user for
+# STOCK_HOLD_SECONDS. A product's availability is its quantity minus the
+# active (unexpired) holds of everybody else, and checkout only takes stock
+# that is available to the buyer (see checkout.take_stock), so a held unit
+# cannot be sold to another customer while the hold lasts.
+#
+# Expired holds are simply ignored: every read filters on expires_at, which
+# the (product, expires_at) index turns into a range scan over live holds
+# only. `manage.py sweep_stock_holds` deletes them to keep the table small.
+
+
+def hold_seconds():
+    return getattr(settings, 'STOCK_HOLD_SECONDS', 15 * 60)
+
+
+def _held(product_ids, now, exclude_user_id=None):
+    holds = StockHold.objects.filter(product_id__in=product_ids, expires_at__gt=now)
+    if exclude_user_id is not None:
+        holds = holds.exclude(user_id=exclude_user_id)
+    return dict(holds.values('product_id').annotate(total=Sum('quantity')).values_list('product_id', 'total'))
+
+
+def held_by_others(user_id, now):
+    """Subquery of a product's active hold total excluding ``user_id``, for use in Product queries."""
+    holds = StockHold.objects.filter(product=OuterRef('pk'), expires_at__gt=now)
+    if user_id is not None:
+        holds = holds.exclude(user_id=user_id)
+    return Coalesce(Subquery(holds.values('product').annotate(total=Sum('quantity')).values('total')), 0)
+
+
+def held_by_others_total(product_id, user_id, now):
+    return _held([product_id], now, exclude_user_id=user_id).get(product_id, 0)
+
+
+def _live_stock(stock):
+    """Replace the mirrored quantity of sharded products in ``{id: quantity}`` with their shard total."""
+    stock.update({product_id: total for product_id, (total, _) in inventory.totals(stock).items()})
+    return stock
+
+
+def availability(product_ids, user_id=None):
+    """Return ``{product_id: quantity not held by others}`` for existing products."""
+    now = timezone.now()
+    stock = _live_stock(dict(Product.objects.filter(id__in=product_ids).values_list('id', 'quantity')))
+    held = _held(stock, now, exclude_user_id=user_id)
+    return {product_id: max(quantity - held.get(product_id, 0), 0) for product_id, quantity in stock.items()}
+
+
+def reserve(user_id, quantities):
+    """
+    Hold ``{product_id: quantity}`` for ``user_id``, replacing earlier holds
+    of the same products and restarting their TTL. All or nothing: returns
+    ``{product_id: error}`` and holds nothing if any line cannot be held.
+    """
+    now = timezone.now()
+    with transaction.atomic(savepoint=False):
+        # Locking the products serializes reservations (and checkouts) of the
+        # same product, so two users cannot both hold its last unit. A sharded
+        # product is locked through its first shard so cart adds do not queue
+        # on its hot Product row; like take_stock, sharded products go first.
+        sharded = inventory.lock_for_holds(quantities)
+        stock = dict(
+            Product.objects.select_for_update().filter(id__in=set(quantities) - sharded)
+            .order_by('id').values_list('id', 'quantity')
+        )
+        stock.update({product_id: total for product_id, (total, _) in inventory.totals(sharded).items()})
+        held = _held(stock, now, exclude_user_id=user_id)
+        errors = {}
+        for product_id, quantity in quantities.items():
+            if product_id not in stock:
+                errors[product_id] = "Product not found"
+            elif stock[product_id] - held.get(product_id, 0) < quantity:
+                errors[product_id] = f"Only {max(stock[product_id] - held.get(product_id, 0), 0)} in stock"
+        if errors:
+            return errors
+
+        upsert = {'update_conflicts': True, 'update_fields': ['quantity', 'expires_at']}
+        if connection.features.supports_update_conflicts_with_target:
+            upsert['unique_fields'] = ['user', 'product']
+        expires_at = now + timedelta(seconds=hold_seconds())
+        StockHold.objects.bulk_create([
+            StockHold(user_id=user_id, product_id=product_id, quantity=quantity, expires_at=expires_at)
+            for product_id, quantity in quantities.items()
+        ], **upsert)
+    return {}
+
+
+def release(user_id, product_ids=None):
+    """Drop ``user_id``'s holds, on ``product_ids`` only when given."""
+    holds = StockHold.objects.filter(user_id=user_id)
+    if product_ids is not None:
+        holds = holds.filter(product_id__in=product_ids)
+    holds.delete()
+
+
+def consume(user_id, lines):
+    """
+    Shrink ``user_id``'s holds by the ``(product_id, quantity)`` lines just
+    ordered; holds no larger than what was ordered are dropped.
+    """
+    quantities = {}
+    for product_id, quantity in lines:
+        quantities[product_id] = quantities.get(product_id, 0) + quantity
+    holds = StockHold.objects.filter(user_id=user_id, product_id__in=quantities)
+    used_up = Q()
+    for product_id, quantity in quantities.items():
+        used_up |= Q(product_id=product_id, quantity__lte=quantity)
+    holds.filter(used_up).delete()
+    holds.update(quantity=Case(
+        *(When(product_id=product_id, then=F('quantity') - quantity) for product_id, quantity in quantities.items())
+    ))
+
+
+def sweep(batch_size=1000):
+    """Delete expired holds ``batch_size`` rows at a time; return how many went."""
+    now = timezone.now()
+    deleted = 0
+    while True:
+        ids = list(StockHold.objects.filter(expires_at__lte=now).values_list('id', flat=True)[:batch_size])
+        if not ids:
+            return deleted
+        deleted += StockHold.objects.filter(id__in=ids).delete()[0]
@@ -0,0 +1,76 @@
+import re
+
+from django.db import connection
+from django.db.models import Q
+
+from .models import Product
+
+
+# ----------------------- Product Search -----------------------
+#
+# Product.name, brand and description are indexed by the database itself:
+# an FTS5 external-content table kept in sync by triggers on SQLite, and a
+# FULLTEXT index on MySQL (see migration 0014). Both are maintained on every
+# INSERT/UPDATE/DELETE of shoppy_product, so the product write views need no
+# extra bookkeeping.
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def _tokens(query):
+    return _TOKEN_RE.findall(query or "")
+
+
+def _sqlite_search(tokens, limit, offset):
+    # Quote every term so user input can never be parsed as FTS5 syntax,
+    # and prefix-match the last one for search-as-you-type.
+    terms = [f'"{token}"' for token in tokens]
+    terms[-1] += "*"
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT rowid FROM shoppy_product_fts WHERE shoppy_product_fts MATCH %s "
+            "ORDER BY bm25(shoppy_product_fts) LIMIT %s OFFSET %s",
+            [" ".join(terms), limit, offset]
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def _mysql_search(tokens, limit, offset):
+    query = " ".join(f"+{token}*" for token in tokens)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT id FROM shoppy_product "
+            "WHERE MATCH(name, brand, description) AGAINST (%s IN BOOLEAN MODE) "
+            "ORDER BY MATCH(name, brand, description) AGAINST (%s IN BOOLEAN MODE) DESC, id "
+            "LIMIT %s OFFSET %s",
+            [query, query, limit, offset]
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def _fallback_search(tokens, limit, offset):
+    products = Product.objects.all()
+    for token in tokens:
+        products = products.filter(
+            Q(name__icontains=token) | Q(brand__icontains=token) | Q(description__icontains=token)
+        )
+    return list(products.order_by('id').values_list('id', flat=True)[offset:offset + limit])
+
+
+def search_product_ids(query, limit, offset=0):
+    """Return ranked product IDs matching every term of ``query``."""
+    tokens = _tokens(query)
+    if not tokens:
+        return []
+    if connection.vendor == 'sqlite':
+        return _sqlite_search(tokens, limit, offset)
+    if connection.vendor == 'mysql':
+        return _mysql_search(tokens, limit, offset)
+    return _fallback_search(tokens, limit, offset)
+
+
+def search_products(query, limit, offset=0):
+    """Return ranked Product instances matching ``query``."""
+    ids = search_product_ids(query, limit, offset)
+    products = Product.objects.in_bulk(ids)
+    return [products[product_id] for product_id in ids if product_id in products]
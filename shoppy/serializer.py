@@ -44,6 +44,22 @@ class ProductSerializer(serializers.ModelSerializer):
         fields = "__all__"
 
 
+class ProductPatchSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    price = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=0, required=False)
+    quantity = serializers.IntegerField(min_value=0, required=False)
+    brand = serializers.CharField(max_length=100, required=False)
+
+    def validate(self, data):
+        if len(data) == 1:
+            raise serializers.ValidationError("At least one of price, quantity or brand is required")
+        return data
+
+
+class ProductBulkUpdateSerializer(serializers.Serializer):
+    products = ProductPatchSerializer(many=True)
+
+
 class ProductRestockSerializer(serializers.Serializer):
     name = serializers.CharField()
     brand = serializers.CharField()
@@ -58,6 +74,16 @@ class CartSerializer(serializers.ModelSerializer):
         fields = "__all__"
 
 
+class CartBatchItemSerializer(serializers.Serializer):
+    product_id = serializers.IntegerField()
+    quantity = serializers.IntegerField(min_value=1)
+
+
+class CartBatchSerializer(serializers.Serializer):
+    user_id = serializers.IntegerField()
+    items = CartBatchItemSerializer(many=True, allow_empty=False)
+
+
 class OrderSerializer(serializers.ModelSerializer):
     class Meta:
         model = Order
@@ -70,6 +96,25 @@ class OrderItemSerializer(serializers.ModelSerializer):
         fields = "__all__"
 
 
+class OrderLineSerializer(serializers.ModelSerializer):
+    product_name = serializers.CharField(source='product.name', read_only=True)
+
+    class Meta:
+        model = OrderItem
+        fields = ['id', 'product', 'product_name', 'brand', 'quantity', 'price']
+
+
+class OrderHistorySerializer(serializers.ModelSerializer):
+    items = OrderLineSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = Order
+        fields = [
+            'id', 'invoice_id', 'created_at', 'total', 'payment_mode', 'payment_status', 'shipment_status',
+            'dispatch_address', 'dispatch_phone', 'distance', 'is_direct', 'items'
+        ]
+
+
 class InvoiceSerializer(serializers.ModelSerializer):
     class Meta:
         model = Invoice
@@ -91,7 +136,7 @@ class ShipmentStatusSerializer(serializers.Serializer):
 
 class DirectOrderProductSerializer(serializers.Serializer):
     product_id = serializers.IntegerField()
-    quantity = serializers.IntegerField()
+    quantity = serializers.IntegerField(min_value=1)
 
 
 class DirectOrderSerializer(serializers.Serializer):
@@ -109,6 +154,56 @@ class DirectOrderSerializer(serializers.Serializer):
                 raise serializers.ValidationError("Dispatch address and phone are required when confirm_dispatch is 'no'.")
         return data
 
+# ----------------------  Price Quotes ----------------------
+
+class QuoteCartSerializer(serializers.Serializer):
+    products = DirectOrderProductSerializer(many=True, allow_empty=False)
+    payment_mode = serializers.ChoiceField(choices=["cod", "online"])
+    distance = serializers.IntegerField(min_value=0)
+
+
+class QuoteSerializer(serializers.Serializer):
+    carts = QuoteCartSerializer(many=True, allow_empty=False, max_length=100)
+
+# ----------------------  Fast Read Paths ----------------------
+#
+# Hot list endpoints build their payload from `.values()` rows instead of
+# running a ModelSerializer per instance. The output is identical to
+# ProductSerializer / CartSerializer with fields="__all__".
+
+PRODUCT_FIELDS = ('id', 'name', 'brand', 'description', 'price', 'quantity', 'sold_count')
+CART_FIELDS = ('id', 'quantity', 'user_id', 'product_id')
+
+_price_field = serializers.DecimalField(max_digits=10, decimal_places=2)
+
+
+def serialize_product_rows(rows):
+    to_price = _price_field.to_representation
+    return [
+        {
+            'id': row['id'],
+            'name': row['name'],
+            'brand': row['brand'],
+            'description': row['description'],
+            'price': to_price(row['price']),
+            'quantity': row['quantity'],
+            'sold_count': row['sold_count'],
+        }
+        for row in rows
+    ]
+
+
+def serialize_cart_rows(rows):
+    return [
+        {
+            'id': row['id'],
+            'quantity': row['quantity'],
+            'user': row['user_id'],
+            'product': row['product_id'],
+        }
+        for row in rows
+    ]
+
 # ----------------------  Admin ----------------------
 
 class AdminDashboardSerializer(serializers.Serializer):
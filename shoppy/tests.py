@@ -1,10 +1,48 @@
-from rest_framework.test import APITestCase
+import json
+import os
+import tempfile
+import threading
+import time
+from decimal import Decimal
+from io import BytesIO, StringIO
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from rest_framework.test import APIClient, APITestCase, APITransactionTestCase
 from rest_framework import status
+from django.conf import settings
+from django.contrib import admin
 from django.urls import reverse
+from django.core import mail
+from django.core.cache import caches
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.db.models import Sum
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
 from django.utils import timezone
 from datetime import timedelta
 from knox.models import AuthToken
-from shoppy.models import User, OTP, Product, Order
+from reportlab.pdfgen import canvas
+from shoppy.models import (
+    User, OTP, Product, Order, OrderItem, ProductFacet, Cart, Invoice, Job, StockHold, StockShard, OutboxEvent,
+    IdempotencyKey
+)
+from shoppy.serializer import (
+    ProductSerializer, CartSerializer, PRODUCT_FIELDS, CART_FIELDS,
+    serialize_product_rows, serialize_cart_rows
+)
+from shoppy.admin import ProductAdmin
+from shoppy.checks import check_shared_caches
+from shoppy.facets import facet_values, update_facets_many, get_facet_summary
+from shoppy.leaderboard import top_sellers
+from shoppy.utils import calculate_cart_total, generate_invoice_pdf
+from shoppy.cart_store import get_cart_store
+from shoppy.idempotency import _fingerprint
+from shoppy import catalog, inventory, jobs, outbox, reservations, utils
 
 
 class AuthTests(APITestCase):
@@ -73,6 +111,7 @@ class ProductTests(APITestCase):
         self.create_url = reverse('product-create')
         self.list_url = reverse('product-list')
         _, self.token = AuthToken.objects.create(self.admin)
+        catalog.clear()
 
     def test_create_product_as_admin(self):
         self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token)
@@ -91,6 +130,593 @@ class ProductTests(APITestCase):
         response = self.client.get(self.list_url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
+    def test_product_list_cursor_pagination(self):
+        Product.objects.bulk_create([
+            Product(name=f"Item {i}", brand="Acme", description="d", price=10, quantity=1)
+            for i in range(5)
+        ])
+        response = self.client.get(self.list_url, {"page_size": 2})
+        first_page = response.data["data"]
+        self.assertEqual(len(first_page["results"]), 2)
+        self.assertIsNotNone(first_page["next"])
+
+        response = self.client.get(first_page["next"])
+        second_page = response.data["data"]
+        self.assertEqual(len(second_page["results"]), 2)
+        self.assertGreater(second_page["results"][0]["id"], first_page["results"][-1]["id"])
+
+
+class ProductSearchTests(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create(
+            name="Admin",
+            email="admin@emarket.com",
+            password="admin",
+            address="Trichy",
+            district="D",
+            state="S",
+            country="C",
+            pincode="620001",
+            phone="9876543210",
+            is_admin=True,
+            is_superuser=True
+        )
+        self.search_url = reverse('product-search')
+        _, self.token = AuthToken.objects.create(self.admin)
+        self.phone = Product.objects.create(
+            name="Galaxy Phone", brand="Samsung", description="Latest 5G phone", price=15000, quantity=10
+        )
+        Product.objects.create(name="Laptop", brand="Dell", description="Latest i7 laptop", price=50000, quantity=5)
+
+    def test_search_matches_name_brand_and_description(self):
+        for query in ("galaxy", "samsung", "5g phone", "gal"):
+            response = self.client.get(self.search_url, {"q": query})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            ids = [product["id"] for product in response.data["data"]["results"]]
+            self.assertEqual(ids, [self.phone.id], query)
+
+    def test_search_index_follows_product_writes(self):
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token)
+        self.client.put(reverse('product-update', args=[self.phone.id]), {"name": "Pixel"}, format='json')
+        self.assertEqual(self.client.get(self.search_url, {"q": "galaxy"}).data["data"]["results"], [])
+        self.assertEqual(len(self.client.get(self.search_url, {"q": "pixel"}).data["data"]["results"]), 1)
+
+        self.client.delete(reverse('product-delete', args=[self.phone.id]))
+        self.assertEqual(self.client.get(self.search_url, {"q": "pixel"}).data["data"]["results"], [])
+
+    def test_search_requires_query(self):
+        response = self.client.get(self.search_url)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ProductFacetTests(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create(
+            name="Admin",
+            email="admin@emarket.com",
+            password="admin",
+            address="Trichy",
+            district="D",
+            state="S",
+            country="C",
+            pincode="620001",
+            phone="9876543210",
+            is_admin=True,
+            is_superuser=True
+        )
+        _, self.token = AuthToken.objects.create(self.admin)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token)
+        self.list_url = reverse('product-list')
+        catalog.clear()
+
+    def create_product(self, **overrides):
+        data = {"name": "Phone", "brand": "Samsung", "description": "5G phone", "price": "15000", "quantity": 1}
+        data.update(overrides)
+        self.client.post(reverse('product-create'), data, format='json')
+        return Product.objects.latest('id')
+
+    def facets(self):
+        return self.client.get(self.list_url).data["data"]["facets"]
+
+    def test_facet_counts_follow_product_writes(self):
+        phone = self.create_product()
+        self.create_product(name="Laptop", brand="Dell", price="60000", quantity=0)
+        self.assertEqual(self.facets(), {
+            "brand": {"Samsung": 1, "Dell": 1},
+            "price_band": {"10000-50000": 1, "50000+": 1},
+            "in_stock": {"yes": 1, "no": 1},
+        })
+
+        self.client.put(reverse('product-update', args=[phone.id]), {"brand": "Apple", "price": "400"}, format='json')
+        self.client.delete(reverse('product-delete', args=[Product.objects.get(brand="Dell").id]))
+        self.assertEqual(self.facets(), {
+            "brand": {"Apple": 1},
+            "price_band": {"0-500": 1},
+            "in_stock": {"yes": 1},
+        })
+
+    def test_order_placement_moves_in_stock_facet(self):
+        phone = self.create_product(quantity=1)
+        response = self.client.post(reverse('direct-order'), {
+            "user_id": self.admin.id,
+            "products": [{"product_id": phone.id, "quantity": 1}],
+            "confirm_dispatch": "yes",
+            "payment_mode": "cod",
+            "distance": 10
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.facets()["in_stock"], {"no": 1})
+
+    def test_product_list_filters(self):
+        self.create_product()
+        self.create_product(name="Laptop", brand="Dell", price="60000", quantity=0)
+
+        def names(params):
+            return [p["name"] for p in self.client.get(self.list_url, params).data["data"]["results"]]
+
+        self.assertEqual(names({"brand": "Dell"}), ["Laptop"])
+        self.assertEqual(names({"price_band": "10000-50000"}), ["Phone"])
+        self.assertEqual(names({"in_stock": "no"}), ["Laptop"])
+        self.assertEqual(self.client.get(self.list_url, {"price_band": "cheap"}).status_code, 400)
+        self.assertEqual(ProductFacet.objects.get(facet="brand", value="Dell").count, 1)
+
+    def test_admin_product_edits_update_facets(self):
+        phone = self.create_product()
+        product_admin = ProductAdmin(Product, admin.site)
+        phone.brand = "Apple"
+        product_admin.save_model(None, phone, SimpleNamespace(changed_data=["brand"]), change=True)
+        self.assertEqual(self.facets()["brand"], {"Apple": 1})
+
+        product_admin.delete_queryset(None, Product.objects.filter(id=phone.id))
+        self.assertEqual(self.facets(), {"brand": {}, "price_band": {}, "in_stock": {}})
+
+    def test_facet_count_clamps_at_zero(self):
+        update_facets_many([({"brand": "Ghost"}, None)])
+        self.create_product(brand="Ghost")
+        update_facets_many([({"brand": "Ghost"}, None), ({"brand": "Ghost"}, None)])
+        self.assertEqual(ProductFacet.objects.get(facet="brand", value="Ghost").count, 0)
+
+
+class CatalogCacheTests(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create(
+            name="Admin",
+            email="admin@emarket.com",
+            password="admin",
+            address="Trichy",
+            district="D",
+            state="S",
+            country="C",
+            pincode="620001",
+            phone="9876543210",
+            is_admin=True,
+            is_superuser=True
+        )
+        _, self.token = AuthToken.objects.create(self.admin)
+        self.list_url = reverse('product-list')
+        self.product = Product.objects.create(
+            name="Phone", brand="Samsung", description="5G phone", price=15000, quantity=1
+        )
+        catalog.clear()
+
+    def write(self, method, *args, **kwargs):
+        # Cache invalidation runs on commit.
+        with self.captureOnCommitCallbacks(execute=True):
+            return getattr(self.client, method)(*args, **kwargs)
+
+    def test_cached_list_page_skips_product_queries(self):
+        first = self.client.get(self.list_url).data["data"]
+        with self.assertNumQueries(2):  # catalog version and facet summary
+            second = self.client.get(self.list_url).data["data"]
+        self.assertEqual(first, second)
+
+    def test_product_writes_invalidate_cache(self):
+        self.client.get(self.list_url)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token)
+
+        self.write('put', reverse('product-update', args=[self.product.id]), {"description": "New"}, format='json')
+        results = self.client.get(self.list_url).data["data"]["results"]
+        self.assertEqual(results[0]["description"], "New")
+
+        self.write('post', reverse('product-create'), {
+            "name": "Laptop", "brand": "Dell", "description": "i7", "price": "50000", "quantity": 2
+        }, format='json')
+        self.assertEqual(len(self.client.get(self.list_url).data["data"]["results"]), 2)
+
+        self.write('delete', reverse('product-delete', args=[self.product.id]))
+        results = self.client.get(self.list_url).data["data"]["results"]
+        self.assertEqual([product["name"] for product in results], ["Laptop"])
+
+    def test_order_stock_decrement_invalidates_cache(self):
+        self.client.get(self.list_url, {"in_stock": "yes"})
+        self.write('post', reverse('direct-order'), {
+            "user_id": self.admin.id,
+            "products": [{"product_id": self.product.id, "quantity": 1}],
+            "confirm_dispatch": "yes",
+            "payment_mode": "cod",
+            "distance": 10
+        }, format='json')
+        self.assertEqual(self.client.get(self.list_url, {"in_stock": "yes"}).data["data"]["results"], [])
+        self.assertEqual(catalog.get_product(self.product.id)["quantity"], 0)
+
+    def test_conditional_get_uses_catalog_version(self):
+        response = self.client.get(self.list_url)
+        etag = response["ETag"]
+        self.assertIn("Last-Modified", response)
+
+        with self.assertNumQueries(1):  # the CatalogVersion row
+            response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token)
+        self.write('post', reverse('product-restock', args=[self.product.id]), {"quantity": 1}, format='json')
+        self.client.credentials()
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_deploy_check_flags_per_process_catalog_cache(self):
+        self.assertEqual([message.id for message in check_shared_caches(None)], ["shoppy.W001"])
+        shared = dict(settings.CACHES, catalog={
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': tempfile.mkdtemp()
+        })
+        with override_settings(CACHES=shared):
+            self.assertEqual(check_shared_caches(None), [])
+
+    def test_product_detail_served_from_cache(self):
+        url = reverse('product-detail', args=[self.product.id])
+        self.assertEqual(self.client.get(url).data["data"]["name"], "Phone")
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertEqual(response.data["data"]["id"], self.product.id)
+
+    def test_unknown_product_is_negatively_cached(self):
+        url = reverse('product-detail', args=[self.product.id + 1])
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+
+        self.write('post', reverse('product-import'), {"file": SimpleUploadedFile("p.jsonl", json.dumps({
+            "id": self.product.id + 1, "name": "Tab", "brand": "Lenovo", "description": "10in",
+            "price": "9000", "quantity": 1
+        }).encode())}, format='multipart', HTTP_AUTHORIZATION='Token ' + self.token)
+        self.assertEqual(self.client.get(url).data["data"]["name"], "Tab")
+
+    def test_cache_stats_count_hits_and_misses(self):
+        before = catalog.cache_stats()
+        self.client.get(self.list_url)
+        self.client.get(self.list_url)
+        after = catalog.cache_stats()
+        self.assertEqual(after["page_misses"] - before["page_misses"], 1)
+        self.assertEqual(after["page_hits"] - before["page_hits"], 1)
+        self.assertEqual(after["product_hits"] - before["product_hits"], 1)
+
+
+class FastReadPathTests(APITestCase):
+    def test_row_serializers_match_model_serializers(self):
+        user = User.objects.create(name="U", email="u@example.com", password="p", address="A",
+                                   district="D", state="S", country="C", pincode="1")
+        Product.objects.create(name="Pen", brand="Cello", description="Blue", price="12.5", quantity=3, sold_count=2)
+        Product.objects.create(name="Book", brand="Classmate", description="", price=99, quantity=0)
+        for product in Product.objects.all():
+            Cart.objects.create(user=user, product=product, quantity=2)
+
+        self.assertEqual(
+            serialize_product_rows(Product.objects.values(*PRODUCT_FIELDS)),
+            [dict(item) for item in ProductSerializer(Product.objects.all(), many=True).data]
+        )
+        self.assertEqual(
+            serialize_cart_rows(Cart.objects.values(*CART_FIELDS)),
+            [dict(item) for item in CartSerializer(Cart.objects.all(), many=True).data]
+        )
+
+
+class ProductImportTests(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create(
+            name="Admin",
+            email="admin@emarket.com",
+            password="admin",
+            address="Trichy",
+            district="D",
+            state="S",
+            country="C",
+            pincode="620001",
+            phone="9876543210",
+            is_admin=True,
+            is_superuser=True
+        )
+        _, self.token = AuthToken.objects.create(self.admin)
+        self.existing = Product.objects.create(
+            name="Phone", brand="Samsung", description="5G", price=15000, quantity=0, sold_count=7
+        )
+        update_facets_many([(None, facet_values(self.existing))])
+        catalog.clear()
+
+    def test_import_command_upserts_and_reports_rejects(self):
+        path = os.path.join(tempfile.mkdtemp(), "products.csv")
+        with open(path, "w", newline="") as f:
+            f.write("id,name,brand,description,price,quantity\n")
+            f.write(f"{self.existing.id},Phone,Samsung,5G,14000,3\n")
+            f.write(",Laptop,Dell,i7,50000,2\n")
+            f.write(",Broken,Dell,i7,not-a-price,2\n")
+        out = StringIO()
+        call_command("import_products", path, "--batch-size", "2", stdout=out)
+
+        self.assertIn("3 rows", out.getvalue())
+        self.assertIn("2 upserted, 1 rejected", out.getvalue())
+        self.assertIn("line 4", out.getvalue())
+        self.existing.refresh_from_db()
+        self.assertEqual((self.existing.price, self.existing.quantity, self.existing.sold_count), (14000, 3, 7))
+        self.assertTrue(Product.objects.filter(name="Laptop").exists())
+        self.assertEqual(get_facet_summary()["in_stock"], {"yes": 2})
+
+    def test_import_endpoint_accepts_jsonl(self):
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token)
+        upload = SimpleUploadedFile("products.jsonl", b"\n".join([
+            json.dumps({"name": "Pen", "brand": "Cello", "description": "Blue", "price": "10", "quantity": 5}).encode(),
+            b"{not json",
+        ]))
+        response = self.client.post(reverse('product-import'), {"file": upload}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["data"]["upserted"], 1)
+        self.assertEqual(response.data["data"]["errors"][0]["line"], 2)
+
+
+class ProductBulkUpdateTests(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create(
+            name="Admin",
+            email="admin@emarket.com",
+            password="admin",
+            address="Trichy",
+            district="D",
+            state="S",
+            country="C",
+            pincode="620001",
+            phone="9876543210",
+            is_admin=True,
+            is_superuser=True
+        )
+        _, self.token = AuthToken.objects.create(self.admin)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token)
+        self.pen = Product.objects.create(name="Pen", brand="Cello", description="Blue", price=10, quantity=0)
+        self.book = Product.objects.create(name="Book", brand="Classmate", description="A4", price=50, quantity=0)
+        catalog.clear()
+
+    def test_bulk_update_reports_per_row_results(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('product-bulk-update'), {"products": [
+                {"id": self.pen.id, "price": "12.50", "quantity": 5},
+                {"id": self.book.id, "brand": "Navneet", "quantity": 3},
+                {"id": 999999, "price": "1"},
+                {"id": self.pen.id, "quantity": -1},
+            ]}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        statuses = [result["status"] for result in response.data["data"]["results"]]
+        self.assertEqual(statuses, ["updated", "updated", "not_found", "invalid"])
+        self.pen.refresh_from_db()
+        self.book.refresh_from_db()
+        self.assertEqual((self.pen.price, self.pen.quantity), (Decimal("12.50"), 5))
+        self.assertEqual((self.book.brand, self.book.quantity), ("Navneet", 3))
+
+        # Both products came back in stock: one notification per user for the batch.
+        self.assertEqual(len(mail.outbox), User.objects.count())
+        self.assertIn("2 Products Restocked", mail.outbox[0].subject)
+
+    def test_patch_without_fields_is_invalid(self):
+        response = self.client.post(reverse('product-bulk-update'), {"products": [{"id": self.pen.id}]}, format='json')
+
+        self.assertEqual(response.data["data"]["updated"], 0)
+        self.assertEqual(response.data["data"]["results"][0]["status"], "invalid")
+
+    def test_rows_are_written_with_their_own_fields(self):
+        # Writing the batch's union of fields would put back a quantity read
+        # before a concurrent sale; each row only gets the fields it patched.
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse('product-bulk-update'), {"products": [
+                {"id": self.pen.id, "price": "11"},
+                {"id": self.book.id, "quantity": 2},
+            ]}, format='json')
+
+        self.assertEqual(response.data["data"]["updated"], 2)
+        updates = [query["sql"] for query in queries if query["sql"].startswith('UPDATE "shoppy_product" SET')]
+        self.assertEqual(len(updates), 2)
+        for sql in updates:
+            self.assertNotEqual('"price" = ' in sql, '"quantity" = ' in sql)
+        self.pen.refresh_from_db()
+        self.assertEqual((self.pen.price, self.pen.quantity), (Decimal("11"), 0))
+
+    def test_brand_patch_moves_best_seller(self):
+        Product.objects.filter(id=self.pen.id).update(sold_count=5)
+        call_command('rebuild_best_sellers', stdout=StringIO())
+        self.client.post(reverse('product-bulk-update'), {"products": [{"id": self.pen.id, "brand": "Reynolds"}]},
+                         format='json')
+
+        self.assertEqual(list(top_sellers(brand="Cello")), [])
+        self.assertEqual(list(top_sellers(brand="Reynolds")), [(self.pen.id, 5)])
+
+
+class BestSellerTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create(
+            name="Test User",
+            email="user@example.com",
+            password="user123",
+            address="123 Street",
+            district="Trichy",
+            state="TN",
+            country="India",
+            pincode="620001",
+            phone="9876543210"
+        )
+        self.pen = Product.objects.create(name="Pen", brand="Cello", description="Blue", price=10, quantity=50)
+        self.gel = Product.objects.create(name="Gel Pen", brand="Cello", description="Black", price=15, quantity=50)
+        self.book = Product.objects.create(name="Book", brand="Classmate", description="A4", price=50, quantity=50)
+        catalog.clear()
+
+    def order(self, product, quantity):
+        response = self.client.post(reverse('direct-order'), {
+            "user_id": self.user.id,
+            "products": [{"product_id": product.id, "quantity": quantity}],
+            "confirm_dispatch": "yes",
+            "payment_mode": "cod",
+            "distance": 1
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_leaderboard_follows_orders(self):
+        self.order(self.pen, 2)
+        self.order(self.book, 5)
+        self.order(self.gel, 3)
+        self.order(self.pen, 4)
+
+        response = self.client.get(reverse('product-best-sellers'))
+        ranking = [(p["name"], p["sold_count"]) for p in response.data["data"]]
+        self.assertEqual(ranking, [("Pen", 6), ("Book", 5), ("Gel Pen", 3)])
+
+        response = self.client.get(reverse('product-best-sellers'), {"brand": "Cello", "limit": 1})
+        self.assertEqual([p["name"] for p in response.data["data"]], ["Pen"])
+
+    def test_leaderboard_is_bounded(self):
+        with patch("shoppy.leaderboard.TOP_K", 2):
+            self.order(self.pen, 1)
+            self.order(self.gel, 2)
+            self.order(self.book, 3)
+        self.assertEqual(top_sellers(limit=10), [(self.book.id, 3), (self.gel.id, 2)])
+
+
+class CartQueryTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create(
+            name="Test User",
+            email="user@example.com",
+            password="user123",
+            address="123 Street",
+            district="Trichy",
+            state="TN",
+            country="India",
+            pincode="620001",
+            phone="9876543210"
+        )
+
+    def fill_cart(self, lines):
+        Product.objects.bulk_create([
+            Product(name=f"Item {i}", brand="Acme", description="d", price=Decimal("10.25"), quantity=10)
+            for i in range(lines)
+        ])
+        Cart.objects.filter(user=self.user).delete()
+        Cart.objects.bulk_create([
+            Cart(user=self.user, product=product, quantity=2) for product in Product.objects.all()[:lines]
+        ])
+
+    def test_cart_total_and_listing_use_constant_queries(self):
+        for lines in (3, 300):
+            self.fill_cart(lines)
+            with self.assertNumQueries(1):
+                self.assertEqual(calculate_cart_total(self.user), Decimal("20.50") * lines)
+            with self.assertNumQueries(1):
+                response = self.client.get(reverse('cart'), {"user_id": self.user.id})
+            self.assertEqual(len(response.data["data"]), lines)
+
+    def test_cart_batch_upserts_lines(self):
+        self.fill_cart(2)
+        first, second = Product.objects.order_by('id')[:2]
+        third = Product.objects.create(name="New", brand="Acme", description="d", price=1, quantity=3)
+        url = reverse('cart-batch')
+
+        # user, savepoint, locked shards, locked stock, other holds, hold upsert, cart upsert, release, listing
+        with self.assertNumQueries(9):
+            response = self.client.post(url, {"user_id": self.user.id, "items": [
+                {"product_id": first.id, "quantity": 5},
+                {"product_id": third.id, "quantity": 3},
+            ]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        lines = dict(Cart.objects.filter(user=self.user).values_list('product_id', 'quantity'))
+        self.assertEqual(lines, {first.id: 5, second.id: 2, third.id: 3})
+
+        response = self.client.post(url, {"user_id": self.user.id, "items": [
+            {"product_id": first.id, "quantity": 1},
+            {"product_id": third.id, "quantity": 4},
+        ]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn(third.id, response.data["data"])
+        self.assertEqual(Cart.objects.get(user=self.user, product=first).quantity, 5)
+
+    def test_empty_cart_total_is_zero(self):
+        self.assertEqual(calculate_cart_total(self.user), 0)
+
+
+@override_settings(CART_STORE='shoppy.cart_store.CachedCartStore')
+class CachedCartStoreTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create(
+            name="Test User",
+            email="user@example.com",
+            password="user123",
+            address="123 Street",
+            district="Trichy",
+            state="TN",
+            country="India",
+            pincode="620001",
+            phone="9876543210"
+        )
+        self.pen = Product.objects.create(name="Pen", brand="Cello", description="Blue", price=10, quantity=50)
+        self.book = Product.objects.create(name="Book", brand="Classmate", description="A4", price=50, quantity=50)
+        caches['carts'].clear()
+        catalog.clear()
+
+    def set_cart(self, items):
+        response = self.client.post(reverse('cart-batch'), {"user_id": self.user.id, "items": [
+            {"product_id": product.id, "quantity": quantity} for product, quantity in items
+        ]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_quantity_changes_are_written_through(self):
+        self.set_cart([(self.pen, 1), (self.book, 1)])
+        self.set_cart([(self.pen, 4)])
+
+        self.assertEqual(Cart.objects.get(product=self.pen).quantity, 4)
+        self.client.get(reverse('cart'), {"user_id": self.user.id})
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('cart'), {"user_id": self.user.id})
+        self.assertEqual([line["quantity"] for line in response.data["data"]], [4, 1])
+        calculate_cart_total(self.user)
+        with self.assertNumQueries(0):
+            self.assertEqual(calculate_cart_total(self.user), Decimal("90"))
+
+    def test_evicted_copy_loses_nothing(self):
+        self.set_cart([(self.pen, 1)])
+        self.client.get(reverse('cart'), {"user_id": self.user.id})
+        self.set_cart([(self.pen, 3)])
+        caches['carts'].clear()
+        response = self.client.get(reverse('cart'), {"user_id": self.user.id})
+        self.assertEqual([line["quantity"] for line in response.data["data"]], [3])
+
+    def test_checkout_sees_latest_quantities(self):
+        self.set_cart([(self.pen, 1)])
+        self.set_cart([(self.pen, 3)])
+        response = self.client.post(reverse('place-cart-order'), {
+            "user_id": self.user.id,
+            "products": [],
+            "confirm_dispatch": "yes",
+            "payment_mode": "cod",
+            "distance": 1
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.pen.refresh_from_db()
+        self.assertEqual(self.pen.quantity, 47)
+        self.assertEqual(get_cart_store().get_lines(self.user.id), [])
+        self.assertFalse(Cart.objects.filter(user=self.user).exists())
+
+    def test_remove_line_updates_hot_copy(self):
+        self.set_cart([(self.pen, 1), (self.book, 2)])
+        line_id = Cart.objects.get(product=self.pen).id
+        self.client.delete(reverse('remove-cart-item', args=[line_id]))
+        response = self.client.get(reverse('cart'), {"user_id": self.user.id})
+        self.assertEqual([line["product"] for line in response.data["data"]], [self.book.id])
+
 
 class OrderTests(APITestCase):
     def setUp(self):
@@ -119,15 +745,885 @@ class OrderTests(APITestCase):
     def test_place_direct_order(self):
         self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token)
         data = {
+            "user_id": self.user.id,
             "products": [{"product_id": self.product.id, "quantity": 1}],
             "confirm_dispatch": "yes",
-            "payment_mode": "COD",
+            "payment_mode": "cod",
             "distance": 10
         }
         response = self.client.post(self.direct_url, data, format='json')
         self.assertIn(response.status_code, [status.HTTP_201_CREATED, status.HTTP_200_OK])
 
 
+class CheckoutStockTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create(
+            name="Test User",
+            email="user@example.com",
+            password="user123",
+            address="123 Street",
+            district="Trichy",
+            state="TN",
+            country="India",
+            pincode="620001",
+            phone="9876543210"
+        )
+        self.pen = Product.objects.create(name="Pen", brand="Cello", description="Blue", price=10, quantity=5)
+        self.book = Product.objects.create(name="Book", brand="Classmate", description="A4", price=50, quantity=1)
+
+    def test_order_is_all_or_nothing(self):
+        response = self.client.post(reverse('direct-order'), {
+            "user_id": self.user.id,
+            "products": [{"product_id": self.pen.id, "quantity": 2}, {"product_id": self.book.id, "quantity": 2}],
+            "confirm_dispatch": "yes",
+            "payment_mode": "cod",
+            "distance": 1
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data["message"], f"Insufficient stock for product ID {self.book.id}")
+
+        self.pen.refresh_from_db()
+        self.assertEqual((self.pen.quantity, self.pen.sold_count), (5, 0))
+        self.assertFalse(Order.objects.exists())
+
+    def test_cart_order_takes_stock_and_clears_cart(self):
+        Cart.objects.create(user=self.user, product=self.pen, quantity=3)
+        Cart.objects.create(user=self.user, product=self.book, quantity=1)
+        response = self.client.post(reverse('place-cart-order'), {
+            "user_id": self.user.id,
+            "products": [],
+            "confirm_dispatch": "yes",
+            "payment_mode": "cod",
+            "distance": 1
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.pen.refresh_from_db()
+        self.assertEqual((self.pen.quantity, self.pen.sold_count), (2, 3))
+        self.assertFalse(Cart.objects.filter(user=self.user).exists())
+
+
+    def test_order_items_are_written_in_one_statement(self):
+        products = [
+            Product.objects.create(name=f"Item {n}", brand="Cello", description="", price=5, quantity=10)
+            for n in range(6)
+        ]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse('direct-order'), {
+                "user_id": self.user.id,
+                "products": [{"product_id": product.id, "quantity": 1} for product in products],
+                "confirm_dispatch": "yes",
+                "payment_mode": "cod",
+                "distance": 1
+            }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        inserts = [q for q in queries.captured_queries if q["sql"].startswith('INSERT INTO "shoppy_orderitem"')]
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual(Order.objects.get().items.count(), 6)
+
+class CheckoutConcurrencyTests(APITransactionTestCase):
+    BUYERS = 24
+    STOCK = 10
+    MAX_ATTEMPTS = 200
+
+    def setUp(self):
+        self.user = User.objects.create(
+            name="Test User",
+            email="user@example.com",
+            password="user123",
+            address="123 Street",
+            district="Trichy",
+            state="TN",
+            country="India",
+            pincode="620001",
+            phone="9876543210"
+        )
+        self.product = Product.objects.create(
+            name="Phone", brand="Nokia", description="Last units", price=100, quantity=self.STOCK
+        )
+
+    def buy(self, barrier, results):
+        client = APIClient()
+        barrier.wait()
+        try:
+            # SQLite's shared in-memory test database fails a competing writer
+            # at once instead of waiting for the lock; such attempts roll back
+            # and are retried, as a client would after a deadlock on MySQL. A
+            # buyer still failing after MAX_ATTEMPTS reports its 500.
+            for _ in range(self.MAX_ATTEMPTS):
+                response = client.post(reverse('direct-order'), {
+                    "user_id": self.user.id,
+                    "products": [{"product_id": self.product.id, "quantity": 1}],
+                    "confirm_dispatch": "yes",
+                    "payment_mode": "cod",
+                    "distance": 1
+                }, format='json')
+                if response.status_code != status.HTTP_500_INTERNAL_SERVER_ERROR:
+                    break
+            results.append(response.status_code)
+        finally:
+            connection.close()
+
+    def test_concurrent_duplicates_place_one_order(self):
+        barrier = threading.Barrier(8)
+        responses = []
+
+        def retry(barrier):
+            client = APIClient(raise_request_exception=False)
+            barrier.wait()
+            try:
+                # Lock errors from SQLite are retried as in buy().
+                for _ in range(self.MAX_ATTEMPTS):
+                    response = client.post(reverse('direct-order'), {
+                        "user_id": self.user.id,
+                        "products": [{"product_id": self.product.id, "quantity": 1}],
+                        "confirm_dispatch": "yes",
+                        "payment_mode": "cod",
+                        "distance": 1
+                    }, format='json', HTTP_IDEMPOTENCY_KEY="retry-1")
+                    if response.status_code != status.HTTP_500_INTERNAL_SERVER_ERROR:
+                        break
+                responses.append(response)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=retry, args=(barrier,)) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(Order.objects.count(), 1)
+        self.assertEqual(len(responses), 8)
+        self.assertEqual({response.status_code for response in responses}, {status.HTTP_201_CREATED})
+        self.assertEqual({response.data["data"]["order_id"] for response in responses}, {Order.objects.get().id})
+
+    def test_concurrent_orders_never_oversell(self):
+        barrier = threading.Barrier(self.BUYERS)
+        results = []
+        threads = [threading.Thread(target=self.buy, args=(barrier, results)) for _ in range(self.BUYERS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.product.refresh_from_db()
+        self.assertNotIn(status.HTTP_500_INTERNAL_SERVER_ERROR, results,
+                         f"a buyer still failed after {self.MAX_ATTEMPTS} attempts")
+        self.assertEqual(results.count(status.HTTP_201_CREATED), self.STOCK)
+        self.assertEqual(results.count(status.HTTP_400_BAD_REQUEST), self.BUYERS - self.STOCK)
+        self.assertEqual((self.product.quantity, self.product.sold_count), (0, self.STOCK))
+        self.assertEqual(Order.objects.count(), self.STOCK)
+
+    def test_sale_during_sharded_restock_is_kept(self):
+        admin = User.objects.create(name="Admin", email="admin@emarket.com", password="admin", phone="1",
+                                    is_admin=True, is_superuser=True)
+        _, token = AuthToken.objects.create(admin)
+        inventory.shard_product(self.product.id, 4)
+        results = []
+
+        def sell():
+            client = APIClient(raise_request_exception=False)
+            try:
+                # Blocked by the restock's locks until it commits; retried like buy().
+                for _ in range(self.MAX_ATTEMPTS):
+                    response = client.post(reverse('direct-order'), {
+                        "user_id": self.user.id,
+                        "products": [{"product_id": self.product.id, "quantity": 1}],
+                        "confirm_dispatch": "yes",
+                        "payment_mode": "cod",
+                        "distance": 1
+                    }, format='json')
+                    if response.status_code != status.HTTP_500_INTERNAL_SERVER_ERROR:
+                        break
+                    time.sleep(0.01)
+                results.append(response.status_code)
+            finally:
+                connection.close()
+
+        buyer = threading.Thread(target=sell)
+        redistribute = inventory.redistribute
+
+        def sell_then_redistribute(product_ids):
+            # The checkout arrives between the restock's sync and its redistribute.
+            buyer.start()
+            buyer.join(timeout=0.5)
+            redistribute(product_ids)
+
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token)
+        with patch('shoppy.inventory.redistribute', side_effect=sell_then_redistribute):
+            response = self.client.post(reverse('product-restock', args=[self.product.id]), {"quantity": 5},
+                                        format='json')
+        buyer.join()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(results, [status.HTTP_201_CREATED])
+        inventory.sync()
+        self.product.refresh_from_db()
+        self.assertEqual((self.product.quantity, self.product.sold_count), (self.STOCK + 5 - 1, 1))
+
+
+class IdempotencyTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create(
+            name="Test User",
+            email="user@example.com",
+            password="user123",
+            address="123 Street",
+            district="Trichy",
+            state="TN",
+            country="India",
+            pincode="620001",
+            phone="9876543210"
+        )
+        self.pen = Product.objects.create(name="Pen", brand="Cello", description="Blue", price=10, quantity=5)
+        self.order = {
+            "user_id": self.user.id,
+            "products": [{"product_id": self.pen.id, "quantity": 1}],
+            "confirm_dispatch": "yes",
+            "payment_mode": "cod",
+            "distance": 1
+        }
+
+    def test_repeated_key_replays_first_response(self):
+        first = self.client.post(reverse('direct-order'), self.order, format='json', HTTP_IDEMPOTENCY_KEY="abc")
+        second = self.client.post(reverse('direct-order'), self.order, format='json', HTTP_IDEMPOTENCY_KEY="abc")
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(second.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(second.json(), first.json())
+        self.assertEqual(second["Idempotent-Replayed"], "true")
+        self.assertEqual(Order.objects.count(), 1)
+        self.pen.refresh_from_db()
+        self.assertEqual(self.pen.quantity, 4)
+
+        other = self.client.post(reverse('direct-order'), self.order, format='json', HTTP_IDEMPOTENCY_KEY="def")
+        self.assertNotEqual(other.data["data"]["order_id"], first.data["data"]["order_id"])
+
+    def test_key_reused_with_different_body_is_rejected(self):
+        self.client.post(reverse('direct-order'), self.order, format='json', HTTP_IDEMPOTENCY_KEY="abc")
+        self.order["products"][0]["quantity"] = 2
+        response = self.client.post(reverse('direct-order'), self.order, format='json', HTTP_IDEMPOTENCY_KEY="abc")
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_keys_are_scoped_per_user(self):
+        other = User.objects.create(name="Other", email="other@example.com", password="x", address="2 Street",
+                                    phone="9876543211")
+        self.client.post(reverse('direct-order'), self.order, format='json', HTTP_IDEMPOTENCY_KEY="abc")
+        response = self.client.post(reverse('direct-order'), dict(self.order, user_id=other.id), format='json',
+                                    HTTP_IDEMPOTENCY_KEY="abc")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertNotIn("Idempotent-Replayed", response)
+        self.assertEqual(Order.objects.filter(user=other).count(), 1)
+
+    def test_expired_lease_is_taken_over(self):
+        # A worker died while holding the key: its row never got a response.
+        now = timezone.now()
+        IdempotencyKey.objects.create(
+            scope="direct-order", owner=f"user:{self.user.id}", key="abc", fingerprint=_fingerprint(self.order),
+            lease="dead", lease_expires_at=now - timedelta(seconds=1), expires_at=now + timedelta(hours=1)
+        )
+        response = self.client.post(reverse('direct-order'), self.order, format='json', HTTP_IDEMPOTENCY_KEY="abc")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(IdempotencyKey.objects.get().response_code, 201)
+
+    def test_interrupted_request_releases_key(self):
+        with patch('shoppy.views.orderview.take_stock', side_effect=KeyboardInterrupt):
+            with self.assertRaises(KeyboardInterrupt):
+                self.client.post(reverse('direct-order'), self.order, format='json', HTTP_IDEMPOTENCY_KEY="abc")
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+
+class PricingTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create(
+            name="Test User",
+            email="user@example.com",
+            password="user123",
+            address="123 Street",
+            district="Trichy",
+            state="TN",
+            country="India",
+            pincode="620001",
+            phone="9876543210"
+        )
+        self.pen = Product.objects.create(name="Pen", brand="Cello", description="Blue", price="10.99", quantity=50)
+        self.book = Product.objects.create(name="Book", brand="Classmate", description="A4", price="0.15", quantity=50)
+        catalog.clear()
+
+    def test_quote_endpoint_prices_many_carts(self):
+        response = self.client.post(reverse('quote'), {"carts": [
+            {"products": [{"product_id": self.pen.id, "quantity": 3}], "payment_mode": "cod", "distance": 4},
+            {"products": [{"product_id": self.pen.id, "quantity": 1}, {"product_id": self.book.id, "quantity": 3}],
+             "payment_mode": "online", "distance": 4},
+            {"products": [{"product_id": 999, "quantity": 1}], "payment_mode": "online", "distance": 0},
+        ]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        cod, online, unknown = response.data["data"]
+        self.assertEqual(cod, {"subtotal": "32.97", "shipping_fee": "50.00", "cod_surcharge": "40.00",
+                               "gst_amount": "0.00", "total": "122.97", "missing": []})
+        # 11.44 * 0.08 = 0.9152 rounds half-up to 0.92.
+        self.assertEqual((online["subtotal"], online["gst_amount"], online["total"]), ("11.44", "0.92", "62.36"))
+        self.assertEqual(unknown["missing"], [999])
+
+    def test_online_order_total_matches_quote(self):
+        response = self.client.post(reverse('direct-order'), {
+            "user_id": self.user.id,
+            "products": [{"product_id": self.pen.id, "quantity": 1}, {"product_id": self.book.id, "quantity": 3}],
+            "confirm_dispatch": "yes",
+            "payment_mode": "online",
+            "distance": 4
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Order.objects.get().total, Decimal("62.36"))
+
+    def test_non_positive_quantity_is_rejected(self):
+        response = self.client.post(reverse('direct-order'), {
+            "user_id": self.user.id,
+            "products": [{"product_id": self.pen.id, "quantity": -5}],
+            "confirm_dispatch": "yes",
+            "payment_mode": "cod",
+            "distance": 1
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.pen.refresh_from_db()
+        self.assertEqual(self.pen.quantity, 50)
+
+
+class StockHoldTests(APITestCase):
+    def setUp(self):
+        self.alice = User.objects.create(
+            name="Alice", email="alice@example.com", password="x", address="1 Street", phone="9876543210"
+        )
+        self.bob = User.objects.create(
+            name="Bob", email="bob@example.com", password="x", address="2 Street", phone="9876543211"
+        )
+        self.phone = Product.objects.create(name="Phone", brand="Nokia", description="Flash sale", price=100,
+                                            quantity=2)
+
+    def add_to_cart(self, user, quantity):
+        return self.client.post(reverse('cart'), {"user": user.id, "product": self.phone.id, "quantity": quantity},
+                                format='json')
+
+    def order(self, url, user, products):
+        return self.client.post(reverse(url), {
+            "user_id": user.id,
+            "products": products,
+            "confirm_dispatch": "yes",
+            "payment_mode": "cod",
+            "distance": 1
+        }, format='json')
+
+    def available(self, **params):
+        response = self.client.get(reverse('product-availability'), {"ids": str(self.phone.id), **params})
+        return response.data["data"][self.phone.id]
+
+    def test_cart_hold_blocks_other_buyers_until_checkout(self):
+        self.assertEqual(self.add_to_cart(self.alice, 2).status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.available(), 0)
+        self.assertEqual(self.available(user_id=self.alice.id), 2)
+
+        self.assertEqual(self.add_to_cart(self.bob, 1).status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.order('direct-order', self.bob, [{"product_id": self.phone.id, "quantity": 1}])
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.order('place-cart-order', self.alice, [])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.phone.refresh_from_db()
+        self.assertEqual(self.phone.quantity, 0)
+        self.assertFalse(StockHold.objects.exists())
+
+    def test_direct_order_releases_buyers_hold(self):
+        self.add_to_cart(self.alice, 1)
+        response = self.order('direct-order', self.alice, [{"product_id": self.phone.id, "quantity": 1}])
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertFalse(StockHold.objects.exists())
+        self.assertEqual(self.add_to_cart(self.bob, 1).status_code, status.HTTP_201_CREATED)
+
+    def test_partial_direct_order_keeps_the_rest_of_the_hold(self):
+        self.phone.quantity = 3
+        self.phone.save()
+        self.add_to_cart(self.alice, 2)
+        response = self.order('direct-order', self.alice, [{"product_id": self.phone.id, "quantity": 1}])
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(StockHold.objects.get(user=self.alice).quantity, 1)
+        # 2 left, 1 still held for alice's cart line.
+        self.assertEqual(self.add_to_cart(self.bob, 2).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.add_to_cart(self.bob, 1).status_code, status.HTTP_201_CREATED)
+
+    def test_removing_cart_line_releases_hold(self):
+        self.add_to_cart(self.alice, 2)
+        line = Cart.objects.get(user=self.alice)
+        self.client.delete(reverse('remove-cart-item', args=[line.id]))
+        self.assertEqual(self.available(), 2)
+
+    def test_expired_holds_are_ignored_and_swept(self):
+        self.add_to_cart(self.alice, 2)
+        StockHold.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(self.available(), 2)
+        self.assertEqual(self.add_to_cart(self.bob, 1).status_code, status.HTTP_201_CREATED)
+
+        out = StringIO()
+        call_command('sweep_stock_holds', '--batch-size', '1', stdout=out)
+        self.assertIn("Swept 1", out.getvalue())
+        self.assertEqual(list(StockHold.objects.values_list('user_id', flat=True)), [self.bob.id])
+
+
+class ShardedInventoryTests(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create(
+            name="Admin",
+            email="admin@emarket.com",
+            password="admin",
+            address="Trichy",
+            district="D",
+            state="S",
+            country="C",
+            pincode="620001",
+            phone="9876543210",
+            is_admin=True,
+            is_superuser=True
+        )
+        _, self.token = AuthToken.objects.create(self.admin)
+        self.phone = Product.objects.create(name="Phone", brand="Nokia", description="Promo", price=100, quantity=10)
+        catalog.clear()
+        self.addCleanup(catalog.clear)
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('shard_stock', str(self.phone.id), '--shards', '4', stdout=StringIO())
+
+    def order(self, quantity, product=None):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(reverse('direct-order'), {
+                "user_id": self.admin.id,
+                "products": [{"product_id": (product or self.phone).id, "quantity": quantity}],
+                "confirm_dispatch": "yes",
+                "payment_mode": "cod",
+                "distance": 1
+            }, format='json')
+
+    def detail(self):
+        return self.client.get(reverse('product-detail', args=[self.phone.id])).data["data"]
+
+    def test_checkout_takes_from_shards_and_listing_reads_their_sum(self):
+        self.assertEqual(sorted(StockShard.objects.values_list('quantity', flat=True)), [2, 2, 3, 3])
+        self.assertEqual(self.order(4).status_code, status.HTTP_201_CREATED)
+
+        self.assertEqual(StockShard.objects.aggregate(total=Sum('quantity'))["total"], 6)
+        self.assertEqual((self.detail()["quantity"], self.detail()["sold_count"]), (6, 4))
+        listed = self.client.get(reverse('product-list')).data["data"]["results"]
+        self.assertEqual(listed[0]["quantity"], 6)
+        self.phone.refresh_from_db()
+        self.assertEqual(self.phone.quantity, 10)  # mirror untouched by checkout
+
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('shard_stock', '--sync', stdout=StringIO())
+        self.phone.refresh_from_db()
+        self.assertEqual((self.phone.quantity, self.phone.sold_count), (6, 4))
+
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('product-restock', args=[self.phone.id]), {"quantity": 6}, format='json')
+        self.assertEqual(StockShard.objects.aggregate(total=Sum('quantity'))["total"], 12)
+        self.assertEqual(self.detail()["quantity"], 12)
+
+    def test_selling_out_updates_mirror_at_once(self):
+        self.assertEqual(self.order(11).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.order(10).status_code, status.HTTP_201_CREATED)
+        self.phone.refresh_from_db()
+        self.assertEqual((self.phone.quantity, self.phone.sold_count), (0, 10))
+        self.assertEqual(OutboxEvent.objects.get(topic=outbox.ORDER_PLACED).payload["sold_out"], [self.phone.id])
+        self.assertEqual(self.order(1).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_checkout_does_not_trust_a_stale_sharded_hint(self):
+        tablet = Product.objects.create(name="Tablet", brand="Lenovo", description="Promo", price=300, quantity=3)
+        self.client.get(reverse('product-list'))  # caches the per-process sharded hint
+        # shard_stock ran in another process: the shards exist, this
+        # process's hint was never told.
+        StockShard.objects.bulk_create([
+            StockShard(product=tablet, index=0, quantity=2), StockShard(product=tablet, index=1, quantity=1)
+        ])
+
+        self.assertEqual(self.order(3, tablet).status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.order(1, tablet).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(StockShard.objects.filter(product=tablet).aggregate(total=Sum('quantity'))["total"], 0)
+        tablet.refresh_from_db()
+        self.assertEqual((tablet.quantity, tablet.sold_count), (0, 3))
+
+    def test_holds_on_a_sharded_product_leave_its_row_alone(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(reservations.reserve(self.admin.id, {self.phone.id: 9}), {})
+        self.assertFalse([query for query in queries if 'shoppy_product' in query['sql']])
+        self.assertEqual(reservations.reserve(self.admin.id, {self.phone.id: 11}), {self.phone.id: "Only 10 in stock"})
+        self.assertEqual(StockHold.objects.get(user=self.admin, product=self.phone).quantity, 9)
+
+    def test_sharded_sale_changes_etag(self):
+        etag = self.client.get(reverse('product-list'))["ETag"]
+        self.order(2)
+        response = self.client.get(reverse('product-list'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["data"]["results"][0]["quantity"], 8)
+
+    def test_mixed_bulk_update_only_redistributes_quantity_patches(self):
+        book = Product.objects.create(name="Book", brand="Classmate", description="A4", price=50, quantity=5)
+        self.order(4)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('product-bulk-update'), {"products": [
+                {"id": self.phone.id, "price": "90"},
+                {"id": book.id, "quantity": 9},
+            ]}, format='json')
+
+        self.assertEqual(response.data["data"]["updated"], 2)
+        # The price patch must not reset the shards to the mirror's 10 units.
+        self.assertEqual(StockShard.objects.aggregate(total=Sum('quantity'))["total"], 6)
+        self.phone.refresh_from_db()
+        self.assertEqual((self.phone.price, self.phone.quantity, self.phone.sold_count), (Decimal("90"), 6, 4))
+        self.assertEqual(self.detail()["quantity"], 6)
+
+
+class OrderHistoryTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create(
+            name="Test User",
+            email="user@example.com",
+            password="user123",
+            address="123 Street",
+            district="Trichy",
+            state="TN",
+            country="India",
+            pincode="620001",
+            phone="9876543210"
+        )
+        self.other = User.objects.create(name="Other", email="other@example.com", password="x", phone="1")
+        self.pen = Product.objects.create(name="Pen", brand="Cello", description="Blue", price=10, quantity=50)
+        self.book = Product.objects.create(name="Book", brand="Classmate", description="A4", price=50, quantity=50)
+        self.orders = [self.place(self.user) for _ in range(5)]
+        self.foreign = self.place(self.other)
+        _, token = AuthToken.objects.create(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token)
+
+    def place(self, user):
+        order = Order.objects.create(user=user, total=70)
+        OrderItem.objects.bulk_create([
+            OrderItem(order=order, product=self.pen, brand="Cello", quantity=2, price=10),
+            OrderItem(order=order, product=self.book, brand="Classmate", quantity=1, price=50),
+        ])
+        return order
+
+    def test_orders_are_listed_newest_first_by_cursor(self):
+        seen = []
+        url = reverse('order-list') + "?page_size=2"
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            seen += [order["id"] for order in response.data["data"]["results"]]
+            url = response.data["data"]["next"]
+        self.assertEqual(seen, [order.id for order in reversed(self.orders)])
+
+        first = self.client.get(reverse('order-list')).data["data"]["results"][0]
+        self.assertEqual([item["product_name"] for item in first["items"]], ["Pen", "Book"])
+
+    def test_order_page_costs_constant_queries(self):
+        with CaptureQueriesContext(connection) as small:
+            self.client.get(reverse('order-list'), {"page_size": 1})
+        with CaptureQueriesContext(connection) as large:
+            self.client.get(reverse('order-list'), {"page_size": 5})
+        self.assertEqual(len(small), len(large))
+
+    def test_order_detail_is_limited_to_owner(self):
+        response = self.client.get(reverse('order-detail', args=[self.orders[0].id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["data"]["items"]), 2)
+
+        response = self.client.get(reverse('order-detail', args=[self.foreign.id]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class JobQueueTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create(
+            name="Test User",
+            email="user@example.com",
+            password="user123",
+            address="123 Street",
+            district="Trichy",
+            state="TN",
+            country="India",
+            pincode="620001",
+            phone="9876543210"
+        )
+        self.pen = Product.objects.create(name="Pen", brand="Cello", description="Blue", price=10, quantity=5)
+
+    def test_order_invoice_is_rendered_and_emailed_by_workers(self):
+        response = self.client.post(reverse('direct-order'), {
+            "user_id": self.user.id,
+            "products": [{"product_id": self.pen.id, "quantity": 2}],
+            "confirm_dispatch": "yes",
+            "payment_mode": "cod",
+            "distance": 1
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        render_id = response.data["data"]["jobs"][jobs.RENDER_INVOICE]
+        self.assertFalse(Invoice.objects.exists())
+        self.assertEqual(len(mail.outbox), 0)
+
+        call_command('run_workers', '--workers', '1', '--once', stdout=StringIO())
+
+        order_id = response.data["data"]["order_id"]
+        self.assertTrue(Invoice.objects.filter(order_id=order_id).exists())
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn(f"Order #{order_id}", mail.outbox[0].subject)
+        self.assertEqual(self.client.get(reverse('job-status', args=[render_id])).status_code,
+                         status.HTTP_401_UNAUTHORIZED)
+        other = User.objects.create(name="Other", email="other@example.com", password="x", phone="1")
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + AuthToken.objects.create(other)[1])
+        self.assertEqual(self.client.get(reverse('job-status', args=[render_id])).status_code,
+                         status.HTTP_404_NOT_FOUND)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + AuthToken.objects.create(self.user)[1])
+        response = self.client.get(reverse('job-status', args=[render_id]))
+        self.assertEqual(response.data["data"]["status"], Job.STATUS_SUCCEEDED)
+        self.assertNotIn("last_error", response.data["data"])
+
+    def test_failing_job_backs_off_then_fails(self):
+        failing = lambda **payload: 1 / 0
+        with patch.dict(jobs.HANDLERS, {jobs.RENDER_INVOICE: failing}):
+            job = jobs.enqueue(jobs.RENDER_INVOICE, max_attempts=2, order_id=1)
+            self.assertEqual(jobs.run_pending(), 1)
+            job.refresh_from_db()
+            self.assertEqual((job.status, job.attempts), (Job.STATUS_PENDING, 1))
+            self.assertGreater(job.run_after, timezone.now())
+            self.assertIn("ZeroDivisionError", job.last_error)
+            self.assertEqual(jobs.run_pending(), 0)
+
+            Job.objects.filter(id=job.id).update(run_after=timezone.now())
+            self.assertEqual(jobs.run_pending(), 1)
+            job.refresh_from_db()
+            self.assertEqual((job.status, job.attempts), (Job.STATUS_FAILED, 2))
+
+    def test_email_waits_for_a_slow_render_without_using_attempts(self):
+        order = Order.objects.create(user=self.user, total=20)
+        render = jobs.enqueue(jobs.RENDER_INVOICE, order_id=order.id)
+        email = jobs.enqueue(jobs.EMAIL_INVOICE, order_id=order.id)
+        Job.objects.filter(id=render.id).update(status=Job.STATUS_RUNNING, locked_at=timezone.now())
+
+        for _ in range(email.max_attempts + 1):
+            Job.objects.filter(id=email.id).update(run_after=timezone.now())
+            self.assertEqual(jobs.run_pending(), 1)
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.attempts), (Job.STATUS_PENDING, 0))
+        self.assertIn("not rendered yet", email.last_error)
+
+        # Once the render has failed for good, waiting is over and attempts count.
+        Job.objects.filter(id=render.id).update(status=Job.STATUS_FAILED)
+        Job.objects.filter(id=email.id).update(run_after=timezone.now())
+        self.assertEqual(jobs.run_pending(), 1)
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.attempts), (Job.STATUS_PENDING, 1))
+        self.assertIn("failed to render", email.last_error)
+        self.assertEqual(len(mail.outbox), 0)
+
+
+class InvoicePdfTests(APITestCase):
+    def test_long_invoice_streams_onto_several_pages(self):
+        user = User.objects.create(name="Test User", email="user@example.com", password="user123",
+                                   address="123 Street", district="Trichy", state="TN", country="India",
+                                   pincode="620001", phone="9876543210")
+        pen = Product.objects.create(name="Pen", brand="Cello", description="Blue", price=10, quantity=500)
+        order = Order.objects.create(user=user, total=Decimal("2050.00"), dispatch_address=user.address,
+                                     dispatch_phone=user.phone)
+        OrderItem.objects.bulk_create([
+            OrderItem(order=order, product=pen, brand=pen.brand, quantity=1, price=pen.price) for _ in range(200)
+        ])
+
+        pdf = generate_invoice_pdf(order, order.items.select_related('product').iterator(chunk_size=50),
+                                   Decimal("2000.00"), Decimal("50.00"), "cod", cod_surcharge=Decimal("0"))
+
+        self.assertTrue(pdf.startswith(b"%PDF"))
+        self.assertEqual(pdf.count(b"/Type /Page\n"), 5)
+
+    def test_header_is_laid_out_once_per_process(self):
+        utils._invoice_header.cache_clear()
+        for _ in range(2):
+            p = canvas.Canvas(BytesIO())
+            utils._draw_invoice_header(p)
+        self.assertEqual(utils._invoice_header.cache_info().misses, 1)
+        live = canvas.Canvas(BytesIO())
+        live.drawText(utils._header_text(live))
+        self.assertEqual(p._code, live._code)
+
+        # A canvas that registered another font first names Helvetica-Bold
+        # differently; the cached operators would point at the wrong font.
+        p = canvas.Canvas(BytesIO())
+        p.setFont("Courier", 10)
+        utils._draw_invoice_header(p)
+        self.assertIn("/F3 16 Tf", p._code[-1])
+        self.assertNotIn("/F2 16 Tf", p._code[-1])
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class RegenerateInvoicesTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create(name="Test User", email="user@example.com", password="user123",
+                                        address="123 Street", district="Trichy", state="TN", country="India",
+                                        pincode="620001", phone="9876543210")
+        self.other = User.objects.create(name="Other", email="other@example.com", password="other123",
+                                         address="9 Road", district="Trichy", state="TN", country="India",
+                                         pincode="620001", phone="9876500000")
+        pen = Product.objects.create(name="Pen", brand="Cello", description="Blue", price=10, quantity=50)
+        self.orders = []
+        # 3 x 10 + 50 shipping + 2 km x 10 COD surcharge = 100; the second order's stored total is stale.
+        for user, total in ((self.user, "100.00"), (self.user, "1.00"), (self.other, "100.00"), (self.user, "100.00")):
+            order = Order.objects.create(user=user, total=Decimal(total), payment_mode="cod", distance=2,
+                                         dispatch_address=user.address, dispatch_phone=user.phone)
+            OrderItem.objects.create(order=order, product=pen, brand=pen.brand, quantity=3, price=Decimal("10.00"))
+            self.orders.append(order)
+        self.stale = Invoice.objects.create(order=self.orders[0], user=self.user, total=Decimal("1.00"),
+                                            invoice_id=f"invoice_{self.orders[0].id}.pdf", pdf_file="invoices/old.pdf")
+
+    def regenerate(self, *args):
+        out = StringIO()
+        call_command('regenerate_invoices', '--workers', '0', '--chunk-size', '2', *args, stdout=out)
+        return out.getvalue()
+
+    def test_regenerates_filtered_orders_in_chunks(self):
+        output = self.regenerate('--user', str(self.user.id), '--max-id', str(self.orders[1].id), '--reprice')
+
+        self.assertIn("Regenerated 2 invoices", output)
+        self.assertIn("1 created, 1 updated", output)
+        invoices = Invoice.objects.order_by('order_id')
+        self.assertEqual([invoice.order_id for invoice in invoices], [self.orders[0].id, self.orders[1].id])
+        self.stale.refresh_from_db()
+        self.assertRegex(self.stale.pdf_file.name, rf"^invoices/invoice_{self.orders[0].id}(_\w+)?\.pdf$")
+        for invoice in invoices:
+            self.assertEqual(invoice.total, Decimal("100.00"))
+            self.assertEqual(invoice.order.total, Decimal("100.00"))
+            with invoice.pdf_file.open('rb') as pdf:
+                self.assertTrue(pdf.read().startswith(b"%PDF"))
+
+    def test_orders_with_stale_totals_are_skipped_without_reprice(self):
+        output = self.regenerate('--user', str(self.user.id))
+
+        self.assertIn("Regenerated 2 invoices", output)
+        self.assertIn("Skipped 1 orders", output)
+        self.assertEqual(set(Invoice.objects.values_list('order_id', flat=True)), {self.orders[0].id, self.orders[3].id})
+        self.assertEqual(Order.objects.get(id=self.orders[1].id).total, Decimal("1.00"))
+
+    def test_replaced_files_are_deleted_after_commit(self):
+        storage = self.stale.pdf_file.storage
+        storage.save("invoices/old.pdf", ContentFile(b"old"))
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.regenerate('--max-id', str(self.orders[0].id))
+        self.stale.refresh_from_db()
+        self.assertTrue(storage.exists(self.stale.pdf_file.name))
+        self.assertTrue(storage.exists("invoices/old.pdf"))
+        for callback in callbacks:
+            callback()
+        self.assertFalse(storage.exists("invoices/old.pdf"))
+
+    def test_resumes_from_checkpoint(self):
+        checkpoint = os.path.join(tempfile.mkdtemp(), "progress.json")
+        with self.assertRaises(CommandError):
+            with open(checkpoint, 'w') as stream:
+                json.dump({"filters": {}, "last_order_id": 0}, stream)
+            self.regenerate('--checkpoint', checkpoint)
+
+        filters = {"since": None, "until": None, "user_id": self.user.id, "min_id": None, "max_id": None,
+                   "reprice": False}
+        with open(checkpoint, 'w') as stream:
+            json.dump({"filters": filters, "last_order_id": self.orders[1].id}, stream)
+        output = self.regenerate('--user', str(self.user.id), '--checkpoint', checkpoint)
+
+        self.assertIn(f"Resuming after order {self.orders[1].id}", output)
+        self.assertEqual(set(Invoice.objects.values_list('order_id', flat=True)), {self.orders[0].id, self.orders[3].id})
+        self.assertFalse(os.path.exists(checkpoint))
+
+
+class OutboxTests(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create(
+            name="Admin", email="admin@emarket.com", password="admin", address="Admin Street", district="Trichy",
+            state="TN", country="India", pincode="620001", phone="9876543210", is_admin=True
+        )
+        self.user = User.objects.create(
+            name="Test User", email="user@example.com", password="user123", address="123 Street",
+            district="Trichy", state="TN", country="India", pincode="620001", phone="9876543210"
+        )
+        self.pen = Product.objects.create(name="Pen", brand="Cello", description="Blue", price=10, quantity=2)
+
+    def order(self, quantity):
+        return self.client.post(reverse('direct-order'), {
+            "user_id": self.user.id,
+            "products": [{"product_id": self.pen.id, "quantity": quantity}],
+            "confirm_dispatch": "yes",
+            "payment_mode": "cod",
+            "distance": 1
+        }, format='json')
+
+    def test_events_are_written_with_the_change_and_relayed_later(self):
+        self.assertEqual(self.order(2).status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.order(1).status_code, status.HTTP_400_BAD_REQUEST)
+        order = Order.objects.get()
+        response = self.client.post(reverse('update-shipment-status'), {
+            "email": self.admin.email, "order_id": order.id, "shipment_status": "Dispatched"
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        events = list(OutboxEvent.objects.order_by('id').values_list('topic', 'payload'))
+        self.assertEqual(events, [
+            (outbox.ORDER_PLACED, {"order_id": order.id, "user_id": self.user.id, "product_ids": [self.pen.id],
+                                   "sold_out": [self.pen.id]}),
+            (outbox.SHIPMENT_STATUS_CHANGED, {"order_id": order.id, "user_id": self.user.id,
+                                              "shipment_status": "Dispatched", "previous_status": "Pending"}),
+        ])
+        self.assertEqual(len(mail.outbox), 0)
+
+        call_command('relay_outbox', '--once', stdout=StringIO())
+
+        self.assertEqual([message.subject for message in mail.outbox],
+                         [" Out of Stock Alert: Pen", f"E-Market Order #{order.id}: Dispatched"])
+        self.assertFalse(OutboxEvent.objects.exclude(status=OutboxEvent.STATUS_PUBLISHED).exists())
+        self.assertEqual(outbox.relay(), 0)
+        self.assertEqual(len(mail.outbox), 2)
+
+    def test_only_the_order_that_sold_out_alerts(self):
+        self.assertEqual(self.order(1).status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.order(1).status_code, status.HTTP_201_CREATED)
+        self.assertEqual([payload["sold_out"] for payload in OutboxEvent.objects.order_by('id')
+                          .values_list('payload', flat=True)], [[], [self.pen.id]])
+
+        # Both events are relayed after the sell-out; only the second alerts.
+        call_command('relay_outbox', '--once', stdout=StringIO())
+        self.assertEqual([message.subject for message in mail.outbox], [" Out of Stock Alert: Pen"])
+
+    def test_failed_delivery_is_retried(self):
+        event = outbox.publish(outbox.SHIPMENT_STATUS_CHANGED, order_id=1, user_id=1, shipment_status="Delivered",
+                               previous_status="In Transit")
+        failing = lambda **payload: 1 / 0
+        with patch.dict(outbox.SUBSCRIBERS, {outbox.SHIPMENT_STATUS_CHANGED: [failing]}):
+            self.assertEqual(outbox.relay(), 1)
+        event.refresh_from_db()
+        self.assertEqual((event.status, event.attempts, event.lease), (OutboxEvent.STATUS_PENDING, 1, ""))
+        self.assertGreater(event.available_at, timezone.now())
+        self.assertIn("ZeroDivisionError", event.last_error)
+        self.assertEqual(outbox.relay(), 0)
+
+        delivered = []
+        OutboxEvent.objects.filter(id=event.id).update(available_at=timezone.now())
+        with patch.dict(outbox.SUBSCRIBERS, {outbox.SHIPMENT_STATUS_CHANGED: [lambda **p: delivered.append(p)]}):
+            self.assertEqual(outbox.relay(), 1)
+        event.refresh_from_db()
+        self.assertEqual((event.status, event.attempts), (OutboxEvent.STATUS_PUBLISHED, 2))
+        self.assertEqual(delivered, [event.payload])
+
+    def test_expired_lease_is_delivered_again(self):
+        event = outbox.publish(outbox.SHIPMENT_STATUS_CHANGED, order_id=1, user_id=1, shipment_status="Delivered",
+                               previous_status="In Transit")
+        self.assertEqual(len(outbox.claim()), 1)
+        self.assertEqual(outbox.claim(), [])
+        OutboxEvent.objects.filter(id=event.id).update(locked_at=timezone.now() - jobs.LOCK_TIMEOUT * 2)
+        self.assertEqual([e.id for e in outbox.claim()], [event.id])
+
+
 class ShipmentTests(APITestCase):
     def setUp(self):
         self.admin = User.objects.create(
@@ -168,6 +1664,7 @@ class ShipmentTests(APITestCase):
     def test_update_shipment_status(self):
         self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token)
         payload = {
+            "email": self.admin.email,
             "order_id": self.order.id,
             "shipment_status": "Dispatched"
         }
@@ -196,8 +1693,8 @@ class DashboardTests(APITestCase):
 
     def test_admin_dashboard(self):
         self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token)
-        response = self.client.get(self.url)
+        response = self.client.get(self.url, {"email": self.admin.email})
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertIn("total_users", response.data)
-        self.assertIn("total_products", response.data)
-        self.assertIn("total_orders", response.data)
+        self.assertIn("total_users", response.data["data"])
+        self.assertIn("total_products", response.data["data"])
+        self.assertIn("total_orders", response.data["data"])
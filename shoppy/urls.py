@@ -1,49 +1,22 @@
 from django.urls import path
 from knox import views as knox_views
 from shoppy.views.regloginview import (
-<<<<<<< HEAD
-    RegisterView, LoginView, VerifyOTPView,
-    ResendOTPView, LogoutView
-)
-
-=======
     RegisterView, LoginView, VerifyOTP,
     ResendOTP, LogoutView
 )
->>>>>>> 987dbcd (Initial project setup with working Django e-commerce backend)
 from shoppy.views.productview import (
-    ProductListView, ProductCreateView, ProductUpdateView,
-    ProductDeleteView, ProductRestockView
+    ProductListView, ProductDetailView, ProductSearchView, BestSellersView, ProductCreateView, ProductImportView,
+    ProductAvailabilityView, ProductUpdateView, ProductBulkUpdateView, ProductDeleteView, ProductRestockView
 )
-<<<<<<< HEAD
-
-from shoppy.views.orderview import CartView, PlaceCartOrderView, DirectOrderView
-from shoppy.views.orderview import ViewInvoicePDFView
-
-=======
 from shoppy.views.orderview import (
-    CartView, PlaceCartOrderView, DirectOrderView, ViewInvoicePDFView,
-    RemoveCartItemView
+    CartView, CartBatchView, PlaceCartOrderView, DirectOrderView, ViewInvoicePDFView,
+    RemoveCartItemView, JobStatusView, OrderListView, OrderDetailView,
+    QuoteView
 )
->>>>>>> 987dbcd (Initial project setup with working Django e-commerce backend)
 from shoppy.views.shipmentview import ShipmentStatusUpdateView
 from shoppy.views.admindashboardview import AdminDashboardView
 
 urlpatterns = [
-<<<<<<< HEAD
-    # Auth
-    path('register/', RegisterView.as_view(), name='register'),
-    path('login/', LoginView.as_view(), name='login'),
-    path('verify-otp/', VerifyOTPView.as_view(), name='verify-otp'),
-    path('resend-otp/', ResendOTPView.as_view(), name='resend-otp'),
-    path('logout/', LogoutView.as_view(), name='logout'),
-
-    # Knox Auth (optional)
-    path('knox-logout/', knox_views.LogoutView.as_view(), name='knox-logout'),
-    path('logout-all/', knox_views.LogoutAllView.as_view(), name='logout-all'),
-
-    # Products
-=======
     # Auth routes
     path('register/', RegisterView.as_view(), name='register'),
     path('login/', LoginView.as_view(), name='login'),
@@ -56,39 +29,35 @@ urlpatterns = [
     path('logout-all/', knox_views.LogoutAllView.as_view(), name='logout-all'),
 
     # Product routes
->>>>>>> 987dbcd (Initial project setup with working Django e-commerce backend)
     path('products/', ProductListView.as_view(), name='product-list'),
+    path('products/<int:id>/', ProductDetailView.as_view(), name='product-detail'),
+    path('products/best-sellers/', BestSellersView.as_view(), name='product-best-sellers'),
+    path('products/search/', ProductSearchView.as_view(), name='product-search'),
+    path('products/availability/', ProductAvailabilityView.as_view(), name='product-availability'),
     path('products/create/', ProductCreateView.as_view(), name='product-create'),
-    path('products/update/<int:pk>/', ProductUpdateView.as_view(), name='product-update'),
-    path('products/delete/<int:pk>/', ProductDeleteView.as_view(), name='product-delete'),
-    path('products/restock/<int:pk>/', ProductRestockView.as_view(), name='product-restock'),
-
-<<<<<<< HEAD
-    # Orders
-    path('cart/', CartView.as_view(), name='cart'),
-    path('cart/place-order/', PlaceCartOrderView.as_view(), name='place-cart-order'),
-    path('direct-order/', DirectOrderView.as_view(), name='direct-order'),
+    path('products/import/', ProductImportView.as_view(), name='product-import'),
+    path('products/update/<int:id>/', ProductUpdateView.as_view(), name='product-update'),
+    path('products/bulk-update/', ProductBulkUpdateView.as_view(), name='product-bulk-update'),
+    path('products/delete/<int:id>/', ProductDeleteView.as_view(), name='product-delete'),
+    path('products/restock/<int:id>/', ProductRestockView.as_view(), name='product-restock'),
 
-    # Invoices
-    path('invoice/<int:order_id>/', ViewInvoicePDF.as_view(), name='view-invoice'),
-=======
     # Cart & Order
     path('cart/', CartView.as_view(), name='cart'),
+    path('cart/batch/', CartBatchView.as_view(), name='cart-batch'),
     path('cart/remove/<int:id>/', RemoveCartItemView.as_view(), name='remove-cart-item'),
     path('cart/place-order/', PlaceCartOrderView.as_view(), name='place-cart-order'),
     path('direct-order/', DirectOrderView.as_view(), name='direct-order'),
+    path('quote/', QuoteView.as_view(), name='quote'),
+    path('orders/', OrderListView.as_view(), name='order-list'),
+    path('orders/<int:id>/', OrderDetailView.as_view(), name='order-detail'),
 
     # Invoice
     path('invoice/<int:order_id>/', ViewInvoicePDFView.as_view(), name='view-invoice'),
->>>>>>> 987dbcd (Initial project setup with working Django e-commerce backend)
+    path('jobs/<int:id>/', JobStatusView.as_view(), name='job-status'),
 
     # Shipment
     path('admin/update-shipment-status/', ShipmentStatusUpdateView.as_view(), name='update-shipment-status'),
 
-<<<<<<< HEAD
-    # Admin Dashboard
-=======
     # Dashboard
->>>>>>> 987dbcd (Initial project setup with working Django e-commerce backend)
     path('admin/dashboard/', AdminDashboardView.as_view(), name='admin-dashboard'),
 ]
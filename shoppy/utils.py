@@ -1,3 +1,4 @@
+import functools
 import random
 import string
 from datetime import timedelta
@@ -12,8 +13,6 @@ from reportlab.pdfgen import canvas
 
 from .models import OTP, Product, UserSession, Invoice, User, Cart
 
-<<<<<<< HEAD
-=======
 import logging
 import sys
 
@@ -35,7 +34,6 @@ def get_logger():
     return _logger
 
 
->>>>>>> 987dbcd (Initial project setup with working Django e-commerce backend)
 # ----------------------- OTP Functions -----------------------
 
 def generate_otp():
@@ -55,15 +53,8 @@ def send_otp_email(email, otp):
     message = f"Your OTP is: {otp}. It is valid for 5 minutes."
     EmailMessage(subject, message, to=[email]).send()
 
-<<<<<<< HEAD
-def notify_admin_out_of_stock(product):
-    subject = f"Product Out of Stock: {product.name}"
-    message = f"The product '{product.name}' is out of stock."
-    admin_email = "ashik1682003@gmail.com"
-    EmailMessage(subject, message, to=[admin_email]).send()
-=======
 
-def notify_admin_out_of_stock(product):
+def notify_admin_out_of_stock(product, fail_silently=True):
     subject = f" Out of Stock Alert: {product.name}"
     message = (
         f"Dear Admin,\n\n"
@@ -83,8 +74,15 @@ def notify_admin_out_of_stock(product):
         _logger.info(f"Out-of-stock email sent for product {product.name}")
     except Exception as e:
         _logger.error(f"Failed to send out-of-stock email for {product.name}: {e}")
+        if not fail_silently:
+            raise
+
+
+def send_shipment_status_email(user_email, order_id, shipment_status):
+    subject = f"E-Market Order #{order_id}: {shipment_status}"
+    message = f"The shipment status of your E-Market order #{order_id} is now '{shipment_status}'."
+    EmailMessage(subject, message, to=[user_email]).send()
 
->>>>>>> 987dbcd (Initial project setup with working Django e-commerce backend)
 
 def notify_users_product_restocked(product):
     subject = f"Product Restocked: {product.name}"
@@ -93,6 +91,18 @@ def notify_users_product_restocked(product):
     for user in users:
         EmailMessage(subject, message, to=[user.email]).send()
 
+
+def notify_users_products_restocked(products):
+    if not products:
+        return
+    if len(products) == 1:
+        return notify_users_product_restocked(products[0])
+    subject = f"{len(products)} Products Restocked on E-Market"
+    names = "\n".join(f"- {product.name} ({product.brand})" for product in products)
+    message = f"These products are available again on E-Market. Hurry before they sell out!\n\n{names}"
+    for email in User.objects.values_list('email', flat=True).iterator():
+        EmailMessage(subject, message, to=[email]).send()
+
 # ----------------------- Admin Check -----------------------
 
 def is_admin(user):
@@ -101,63 +111,113 @@ def is_admin(user):
     return user.email == "admin@emarket.com"
 
 # ----------------------- PDF Invoice Generation -----------------------
+#
+# The parts of an invoice that never change (title, company block, items
+# heading) are laid out once per process: _invoice_header() builds their
+# text object on a throwaway canvas and keeps its content-stream operators,
+# which every invoice then pastes onto its first page as they are. The
+# operators name fonts by per-document resource names (/F1, /F2), so the
+# paste is only valid when the invoice's canvas registers Helvetica and
+# Helvetica-Bold under the same names; _draw_invoice_header() checks that
+# and lays the header out afresh if they differ. The order-specific text is
+# laid out through one text object per page rather than one per string.
+# order_items is consumed as it is iterated, so passing an iterator keeps
+# memory flat for orders with thousands of lines.
+
+INVOICE_TOP = A4[1] - 50
+INVOICE_FONTS = ("Helvetica", "Helvetica-Bold")
+
+
+def _header_text(p):
+    text = p.beginText()
+    text.setFont("Helvetica-Bold", 16)
+    text.setTextOrigin(200, INVOICE_TOP)
+    text.textOut("E-Market Invoice")
+    text.setFont("Helvetica", 10)
+    text.setTextOrigin(50, INVOICE_TOP - 30)
+    text.textOut("E-Market, Dummy Address, Trichy")
+    text.setTextOrigin(50, INVOICE_TOP - 45)
+    text.textOut("Contact: 9876543210")
+    text.setFont("Helvetica-Bold", 12)
+    text.setTextOrigin(50, INVOICE_TOP - 120)
+    text.textOut("Items")
+    return text
+
+
+def _font_names(p):
+    """Register the invoice fonts on ``p`` in a fixed order; return their resource names."""
+    return tuple(p._doc.getInternalFontName(font) for font in INVOICE_FONTS)
+
+
+@functools.lru_cache(maxsize=None)
+def _invoice_header():
+    """Return the header's content-stream operators and the font names they use."""
+    p = canvas.Canvas(BytesIO(), pagesize=A4)
+    fonts = _font_names(p)
+    return _header_text(p).getCode(), fonts
+
+
+def _draw_invoice_header(p):
+    code, fonts = _invoice_header()
+    if _font_names(p) == fonts:
+        p.addLiteral(code)
+    else:
+        p.drawText(_header_text(p))
+
+
+def _invoice_text(p, y, x=60):
+    text = p.beginText(x, y)
+    text.setFont("Helvetica", 10, leading=15)
+    return text
+
 
 def generate_invoice_pdf(order, order_items, total_amount, shipping_fee, payment_mode, gst_amount=None, cod_surcharge=None):
     buffer = BytesIO()
     p = canvas.Canvas(buffer, pagesize=A4)
-    width, height = A4
-    y = height - 50
-
-    p.setFont("Helvetica-Bold", 16)
-    p.drawString(200, y, "E-Market Invoice")
-    y -= 30
+    _draw_invoice_header(p)
 
-    p.setFont("Helvetica", 10)
-    p.drawString(50, y, "E-Market, Dummy Address, Trichy")
-    y -= 15
-    p.drawString(50, y, "Contact: 9876543210")
-    y -= 30
+    def write(x, y, line):
+        text.setTextOrigin(x, y)
+        text.textOut(line)
 
-    p.drawString(50, y, f"Invoice Date: {timezone.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    y -= 15
-    p.drawString(50, y, f"Order ID: {order.id}")
-    p.drawString(300, y, f"User: {order.user.email}")
-    y -= 30
+    text = _invoice_text(p, INVOICE_TOP - 75, x=50)
+    text.textOut(f"Invoice Date: {timezone.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    write(50, INVOICE_TOP - 90, f"Order ID: {order.id}")
+    write(300, INVOICE_TOP - 90, f"User: {order.user.email}")
 
-    p.setFont("Helvetica-Bold", 12)
-    p.drawString(50, y, "Items")
-    y -= 20
-
-    p.setFont("Helvetica", 10)
+    y = INVOICE_TOP - 140
+    text.setTextOrigin(60, y)
     for item in order_items:
-        line = f"{item.product.name} - ₹{item.price} x {item.quantity} = ₹{item.price * item.quantity}"
-        p.drawString(60, y, line)
+        text.textLine(f"{item.product.name} - ₹{item.price} x {item.quantity} = ₹{item.price * item.quantity}")
         y -= 15
         if y < 100:
+            p.drawText(text)
             p.showPage()
-            y = height - 50
+            y = INVOICE_TOP
+            text = _invoice_text(p, y)
 
     y -= 20
-    p.drawString(50, y, f"Subtotal: ₹{total_amount}")
+    write(50, y, f"Subtotal: ₹{total_amount}")
     y -= 15
-    p.drawString(50, y, f"Shipping Fee: ₹{shipping_fee}")
+    write(50, y, f"Shipping Fee: ₹{shipping_fee}")
     if payment_mode.lower() == "cod" and cod_surcharge:
         y -= 15
-        p.drawString(50, y, f"COD Surcharge: ₹{cod_surcharge}")
+        write(50, y, f"COD Surcharge: ₹{cod_surcharge}")
     if payment_mode.lower() == "online" and gst_amount:
         y -= 15
-        p.drawString(50, y, f"GST (8%): ₹{gst_amount}")
+        write(50, y, f"GST (8%): ₹{gst_amount}")
     y -= 15
-    p.setFont("Helvetica-Bold", 12)
-    p.drawString(50, y, f"Total: ₹{order.total}")
+    text.setFont("Helvetica-Bold", 12)
+    write(50, y, f"Total: ₹{order.total}")
     y -= 30
 
-    p.setFont("Helvetica", 10)
-    p.drawString(50, y, f"Shipping Address: {order.dispatch_address}")
+    text.setFont("Helvetica", 10)
+    write(50, y, f"Shipping Address: {order.dispatch_address}")
     y -= 15
-    p.drawString(50, y, f"Phone: {order.dispatch_phone}")
+    write(50, y, f"Phone: {order.dispatch_phone}")
     y -= 30
-    p.drawString(50, y, "Thank you for shopping with E-Market!")
+    write(50, y, "Thank you for shopping with E-Market!")
+    p.drawText(text)
 
     p.showPage()
     p.save()
@@ -206,5 +266,6 @@ def get_client_ip(request):
 # ----------------------- Cart Total -----------------------
 
 def calculate_cart_total(user):
-    cart_items = Cart.objects.filter(user=user)
-    return sum(item.product.price * item.quantity for item in cart_items)
+    from .cart_store import get_cart_store
+
+    return get_cart_store().total(user.id)
@@ -1,34 +1,36 @@
 from shoppy.views.regloginview import (
     RegisterView,
     LoginView,
-<<<<<<< HEAD
-    VerifyOTPView,
-    ResendOTPView,
-=======
     VerifyOTP,
     ResendOTP,
->>>>>>> 987dbcd (Initial project setup with working Django e-commerce backend)
     LogoutView
 )
 
 from shoppy.views.productview import (
     IsAdminUser,
     ProductListView,
+    ProductDetailView,
+    ProductSearchView,
+    BestSellersView,
+    ProductAvailabilityView,
     ProductCreateView,
+    ProductImportView,
     ProductUpdateView,
+    ProductBulkUpdateView,
     ProductDeleteView,
     ProductRestockView
 )
 
 from shoppy.views.orderview import (
     CartView,
+    CartBatchView,
     PlaceCartOrderView,
     DirectOrderView,
-<<<<<<< HEAD
-    ViewInvoicePDF
-=======
-    ViewInvoicePDFView
->>>>>>> 987dbcd (Initial project setup with working Django e-commerce backend)
+    ViewInvoicePDFView,
+    JobStatusView,
+    OrderListView,
+    OrderDetailView,
+    QuoteView
 )
 
 from shoppy.views.shipmentview import ShipmentStatusUpdateView
@@ -1,328 +1,29 @@
-<<<<<<< HEAD
-import logging
-import sys
+from django.db import transaction
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 from drf_yasg.utils import swagger_auto_schema
-from shoppy.models import Order, Cart
-from shoppy.serializer import OrderSerializer, CartSerializer
-
-logger = logging.getLogger(__name__)
-logger.setLevel(logging.DEBUG)
-logger.addHandler(logging.StreamHandler(sys.stdout))
-
-class CartView(APIView):
-    permission_classes = [IsAuthenticated]
-
-    @swagger_auto_schema(request_body=CartSerializer)
-    def post(self, request):
-        try:
-            serializer = CartSerializer(data=request.data)
-            if serializer.is_valid():
-                user_id = serializer.validated_data["user"].id
-                product_id = serializer.validated_data["product"].id
-                existing = Cart.objects.filter(user_id=user_id, product_id=product_id).first()
-                if existing:
-                    data = {
-                        'response_code': 400,
-                        'status': 'Failed',
-                        'message': 'Product already in cart',
-                        'statusFlag': False,
-                        'errorDetails': None,
-                        'data': {}
-                    }
-                    logger.warning(f"Cart item already exists for user {user_id}, product {product_id}")
-                    return Response(data, status=status.HTTP_400_BAD_REQUEST)
-                serializer.save()
-                data = {
-                    'response_code': 201,
-                    'status': 'Success',
-                    'message': 'Product added to cart',
-                    'statusFlag': True,
-                    'errorDetails': None,
-                    'data': serializer.data
-                }
-                logger.info(f"Product {product_id} added to cart for user {user_id}")
-                return Response(data, status=status.HTTP_201_CREATED)
-            else:
-                data = {
-                    'response_code': 400,
-                    'status': 'Failed',
-                    'message': 'Invalid cart data',
-                    'statusFlag': False,
-                    'errorDetails': serializer.errors,
-                    'data': {}
-                }
-                logger.warning("Invalid cart data on cart add")
-                return Response(data, status=status.HTTP_400_BAD_REQUEST)
-        except Exception as e:
-            data = {
-                'response_code': 500,
-                'status': 'Failed',
-                'message': 'Internal server error',
-                'statusFlag': False,
-                'errorDetails': str(e),
-                'data': {}
-            }
-            logger.error("Internal server error in CartView", exc_info=True)
-            return Response(data, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-
-class CartListView(APIView):
-    permission_classes = [IsAuthenticated]
-
-    def get(self, request):
-        try:
-            carts = Cart.objects.filter(user=request.user)
-            serializer = CartSerializer(carts, many=True)
-            data = {
-                'response_code': 200,
-                'status': 'Success',
-                'message': 'List of cart items',
-                'statusFlag': True,
-                'errorDetails': None,
-                'data': serializer.data
-            }
-            logger.info(f"Cart items listed for user {request.user.id}")
-            return Response(data, status=status.HTTP_200_OK)
-        except Exception as e:
-            data = {
-                'response_code': 500,
-                'status': 'Failed',
-                'message': 'Internal server error',
-                'statusFlag': False,
-                'errorDetails': str(e),
-                'data': {}
-            }
-            logger.error("Internal server error in CartListView", exc_info=True)
-            return Response(data, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-
-class CartDeleteView(APIView):
-    permission_classes = [IsAuthenticated]
-
-    def get_object(self, pk, user):
-        try:
-            return Cart.objects.get(pk=pk, user=user)
-        except Cart.DoesNotExist:
-            return None
-
-    def delete(self, request, pk):
-        try:
-            cart = self.get_object(pk, request.user)
-            if cart is None:
-                data = {
-                    'response_code': 404,
-                    'status': 'Failed',
-                    'message': 'Cart item not found',
-                    'statusFlag': False,
-                    'errorDetails': None,
-                    'data': {}
-                }
-                logger.warning(f"Cart item not found for deletion: {pk}, user {request.user.id}")
-                return Response(data, status=status.HTTP_404_NOT_FOUND)
-            cart.delete()
-            data = {
-                'response_code': 200,
-                'status': 'Success',
-                'message': 'Cart item deleted',
-                'statusFlag': True,
-                'errorDetails': None,
-                'data': {'id': pk}
-            }
-            logger.info(f"Cart item {pk} deleted for user {request.user.id}")
-            return Response(data, status=status.HTTP_200_OK)
-        except Exception as e:
-            data = {
-                'response_code': 500,
-                'status': 'Failed',
-                'message': 'Internal server error',
-                'statusFlag': False,
-                'errorDetails': str(e),
-                'data': {}
-            }
-            logger.error("Internal server error in CartDeleteView", exc_info=True)
-            return Response(data, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-
-class PlaceOrderView(APIView):
-    permission_classes = [IsAuthenticated]
-
-    def post(self, request):
-        try:
-            carts = Cart.objects.filter(user=request.user)
-            if not carts:
-                data = {
-                    'response_code': 400,
-                    'status': 'Failed',
-                    'message': 'Cart is empty',
-                    'statusFlag': False,
-                    'errorDetails': None,
-                    'data': {}
-                }
-                logger.warning(f"Place order failed: Cart is empty for user {request.user.id}")
-                return Response(data, status=status.HTTP_400_BAD_REQUEST)
-
-            # Business logic: convert cart items into an order, clear the cart
-            # (You would need to replace this with your actual order creation logic)
-            carts.delete()
-            data = {
-                'response_code': 201,
-                'status': 'Success',
-                'message': 'Order placed',
-                'statusFlag': True,
-                'errorDetails': None,
-                'data': {}
-            }
-            logger.info(f"Order placed for user {request.user.id}")
-            return Response(data, status=status.HTTP_201_CREATED)
-        except Exception as e:
-            data = {
-                'response_code': 500,
-                'status': 'Failed',
-                'message': 'Internal server error',
-                'statusFlag': False,
-                'errorDetails': str(e),
-                'data': {}
-            }
-            logger.error("Internal server error in PlaceOrderView", exc_info=True)
-            return Response(data, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-
-class OrderListView(APIView):
-    permission_classes = [IsAuthenticated]
-
-    def get(self, request):
-        try:
-            orders = Order.objects.filter(user=request.user)
-            serializer = OrderSerializer(orders, many=True)
-            data = {
-                'response_code': 200,
-                'status': 'Success',
-                'message': 'List of orders',
-                'statusFlag': True,
-                'errorDetails': None,
-                'data': serializer.data
-            }
-            logger.info(f"Orders listed for user {request.user.id}")
-            return Response(data, status=status.HTTP_200_OK)
-        except Exception as e:
-            data = {
-                'response_code': 500,
-                'status': 'Failed',
-                'message': 'Internal server error',
-                'statusFlag': False,
-                'errorDetails': str(e),
-                'data': {}
-            }
-            logger.error("Internal server error in OrderListView", exc_info=True)
-            return Response(data, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-
-class OrderDetailView(APIView):
-    permission_classes = [IsAuthenticated]
-
-    def get_object(self, pk, user):
-        try:
-            return Order.objects.get(pk=pk, user=user)
-        except Order.DoesNotExist:
-            return None
-
-    def get(self, request, pk):
-        try:
-            order = self.get_object(pk, request.user)
-            if order is None:
-                data = {
-                    'response_code': 404,
-                    'status': 'Failed',
-                    'message': 'Order not found',
-                    'statusFlag': False,
-                    'errorDetails': None,
-                    'data': {}
-                }
-                logger.warning(f"Order not found: {pk}, user {request.user.id}")
-                return Response(data, status=status.HTTP_404_NOT_FOUND)
-            serializer = OrderSerializer(order)
-            data = {
-                'response_code': 200,
-                'status': 'Success',
-                'message': 'Order details',
-                'statusFlag': True,
-                'errorDetails': None,
-                'data': serializer.data
-            }
-            logger.info(f"Order details fetched: {pk}, user {request.user.id}")
-            return Response(data, status=status.HTTP_200_OK)
-        except Exception as e:
-            data = {
-                'response_code': 500,
-                'status': 'Failed',
-                'message': 'Internal server error',
-                'statusFlag': False,
-                'errorDetails': str(e),
-                'data': {}
-            }
-            logger.error("Internal server error in OrderDetailView", exc_info=True)
-            return Response(data, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-
-
-class PlaceCartOrderView(APIView):
-    def post(self, request):
-        try:
-            # Simulate placing order (replace with real logic)
-            return Response({
-                "response_code": 200,
-                "status": "Success",
-                "message": "Order placed successfully",
-                "statusFlag": True,
-                "errorDetails": None,
-                "data": {}
-            }, status=status.HTTP_200_OK)
-
-        except Exception as e:
-            return Response({
-                "response_code": 500,
-                "status": "Failed",
-                "message": "Internal server error",
-                "statusFlag": False,
-                "errorDetails": str(e),
-                "data": {}
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-
-class DirectOrderView(APIView):
-    permission_classes = [IsAuthenticated]
-
-    def post(self, request):
-        try:
-            # This is a placeholder. You should replace it with actual logic
-            return Response({
-                "response_code": 200,
-                "status": "Success",
-                "message": "Direct order placed successfully",
-                "statusFlag": True,
-                "errorDetails": None,
-                "data": {}
-            }, status=status.HTTP_200_OK)
-
-        except Exception as e:
-=======
-from rest_framework.views import APIView
-from rest_framework.response import Response
-from rest_framework import status
-from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 
-from shoppy.models import Product, Cart, Order, OrderItem, Invoice, User
+from shoppy.models import Product, Cart, Order, OrderItem, Invoice, Job, User
 from shoppy.serializer import (
-    CartSerializer, DirectOrderSerializer, OrderSerializer, OrderItemSerializer, InvoiceSerializer
+    CartSerializer, DirectOrderSerializer, OrderSerializer, OrderItemSerializer, InvoiceSerializer,
+    CartBatchSerializer, OrderHistorySerializer, QuoteSerializer, serialize_cart_rows
 )
 from shoppy.utils import (
-    generate_invoice_pdf,
-    send_invoice_email,
     calculate_cart_total,
     is_admin,
     create_user_session,
-    save_invoice_pdf_to_model,
     build_response,
     get_logger
 )
+from shoppy.cart_store import get_cart_store
+from shoppy.pagination import OrderCursorPagination
+from shoppy.checkout import InsufficientStock, take_stock
+from shoppy.jobs import enqueue_invoice
+from shoppy.pricing import quote_cart, quote_carts
+from shoppy import idempotency, outbox, reservations
 
 _logger=get_logger()
 
@@ -332,17 +33,26 @@ class CartView(APIView):
     def post(self, request):
         serializer = CartSerializer(data=request.data)
         if serializer.is_valid():
-            product_id = serializer.validated_data["product"].id
             user_id = serializer.validated_data["user"].id
-
-            existing = Cart.objects.filter(product_id=product_id, user_id=user_id).first()
-            if existing:
+            product_id = serializer.validated_data["product"].id
+            quantity = serializer.validated_data.get("quantity", 1)
+            with transaction.atomic():
+                errors = reservations.reserve(user_id, {product_id: quantity})
+                if errors:
+                    _logger.warning(f"Cart add rejected for user {user_id}: {errors}")
+                    return Response(build_response(400, "Failed", "Insufficient stock", data=errors, statusFlag=False),
+                                    status=400)
+                line = get_cart_store().add_line(user_id, product_id, quantity)
+                if line is None:
+                    # Keep the hold that goes with the existing line.
+                    transaction.set_rollback(True)
+            if line is None:
                 _logger.warning("Product already in cart")
                 return Response(build_response(400, "Failed", "Product already in cart", statusFlag=False), status=400)
 
-            serializer.save()
             _logger.info("Product added to cart")
-            return Response(build_response(201, "Success", "Product added to cart", data=serializer.data), status=201)
+            return Response(build_response(201, "Success", "Product added to cart",
+                                           data=serialize_cart_rows([line])[0]), status=201)
 
         _logger.error("Invalid cart data: %s", serializer.errors)
         return Response(build_response(400, "Failed", "Invalid data", data=serializer.errors, statusFlag=False),
@@ -350,9 +60,8 @@ class CartView(APIView):
 
     def get(self, request):
         user_id = request.query_params.get("user_id")
-        cart_items = Cart.objects.filter(user_id=user_id)
-        serializer = CartSerializer(cart_items, many=True)
-        return Response(build_response(200, "Success", "Cart items fetched", data=serializer.data))
+        cart_items = get_cart_store().get_lines(int(user_id)) if user_id and user_id.isdigit() else []
+        return Response(build_response(200, "Success", "Cart items fetched", data=serialize_cart_rows(cart_items)))
 
     @swagger_auto_schema(request_body=openapi.Schema(
         type=openapi.TYPE_OBJECT,
@@ -360,31 +69,60 @@ class CartView(APIView):
     ))
     def delete(self, request):
         user_id = request.data.get("user_id")
-        Cart.objects.filter(user_id=user_id).delete()
+        get_cart_store().clear(user_id)
+        reservations.release(user_id)
         _logger.info(f"Cart cleared for user {user_id}")
         return Response(build_response(204, "Success", "Cart cleared"))
 
 
+class CartBatchView(APIView):
+    @swagger_auto_schema(request_body=CartBatchSerializer)
+    def post(self, request):
+        serializer = CartBatchSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(build_response(400, "Failed", "Invalid data", data=serializer.errors, statusFlag=False),
+                            status=400)
+
+        user_id = serializer.validated_data["user_id"]
+        if not User.objects.filter(id=user_id).exists():
+            return Response(build_response(404, "Failed", "User not found", statusFlag=False), status=404)
+
+        # Repeated product IDs collapse to the last quantity given.
+        quantities = {item["product_id"]: item["quantity"] for item in serializer.validated_data["items"]}
+        store = get_cart_store()
+        with transaction.atomic():
+            errors = reservations.reserve(user_id, quantities)
+            if errors:
+                _logger.warning(f"Cart batch rejected for user {user_id}: {errors}")
+                return Response(build_response(400, "Failed", "Insufficient stock", data=errors, statusFlag=False),
+                                status=400)
+            store.set_quantities(user_id, quantities)
+        cart_items = store.get_lines(user_id)
+        _logger.info(f"Cart batch of {len(quantities)} lines saved for user {user_id}")
+        return Response(build_response(200, "Success", "Cart updated", data=serialize_cart_rows(cart_items)))
+
+
 class RemoveCartItemView(APIView):
     def delete(self, request, id):
-        item = Cart.objects.filter(id=id).first()
-        if not item:
+        line = get_cart_store().remove_line(id)
+        if not line:
             _logger.warning("Cart item not found")
             return Response(build_response(404, "Failed", "Item not found", statusFlag=False), status=404)
-        item.delete()
+        reservations.release(line["user_id"], [line["product_id"]])
         _logger.info(f"Cart item {id} removed")
         return Response(build_response(204, "Success", "Item removed from cart"))
 
 
 class PlaceCartOrderView(APIView):
-    @swagger_auto_schema(request_body=DirectOrderSerializer)
+    @swagger_auto_schema(request_body=DirectOrderSerializer, manual_parameters=[idempotency.header_parameter])
+    @idempotency.idempotent("place-cart-order")
     def post(self, request):
         serializer = DirectOrderSerializer(data=request.data)
         if serializer.is_valid():
             try:
                 data = serializer.validated_data
                 user = User.objects.get(id=data["user_id"])
-                cart_items = Cart.objects.filter(user=user)
+                cart_items = list(Cart.objects.filter(user=user))
 
                 if not cart_items:
                     return Response(build_response(400, "Failed", "Cart is empty", statusFlag=False), status=400)
@@ -399,45 +137,50 @@ class PlaceCartOrderView(APIView):
                         statusFlag=False
                     ), status=400)
 
-                order = Order.objects.create(
-                    user=user,
-                    dispatch_address=dispatch_address,
-                    dispatch_phone=dispatch_phone,
-                    payment_mode=data["payment_mode"],
-                    distance=data["distance"],
-                    is_direct=False
-                )
-
-                total_amount = 0
-                for item in cart_items:
-                    OrderItem.objects.create(
-                        order=order,
-                        product=item.product,
-                        brand=item.product.brand,
-                        quantity=item.quantity,
-                        price=item.product.price
+                with transaction.atomic():
+                    # The cart's holds become the real decrement: take_stock may use
+                    # them, and they are released with the cart below.
+                    products, sold_out = take_stock(
+                        ((item.product_id, item.quantity) for item in cart_items), user.id
+                    )
+                    order_items = [
+                        OrderItem(
+                            product=products[item.product_id],
+                            brand=products[item.product_id].brand,
+                            quantity=item.quantity,
+                            price=products[item.product_id].price
+                        )
+                        for item in cart_items
+                    ]
+                    quote = quote_cart(
+                        [(item.product_id, item.quantity) for item in order_items], data["payment_mode"],
+                        data["distance"], prices={product.id: product.price for product in products.values()}
                     )
-                    item.product.quantity -= item.quantity
-                    item.product.sold_count += item.quantity
-                    item.product.save()
-                    total_amount += item.product.price * item.quantity
-
-                cart_items.delete()
-
-                shipping_fee = 50
-                cod_surcharge = data["distance"] * 10 if data["payment_mode"].lower() == "cod" else 0
-                gst_amount = total_amount * 0.08 if data["payment_mode"].lower() == "online" else 0
-                total = total_amount + shipping_fee + cod_surcharge + gst_amount
-
-                order.total = total
-                order.save()
-
-                pdf = generate_invoice_pdf(order, order.items.all(), total_amount, shipping_fee, data["payment_mode"],
-                                           gst_amount, cod_surcharge)
-                invoice = save_invoice_pdf_to_model(order, pdf)
-                send_invoice_email(user.email, pdf, order.id)
 
-                return Response(build_response(200, "Success", "Order placed", data={"order_id": order.id}))
+                    order = Order.objects.create(
+                        user=user,
+                        dispatch_address=dispatch_address,
+                        dispatch_phone=dispatch_phone,
+                        payment_mode=data["payment_mode"],
+                        distance=data["distance"],
+                        total=quote["total"],
+                        is_direct=False
+                    )
+                    for item in order_items:
+                        item.order = order
+                    OrderItem.objects.bulk_create(order_items)
+
+                    get_cart_store().clear(user.id)
+                    reservations.release(user.id)
+                    jobs = enqueue_invoice(order, quote, data["payment_mode"])
+                    outbox.publish(outbox.ORDER_PLACED, order_id=order.id, user_id=user.id,
+                                   product_ids=sorted(products), sold_out=sold_out)
+
+                return Response(build_response(200, "Success", "Order placed",
+                                               data={"order_id": order.id, "jobs": jobs}))
+            except InsufficientStock as e:
+                _logger.warning("Cart order rejected: %s", str(e))
+                return Response(build_response(400, "Failed", str(e), statusFlag=False), status=400)
             except Exception as e:
                 _logger.error("Error placing cart order: %s", str(e))
                 return Response(
@@ -449,7 +192,8 @@ class PlaceCartOrderView(APIView):
 
 
 class DirectOrderView(APIView):
-    @swagger_auto_schema(request_body=DirectOrderSerializer)
+    @swagger_auto_schema(request_body=DirectOrderSerializer, manual_parameters=[idempotency.header_parameter])
+    @idempotency.idempotent("direct-order")
     def post(self, request):
         serializer = DirectOrderSerializer(data=request.data)
         if serializer.is_valid():
@@ -469,51 +213,48 @@ class DirectOrderView(APIView):
                         statusFlag=False
                     ), status=400)
 
-                order = Order.objects.create(
-                    user=user,
-                    dispatch_address=dispatch_address,
-                    dispatch_phone=dispatch_phone,
-                    payment_mode=data["payment_mode"],
-                    distance=data.get("distance", 0),
-                    is_direct=True
-                )
-
-                total_amount = 0
-                for item in data["products"]:
-                    product = Product.objects.filter(id=item["product_id"]).first()
-                    if not product or product.quantity < item["quantity"]:
-                        return Response(build_response(
-                            400, "Failed",
-                            f"Insufficient stock for product ID {item['product_id']}",
-                            statusFlag=False
-                        ), status=400)
-
-                    OrderItem.objects.create(
-                        order=order,
-                        product=product,
-                        brand=product.brand,
-                        quantity=item["quantity"],
-                        price=product.price
+                with transaction.atomic():
+                    products, sold_out = take_stock(
+                        ((item["product_id"], item["quantity"]) for item in data["products"]), user.id
+                    )
+                    order_items = [
+                        OrderItem(
+                            product=products[item["product_id"]],
+                            brand=products[item["product_id"]].brand,
+                            quantity=item["quantity"],
+                            price=products[item["product_id"]].price
+                        )
+                        for item in data["products"]
+                    ]
+                    quote = quote_cart(
+                        [(item.product_id, item.quantity) for item in order_items], data["payment_mode"],
+                        data["distance"], prices={product.id: product.price for product in products.values()}
                     )
-                    product.quantity -= item["quantity"]
-                    product.sold_count += item["quantity"]
-                    product.save()
-                    total_amount += product.price * item["quantity"]
-
-                shipping_fee = 50
-                cod_surcharge = data["distance"] * 10 if data["payment_mode"].lower() == "cod" else 0
-                gst_amount = total_amount * 0.08 if data["payment_mode"].lower() == "online" else 0
-                total = total_amount + shipping_fee + cod_surcharge + gst_amount
-
-                order.total = total
-                order.save()
-
-                pdf = generate_invoice_pdf(order, order.items.all(), total_amount, shipping_fee, data["payment_mode"],
-                                           gst_amount, cod_surcharge)
-                invoice = save_invoice_pdf_to_model(order, pdf)
-                send_invoice_email(user.email, pdf, order.id)
 
-                return Response(build_response(201, "Success", "Order placed", data={"order_id": order.id}), status=201)
+                    order = Order.objects.create(
+                        user=user,
+                        dispatch_address=dispatch_address,
+                        dispatch_phone=dispatch_phone,
+                        payment_mode=data["payment_mode"],
+                        distance=data["distance"],
+                        total=quote["total"],
+                        is_direct=True
+                    )
+                    for item in order_items:
+                        item.order = order
+                    OrderItem.objects.bulk_create(order_items)
+                    # take_stock used the buyer's own holds on these products first;
+                    # what it used of them is gone, the rest still backs their cart.
+                    reservations.consume(user.id, ((item.product_id, item.quantity) for item in order_items))
+                    jobs = enqueue_invoice(order, quote, data["payment_mode"])
+                    outbox.publish(outbox.ORDER_PLACED, order_id=order.id, user_id=user.id,
+                                   product_ids=sorted(products), sold_out=sold_out)
+
+                return Response(build_response(201, "Success", "Order placed",
+                                               data={"order_id": order.id, "jobs": jobs}), status=201)
+            except InsufficientStock as e:
+                _logger.warning("Direct order rejected: %s", str(e))
+                return Response(build_response(400, "Failed", str(e), statusFlag=False), status=400)
             except Exception as e:
                 _logger.error("Error placing direct order: %s", str(e))
                 return Response(
@@ -552,7 +293,6 @@ class ViewInvoicePDFView(APIView):
             }, status=status.HTTP_200_OK)
         except Exception as e:
             _logger.error(f"Error fetching invoice for order {order_id}: {str(e)}", exc_info=True)
->>>>>>> 987dbcd (Initial project setup with working Django e-commerce backend)
             return Response({
                 "response_code": 500,
                 "status": "Failed",
@@ -561,3 +301,83 @@ class ViewInvoicePDFView(APIView):
                 "errorDetails": str(e),
                 "data": {}
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class JobStatusView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, id):
+        # last_error holds worker tracebacks and stays out of the response.
+        job = Job.objects.filter(id=id).values(
+            "id", "kind", "status", "attempts", "max_attempts", "run_after", "created_at", "finished_at", "payload"
+        ).first()
+        user = request.user
+        if job and not (user.is_superuser or getattr(user, 'is_admin', False)):
+            # Other users only see the jobs of their own orders.
+            if not Order.objects.filter(id=job["payload"].get("order_id"), user=user).exists():
+                job = None
+        if not job:
+            return Response(build_response(404, "Failed", "Job not found", statusFlag=False), status=404)
+        del job["payload"]
+        return Response(build_response(200, "Success", "Job status fetched", data=job))
+
+
+def _order_queryset(request):
+    """Orders visible to the requester: their own, or any user's for admins (``?user_id=``)."""
+    user = request.user
+    orders = Order.objects.prefetch_related('items__product')
+    if user.is_superuser or getattr(user, 'is_admin', False):
+        user_id = request.query_params.get("user_id")
+        return orders.filter(user_id=user_id) if user_id and user_id.isdigit() else orders
+    return orders.filter(user=user)
+
+
+class OrderListView(APIView):
+    permission_classes = [IsAuthenticated]
+    pagination_class = OrderCursorPagination
+
+    @swagger_auto_schema(manual_parameters=[
+        openapi.Parameter("cursor", openapi.IN_QUERY, type=openapi.TYPE_STRING),
+        openapi.Parameter("page_size", openapi.IN_QUERY, type=openapi.TYPE_INTEGER),
+        openapi.Parameter("user_id", openapi.IN_QUERY, type=openapi.TYPE_INTEGER, description="Admins only"),
+    ])
+    def get(self, request):
+        paginator = self.pagination_class()
+        orders = paginator.paginate_queryset(_order_queryset(request), request, view=self)
+        data = paginator.get_paginated_data(OrderHistorySerializer(orders, many=True).data)
+        return Response(build_response(200, "Success", "Orders fetched", data=data))
+
+
+class OrderDetailView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, id):
+        order = _order_queryset(request).filter(id=id).first()
+        if not order:
+            _logger.warning(f"Order {id} not found for user {request.user.id}")
+            return Response(build_response(404, "Failed", "Order not found", statusFlag=False), status=404)
+        return Response(build_response(200, "Success", "Order fetched", data=OrderHistorySerializer(order).data))
+
+
+class QuoteView(APIView):
+    @swagger_auto_schema(request_body=QuoteSerializer)
+    def post(self, request):
+        serializer = QuoteSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(build_response(400, "Failed", "Invalid data", data=serializer.errors, statusFlag=False),
+                            status=400)
+
+        carts = [
+            {
+                "lines": [(item["product_id"], item["quantity"]) for item in cart["products"]],
+                "payment_mode": cart["payment_mode"],
+                "distance": cart["distance"],
+            }
+            for cart in serializer.validated_data["carts"]
+        ]
+        # Amounts go out as strings, like every other DecimalField in the API.
+        quotes = [
+            {key: value if key == "missing" else str(value) for key, value in quote.items()}
+            for quote in quote_carts(carts)
+        ]
+        return Response(build_response(200, "Success", "Quotes computed", data=quotes))
@@ -1,61 +1,29 @@
-<<<<<<< HEAD
-import logging
-import sys
-from rest_framework.views import APIView
-from rest_framework.response import Response
-from rest_framework import status
-from rest_framework.permissions import IsAuthenticated, IsAdminUser
-from drf_yasg.utils import swagger_auto_schema
-from shoppy.models import Product
-from shoppy.serializer import ProductSerializer
-
-logger = logging.getLogger(__name__)
-logger.setLevel(logging.DEBUG)
-logger.addHandler(logging.StreamHandler(sys.stdout))
-
-class ProductListView(APIView):
-    permission_classes = [IsAuthenticated]
-
-    def get(self, request):
-        try:
-            products = Product.objects.all()
-            serializer = ProductSerializer(products, many=True)
-            data = {
-                'response_code': 200,
-                'status': 'Success',
-                'message': 'List of products',
-                'statusFlag': True,
-                'errorDetails': None,
-                'data': serializer.data
-            }
-            logger.info("Product list fetched")
-            return Response(data, status=status.HTTP_200_OK)
-        except Exception as e:
-            data = {
-                'response_code': 500,
-                'status': 'Failed',
-                'message': 'Internal server error',
-                'statusFlag': False,
-                'errorDetails': str(e),
-                'data': {}
-            }
-            logger.error("Internal server error in ProductListView", exc_info=True)
-            return Response(data, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-
-class ProductCreateView(APIView):
-=======
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import BasePermission, IsAuthenticated
+from rest_framework.parsers import MultiPartParser
 from knox.auth import TokenAuthentication
+from django.db import transaction
 from drf_yasg.utils import swagger_auto_schema
+from drf_yasg import openapi
+from rest_framework.utils.urls import replace_query_param, remove_query_param
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
 
 from shoppy.models import Product
-from shoppy.serializer import ProductSerializer, ProductRestockSerializer
+from shoppy.serializer import (
+    ProductSerializer, ProductRestockSerializer, ProductBulkUpdateSerializer, ProductPatchSerializer, PRODUCT_FIELDS
+)
+from shoppy.pagination import ProductCursorPagination
+from shoppy.search import search_products
+from shoppy.facets import facet_values, filter_products, get_facet_summary
+from shoppy import catalog, inventory, leaderboard, reservations
+from shoppy.importer import import_products, open_text
 from shoppy.utils import (
     notify_admin_out_of_stock,
     notify_users_product_restocked,
+    notify_users_products_restocked,
     get_logger,
     build_response
 )
@@ -83,280 +51,307 @@ class IsAdminUser(BasePermission):
 
 # ----------------- Product Views ------------------
 
-class ProductListView(APIView):
-    def get(self, request):
-        products = Product.objects.all()
-        serializer = ProductSerializer(products, many=True)
-        _logger.info("Fetched all product list")
-        return Response(build_response(200, "Success", "Product list fetched", data=serializer.data))
+def _catalog_version(request):
+    # Read once per request; the ETag and Last-Modified checks both need it.
+    if not hasattr(request, "catalog_version"):
+        request.catalog_version = catalog.catalog_version()
+    return request.catalog_version
 
 
-class ProductCreateView(APIView):
-    authentication_classes = [TokenAuthentication]
->>>>>>> 987dbcd (Initial project setup with working Django e-commerce backend)
-    permission_classes = [IsAuthenticated, IsAdminUser]
+def catalog_etag(request, *args, **kwargs):
+    return f"catalog-{_catalog_version(request)[0]}"
 
-    @swagger_auto_schema(request_body=ProductSerializer)
-    def post(self, request):
-<<<<<<< HEAD
-        try:
-            serializer = ProductSerializer(data=request.data)
-            if serializer.is_valid():
-                product = serializer.save()
-                data = {
-                    'response_code': 201,
-                    'status': 'Success',
-                    'message': 'Product created',
-                    'statusFlag': True,
-                    'errorDetails': None,
-                    'data': serializer.data
-                }
-                logger.info(f"Product created: {product.name}")
-                return Response(data, status=status.HTTP_201_CREATED)
-            else:
-                data = {
-                    'response_code': 400,
-                    'status': 'Failed',
-                    'message': 'Invalid product data',
-                    'statusFlag': False,
-                    'errorDetails': serializer.errors,
-                    'data': {}
-                }
-                logger.warning("Invalid product data on creation")
-                return Response(data, status=status.HTTP_400_BAD_REQUEST)
-        except Exception as e:
-            data = {
-                'response_code': 500,
-                'status': 'Failed',
-                'message': 'Internal server error',
-                'statusFlag': False,
-                'errorDetails': str(e),
-                'data': {}
-            }
-            logger.error("Internal server error in ProductCreateView", exc_info=True)
-            return Response(data, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-class ProductDetailView(APIView):
-    permission_classes = [IsAuthenticated]
+def catalog_last_modified(request, *args, **kwargs):
+    return _catalog_version(request)[1]
 
-    def get_object(self, pk):
-        try:
-            return Product.objects.get(pk=pk)
-        except Product.DoesNotExist:
-            return None
 
-    def get(self, request, pk):
-        try:
-            product = self.get_object(pk)
-            if product is None:
-                data = {
-                    'response_code': 404,
-                    'status': 'Failed',
-                    'message': 'Product not found',
-                    'statusFlag': False,
-                    'errorDetails': None,
-                    'data': {}
-                }
-                logger.warning(f"Product not found: {pk}")
-                return Response(data, status=status.HTTP_404_NOT_FOUND)
-            serializer = ProductSerializer(product)
-            data = {
-                'response_code': 200,
-                'status': 'Success',
-                'message': 'Product details',
-                'statusFlag': True,
-                'errorDetails': None,
-                'data': serializer.data
-            }
-            logger.info(f"Product details fetched: {pk}")
-            return Response(data, status=status.HTTP_200_OK)
-        except Exception as e:
-            data = {
-                'response_code': 500,
-                'status': 'Failed',
-                'message': 'Internal server error',
-                'statusFlag': False,
-                'errorDetails': str(e),
-                'data': {}
-            }
-            logger.error("Internal server error in ProductDetailView", exc_info=True)
-            return Response(data, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+class ProductListView(APIView):
+    pagination_class = ProductCursorPagination
 
-class ProductUpdateView(APIView):
-    permission_classes = [IsAuthenticated, IsAdminUser]
+    # Conditional GETs are answered from the catalog version alone: a
+    # matching If-None-Match / If-Modified-Since returns 304 after one
+    # CatalogVersion lookup, before any product query or serialization.
+    @method_decorator(condition(etag_func=catalog_etag, last_modified_func=catalog_last_modified))
+    def get(self, request):
+        page_key = catalog.list_page_key(request.build_absolute_uri())
+        page = catalog.get_list_page(page_key)
+        if page is not None:
+            data = dict(page, results=catalog.get_products(page["ids"]))
+        else:
+            try:
+                products = filter_products(Product.objects.all(), request.query_params)
+            except ValueError as e:
+                return Response(build_response(400, "Failed", str(e), statusFlag=False), status=400)
+
+            paginator = self.pagination_class()
+            rows = paginator.paginate_queryset(products.values(*PRODUCT_FIELDS), request, view=self)
+            data = paginator.get_paginated_data(catalog.cache_products(rows))
+            catalog.set_list_page(page_key, {
+                "ids": [row["id"] for row in rows],
+                "next": data["next"],
+                "previous": data["previous"],
+            })
+
+        data.pop("ids", None)
+        data["results"] = inventory.overlay(data["results"])
+        data["facets"] = get_facet_summary()
+        _logger.info("Fetched product list page")
+        return Response(build_response(200, "Success", "Product list fetched", data=data))
 
-    def get_object(self, pk):
-        try:
-            return Product.objects.get(pk=pk)
-        except Product.DoesNotExist:
-            return None
 
-    @swagger_auto_schema(request_body=ProductSerializer)
-    def put(self, request, pk):
-        try:
-            product = self.get_object(pk)
-            if product is None:
-                data = {
-                    'response_code': 404,
-                    'status': 'Failed',
-                    'message': 'Product not found',
-                    'statusFlag': False,
-                    'errorDetails': None,
-                    'data': {}
-                }
-                logger.warning(f"Product not found on update: {pk}")
-                return Response(data, status=status.HTTP_404_NOT_FOUND)
-            serializer = ProductSerializer(product, data=request.data, partial=True)
-            if serializer.is_valid():
-                serializer.save()
-                data = {
-                    'response_code': 200,
-                    'status': 'Success',
-                    'message': 'Product updated',
-                    'statusFlag': True,
-                    'errorDetails': None,
-                    'data': serializer.data
-                }
-                logger.info(f"Product updated: {pk}")
-                return Response(data, status=status.HTTP_200_OK)
-            else:
-                data = {
-                    'response_code': 400,
-                    'status': 'Failed',
-                    'message': 'Invalid product data',
-                    'statusFlag': False,
-                    'errorDetails': serializer.errors,
-                    'data': {}
-                }
-                logger.warning(f"Invalid product data on update: {pk}")
-                return Response(data, status=status.HTTP_400_BAD_REQUEST)
-        except Exception as e:
-            data = {
-                'response_code': 500,
-                'status': 'Failed',
-                'message': 'Internal server error',
-                'statusFlag': False,
-                'errorDetails': str(e),
-                'data': {}
-            }
-            logger.error("Internal server error in ProductUpdateView", exc_info=True)
-            return Response(data, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+class ProductDetailView(APIView):
+    def get(self, request, id):
+        product = catalog.get_product(id)
+        if product is None:
+            _logger.warning(f"Product with ID {id} not found")
+            return Response(build_response(404, "Failed", "Product not found", statusFlag=False), status=404)
+        return Response(build_response(200, "Success", "Product fetched", data=inventory.overlay([product])[0]))
 
-class ProductDeleteView(APIView):
-    permission_classes = [IsAuthenticated, IsAdminUser]
 
-    def get_object(self, pk):
+class BestSellersView(APIView):
+    @swagger_auto_schema(manual_parameters=[
+        openapi.Parameter("brand", openapi.IN_QUERY, type=openapi.TYPE_STRING),
+        openapi.Parameter("limit", openapi.IN_QUERY, type=openapi.TYPE_INTEGER),
+    ])
+    def get(self, request):
+        brand = request.query_params.get("brand")
         try:
-            return Product.objects.get(pk=pk)
-        except Product.DoesNotExist:
-            return None
+            limit = min(max(int(request.query_params.get("limit", 10)), 1), 100)
+        except ValueError:
+            return Response(build_response(400, "Failed", "Invalid limit", statusFlag=False), status=400)
+
+        ranking = leaderboard.top_sellers(brand=brand, limit=limit)
+        products = {
+            product["id"]: product
+            for product in inventory.overlay(catalog.get_products([product_id for product_id, _ in ranking]))
+        }
+        data = [
+            dict(products[product_id], rank=rank, sold_count=sold_count)
+            for rank, (product_id, sold_count) in enumerate(ranking, start=1)
+            if product_id in products
+        ]
+        _logger.info(f"Fetched best sellers for brand '{brand or 'all'}'")
+        return Response(build_response(200, "Success", "Best sellers fetched", data=data))
+
+
+class ProductAvailabilityView(APIView):
+    @swagger_auto_schema(manual_parameters=[
+        openapi.Parameter("ids", openapi.IN_QUERY, type=openapi.TYPE_STRING, required=True,
+                          description="Comma-separated product IDs (at most 100)"),
+        openapi.Parameter("user_id", openapi.IN_QUERY, type=openapi.TYPE_INTEGER,
+                          description="Count this user's own holds as available"),
+    ])
+    def get(self, request):
+        try:
+            ids = [int(value) for value in request.query_params.get("ids", "").split(",") if value.strip()]
+            user_id = int(request.query_params["user_id"]) if request.query_params.get("user_id") else None
+        except ValueError:
+            return Response(build_response(400, "Failed", "ids and user_id must be integers", statusFlag=False),
+                            status=400)
+        if not ids or len(ids) > 100:
+            return Response(build_response(400, "Failed", "Pass between 1 and 100 product ids", statusFlag=False),
+                            status=400)
+
+        available = reservations.availability(ids, user_id=user_id)
+        return Response(build_response(200, "Success", "Availability fetched", data=available))
+
+
+class ProductSearchView(APIView):
+    page_size = 25
+    max_page_size = 100
+
+    @swagger_auto_schema(manual_parameters=[
+        openapi.Parameter("q", openapi.IN_QUERY, type=openapi.TYPE_STRING, required=True),
+        openapi.Parameter("page", openapi.IN_QUERY, type=openapi.TYPE_INTEGER),
+        openapi.Parameter("page_size", openapi.IN_QUERY, type=openapi.TYPE_INTEGER),
+    ])
+    def get(self, request):
+        query = request.query_params.get("q", "").strip()
+        if not query:
+            return Response(build_response(400, "Failed", "Search query is required", statusFlag=False), status=400)
 
-    def delete(self, request, pk):
         try:
-            product = self.get_object(pk)
-            if product is None:
-                data = {
-                    'response_code': 404,
-                    'status': 'Failed',
-                    'message': 'Product not found',
-                    'statusFlag': False,
-                    'errorDetails': None,
-                    'data': {}
-                }
-                logger.warning(f"Product not found on delete: {pk}")
-                return Response(data, status=status.HTTP_404_NOT_FOUND)
-            product.delete()
-            data = {
-                'response_code': 200,
-                'status': 'Success',
-                'message': 'Product deleted',
-                'statusFlag': True,
-                'errorDetails': None,
-                'data': {'id': pk}
-            }
-            logger.info(f"Product deleted: {pk}")
-            return Response(data, status=status.HTTP_200_OK)
-        except Exception as e:
-            data = {
-                'response_code': 500,
-                'status': 'Failed',
-                'message': 'Internal server error',
-                'statusFlag': False,
-                'errorDetails': str(e),
-                'data': {}
-            }
-            logger.error("Internal server error in ProductDeleteView", exc_info=True)
-            return Response(data, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            page = max(int(request.query_params.get("page", 1)), 1)
+            page_size = min(max(int(request.query_params.get("page_size", self.page_size)), 1), self.max_page_size)
+        except ValueError:
+            return Response(build_response(400, "Failed", "Invalid page parameters", statusFlag=False), status=400)
+
+        # Fetch one extra row to learn whether another page exists without a COUNT.
+        products = search_products(query, page_size + 1, (page - 1) * page_size)
+        has_next = len(products) > page_size
+        serializer = ProductSerializer(products[:page_size], many=True)
+
+        url = request.build_absolute_uri()
+        data = {
+            "next": replace_query_param(url, "page", page + 1) if has_next else None,
+            "previous": None if page == 1 else (
+                remove_query_param(url, "page") if page == 2 else replace_query_param(url, "page", page - 1)
+            ),
+            "results": serializer.data,
+        }
+        _logger.info(f"Product search for '{query}' returned {len(data['results'])} results")
+        return Response(build_response(200, "Success", "Search results fetched", data=data))
 
 
+class ProductCreateView(APIView):
+    authentication_classes = [TokenAuthentication]
+    permission_classes = [IsAuthenticated, IsAdminUser]
 
-class ProductRestockView(APIView):
-    def post(self, request, pk):
-        try:
-            product = Product.objects.get(pk=pk)
-            quantity = request.data.get("quantity", 0)
-            product.stock += int(quantity)
-            product.save()
-            return Response({
-                "response_code": 200,
-                "status": "Success",
-                "message": "Product restocked",
-                "statusFlag": True,
-                "errorDetails": None,
-                "data": {
-                    "product_id": product.id,
-                    "new_stock": product.stock
-                }
-            }, status=200)
-        except Product.DoesNotExist:
-            return Response({
-                "response_code": 400,
-                "status": "Failed",
-                "message": "Product not found",
-                "statusFlag": False,
-                "errorDetails": None,
-                "data": {}
-            }, status=400)
-        except Exception as e:
-            return Response({
-                "response_code": 500,
-                "status": "Failed",
-                "message": "Internal server error",
-                "statusFlag": False,
-                "errorDetails": str(e),
-                "data": {}
-            }, status=500)
-
-=======
+    @swagger_auto_schema(request_body=ProductSerializer)
+    def post(self, request):
         serializer = ProductSerializer(data=request.data)
         if serializer.is_valid():
-            serializer.save()
+            product = serializer.save()
+            catalog.record_product_change(product.id, None, facet_values(product))
             _logger.info("Product created successfully")
             return Response(build_response(201, "Success", "Product created"), status=201)
         _logger.error(f"Product creation failed: {serializer.errors}")
         return Response(build_response(400, "Failed", "Invalid data", data=serializer.errors, statusFlag=False), status=400)
 
 
+class ProductImportView(APIView):
+    authentication_classes = [TokenAuthentication]
+    permission_classes = [IsAuthenticated, IsAdminUser]
+    parser_classes = [MultiPartParser]
+
+    @swagger_auto_schema(manual_parameters=[
+        openapi.Parameter("file", openapi.IN_FORM, type=openapi.TYPE_FILE, required=True),
+        openapi.Parameter("format", openapi.IN_FORM, type=openapi.TYPE_STRING, enum=["csv", "jsonl"]),
+        openapi.Parameter("batch_size", openapi.IN_FORM, type=openapi.TYPE_INTEGER),
+    ])
+    def post(self, request):
+        upload = request.FILES.get("file")
+        if not upload:
+            return Response(build_response(400, "Failed", "File is required", statusFlag=False), status=400)
+
+        fmt = request.data.get("format") or upload.name.rsplit(".", 1)[-1].lower()
+        try:
+            batch_size = int(request.data.get("batch_size", 1000))
+            if fmt not in ("csv", "jsonl") or batch_size < 1:
+                raise ValueError
+        except ValueError:
+            return Response(build_response(400, "Failed", "Invalid format or batch size", statusFlag=False), status=400)
+
+        summary = import_products(open_text(upload.file), fmt, batch_size=batch_size)
+        _logger.info(f"Product import: {summary['upserted']} upserted, {summary['rejected']} rejected")
+        return Response(build_response(200, "Success", "Products imported", data=summary))
+
+
 class ProductUpdateView(APIView):
     authentication_classes = [TokenAuthentication]
     permission_classes = [IsAuthenticated, IsAdminUser]
 
     @swagger_auto_schema(request_body=ProductSerializer)
     def put(self, request, id):
-        product = Product.objects.filter(id=id).first()
-        if not product:
-            _logger.warning(f"Product with ID {id} not found for update")
-            return Response(build_response(404, "Failed", "Product not found", statusFlag=False), status=404)
+        # As in ProductBulkUpdateView: the shard locks taken by sync() are held
+        # until redistribute() has run, so no sharded checkout lands in between.
+        with transaction.atomic():
+            inventory.sync([id])
+            product = Product.objects.select_for_update().filter(id=id).first()
+            if not product:
+                _logger.warning(f"Product with ID {id} not found for update")
+                return Response(build_response(404, "Failed", "Product not found", statusFlag=False), status=404)
 
-        serializer = ProductSerializer(product, data=request.data, partial=True)
-        if serializer.is_valid():
-            serializer.save()
-            _logger.info(f"Product {id} updated")
-            return Response(build_response(200, "Success", "Product updated"))
+            serializer = ProductSerializer(product, data=request.data, partial=True)
+            if serializer.is_valid():
+                before, old_brand = facet_values(product), product.brand
+                serializer.save()
+                catalog.record_product_change(product.id, before, facet_values(product))
+                leaderboard.record_brand_change(product, old_brand)
+                if "quantity" in serializer.validated_data:
+                    inventory.redistribute([product.id])
+                _logger.info(f"Product {id} updated")
+                return Response(build_response(200, "Success", "Product updated"))
         _logger.error(f"Product update failed: {serializer.errors}")
         return Response(build_response(400, "Failed", "Invalid data", data=serializer.errors, statusFlag=False), status=400)
 
 
+class ProductBulkUpdateView(APIView):
+    authentication_classes = [TokenAuthentication]
+    permission_classes = [IsAuthenticated, IsAdminUser]
+    batch_size = 500
+
+    @swagger_auto_schema(request_body=ProductBulkUpdateSerializer)
+    def post(self, request):
+        patches = request.data.get("products")
+        if not isinstance(patches, list) or not patches:
+            return Response(build_response(400, "Failed", "A non-empty products list is required", statusFlag=False),
+                            status=400)
+
+        results = [None] * len(patches)
+        valid = []
+        for index, patch in enumerate(patches):
+            serializer = ProductPatchSerializer(data=patch)
+            if serializer.is_valid():
+                valid.append((index, serializer.validated_data))
+            else:
+                results[index] = {"id": patch.get("id") if isinstance(patch, dict) else None,
+                                  "status": "invalid", "errors": serializer.errors}
+
+        with transaction.atomic():
+            for start in range(0, len(valid), self.batch_size):
+                self.apply_batch(valid[start:start + self.batch_size], results)
+
+        updated = sum(1 for result in results if result["status"] == "updated")
+        _logger.info(f"Bulk product update: {updated} of {len(patches)} rows updated")
+        return Response(build_response(200, "Success", "Bulk update processed", data={
+            "updated": updated,
+            "failed": len(patches) - updated,
+            "results": results
+        }))
+
+    def apply_batch(self, batch, results):
+        # Sharded products' mirrors are brought up to date first, so a
+        # quantity redistributed below starts from what the shards hold now.
+        inventory.sync([patch["id"] for _, patch in batch])
+        # Locked in ID order so concurrent batches and checkouts can't interleave with these rows.
+        products = {
+            product.id: product
+            for product in Product.objects.select_for_update().filter(id__in=[patch["id"] for _, patch in batch])
+            .order_by("id")
+        }
+        before = {product_id: facet_values(product) for product_id, product in products.items()}
+        old_brands = {product_id: product.brand for product_id, product in products.items()}
+        was_out_of_stock = {product_id for product_id, product in products.items() if product.quantity == 0}
+
+        # Each row is written with only the fields its own patches set, so a
+        # price patch never writes back a quantity read before the lock.
+        groups = {}
+        for index, patch in batch:
+            product = products.get(patch["id"])
+            if not product:
+                results[index] = {"id": patch["id"], "status": "not_found"}
+                continue
+            fields = [field for field in ("brand", "price", "quantity") if field in patch]
+            for field in fields:
+                setattr(product, field, patch[field])
+            groups.setdefault(product.id, set()).update(fields)
+            results[index] = {"id": patch["id"], "status": "updated"}
+
+        if not groups:
+            return
+        by_fields = {}
+        for product_id, fields in groups.items():
+            by_fields.setdefault(tuple(sorted(fields)), []).append(products[product_id])
+        for fields, rows in by_fields.items():
+            Product.objects.bulk_update(rows, fields)
+
+        catalog.record_product_changes(
+            (product_id, before[product_id], facet_values(products[product_id])) for product_id in groups
+        )
+        for product_id in groups:
+            leaderboard.record_brand_change(products[product_id], old_brands[product_id])
+        inventory.redistribute([product_id for product_id, fields in groups.items() if "quantity" in fields])
+
+        restocked = [
+            products[product_id] for product_id in groups
+            if product_id in was_out_of_stock and products[product_id].quantity > 0
+        ]
+        if restocked:
+            transaction.on_commit(lambda: notify_users_products_restocked(restocked))
+
+
 class ProductDeleteView(APIView):
     authentication_classes = [TokenAuthentication]
     permission_classes = [IsAuthenticated, IsAdminUser]
@@ -367,7 +362,9 @@ class ProductDeleteView(APIView):
             _logger.warning(f"Product with ID {id} not found for deletion")
             return Response(build_response(404, "Failed", "Product not found", statusFlag=False), status=404)
 
+        before = facet_values(product)
         product.delete()
+        catalog.record_product_change(id, before, None)
         _logger.info(f"Product {id} deleted")
         return Response(build_response(204, "Success", "Product deleted"), status=204)
 
@@ -378,37 +375,44 @@ class ProductRestockView(APIView):
 
     @swagger_auto_schema(request_body=ProductRestockSerializer)
     def post(self, request, id):
-        product = Product.objects.filter(id=id).first()
-        if not product:
-            _logger.warning(f"Product with ID {id} not found for restock")
-            return Response(build_response(
-                404, "Failed", "Product not found", statusFlag=False
-            ), status=404)
-
-        quantity = request.data.get("quantity")
-        if quantity:
-            try:
-                quantity = int(quantity)
-                if quantity <= 0:
-                    raise ValueError("Quantity must be greater than 0")
-            except ValueError:
-                _logger.warning("Invalid quantity provided for restock")
+        with transaction.atomic():
+            # A sharded product's mirror must be current before stock is added
+            # to it, and stay so until redistribute(): the shard locks taken by
+            # sync() are held to the end of this block.
+            inventory.sync([id])
+            product = Product.objects.select_for_update().filter(id=id).first()
+            if not product:
+                _logger.warning(f"Product with ID {id} not found for restock")
                 return Response(build_response(
-                    400, "Failed", "Invalid quantity", statusFlag=False
-                ), status=400)
-
-            product.quantity += quantity
-            product.save()
+                    404, "Failed", "Product not found", statusFlag=False
+                ), status=404)
+
+            quantity = request.data.get("quantity")
+            if quantity:
+                try:
+                    quantity = int(quantity)
+                    if quantity <= 0:
+                        raise ValueError("Quantity must be greater than 0")
+                except ValueError:
+                    _logger.warning("Invalid quantity provided for restock")
+                    return Response(build_response(
+                        400, "Failed", "Invalid quantity", statusFlag=False
+                    ), status=400)
+
+                before = facet_values(product)
+                product.quantity += quantity
+                product.save()
+                catalog.record_product_change(product.id, before, facet_values(product))
+                inventory.redistribute([product.id])
+
+                transaction.on_commit(lambda: notify_users_product_restocked(product))
+                _logger.info(f"Product {id} restocked with quantity {quantity}")
 
-            notify_users_product_restocked(product)
-            _logger.info(f"Product {id} restocked with quantity {quantity}")
-
-            return Response(build_response(
-                200, "Success", "Product restocked"
-            ), status=200)
+                return Response(build_response(
+                    200, "Success", "Product restocked"
+                ), status=200)
 
         _logger.warning("Restock failed due to missing quantity")
         return Response(build_response(
             400, "Failed", "Quantity is required", statusFlag=False
         ), status=400)
->>>>>>> 987dbcd (Initial project setup with working Django e-commerce backend)